@@ -0,0 +1,68 @@
+import asyncio
+from collections import deque
+from typing import Deque, Optional
+
+# Why a request was shed
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+class Budget:
+    """
+    Concurrency budget of one class of work, with a FIFO queue in front of it.
+
+    Up to `concurrency` holders run at once. Later arrivals wait in line, at most
+    `max_queue` of them (None: no limit), each for at most the timeout passed to `acquire`.
+    A released slot is handed straight to the longest waiter, so a queued request is never
+    overtaken by one that arrives later. A `concurrency` of 0 disables the budget.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: Optional[int] = None):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self, timeout: Optional[float]) -> Optional[str]:
+        """
+        Take a slot, waiting up to `timeout` seconds (None: as long as it takes).
+
+        Returns None once the slot is held, or why no slot was given.
+        """
+        if self.concurrency <= 0 or (self.in_flight < self.concurrency and not self.waiters):
+            self.in_flight += 1
+            return None
+        if timeout == 0 or (self.max_queue is not None and len(self.waiters) >= self.max_queue):
+            return QUEUE_FULL
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return QUEUE_TIMEOUT
+        except asyncio.CancelledError:
+            # Cancelled (e.g. the client went away) just after being handed a slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:
+                    pass
+        # The slot was handed over by release(), which left in_flight as it was
+        return None
+
+    def release(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
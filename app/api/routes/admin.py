@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from app import config
+from app.auth import valid_admin_token
+from app.db.slow_queries import SLOW_QUERY_LOG
+from app.profiling import PROFILES, Sampler, collapse, profile_lock
+from app.schemas.schemas import SlowQueryReport
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # The admin API only exists when a token is configured
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if not valid_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+async def read_slow_queries():
+    """Slow statements aggregated by fingerprint, the most total time first."""
+    return {
+        "threshold_ms": SLOW_QUERY_LOG.threshold * 1000,
+        "dropped": SLOW_QUERY_LOG.dropped,
+        "queries": SLOW_QUERY_LOG.summary(),
+    }
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries():
+    SLOW_QUERY_LOG.reset()
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=60, description="How long to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Time between samples"),
+    include_idle: bool = Query(False, description="Keep samples taken while the event loop was idle"),
+):
+    """
+    Sample the event loop thread for `seconds` and return collapsed stacks.
+
+    The output feeds flamegraph.pl or speedscope directly. The loop keeps serving other
+    requests while this one waits, so their CPU time is what gets sampled.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running"
+        )
+    try:
+        sampler = Sampler(threading.get_ident(), interval_ms / 1000, include_idle)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = sampler.stop()
+    finally:
+        profile_lock.release()
+    return PlainTextResponse(collapse(stacks), headers={"X-Profile-Samples": str(sampler.samples)})
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def read_request_profile(profile_id: str):
+    """Collapsed stacks recorded for a request sent with the X-Profile header."""
+    collapsed = PROFILES.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return PlainTextResponse(collapsed)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from typing import List, Optional
+from datetime import datetime
+from tortoise.expressions import Q
 
-from app.models.models import Customer
-from app.schemas.schemas import CustomerCreate, Customer as CustomerSchema, CustomerUpdate
+from app.api.utils import parse_ids, order_by_ids, encode_cursor, decode_cursor, format_order, ORDER_FIELDS
+from app.db.archive import ARCHIVABLE_STATUSES
+from app.models.models import ArchivedOrder, Customer, Order
+from app.schemas.schemas import CustomerCreate, Customer as CustomerSchema, CustomerUpdate, OrderHistoryPage
 
 router = APIRouter()
 
@@ -21,7 +25,17 @@ async def create_customer(customer: CustomerCreate):
     return db_customer
 
 @router.get("/", response_model=List[CustomerSchema])
-async def read_customers(skip: int = 0, limit: int = 100):
+async def read_customers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="Comma-separated customer IDs to fetch in one query"),
+):
+    customer_ids = parse_ids(ids)
+    if customer_ids is not None:
+        customers = await Customer.filter(id__in=customer_ids)
+        return order_by_ids(customers, customer_ids, response)
+    
     customers = await Customer.all().offset(skip).limit(limit)
     return customers
 
@@ -35,6 +49,71 @@ async def read_customer(customer_id: int):
         )
     return db_customer
 
+@router.get("/{customer_id}/orders", response_model=OrderHistoryPage)
+async def read_customer_orders(
+    customer_id: int,
+    status_filter: Optional[str] = Query(None, alias="status", description="Only orders with this status"),
+    start_date: Optional[datetime] = Query(None, description="Only orders placed at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only orders placed before this time"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Number of orders per page"),
+    summary: bool = Query(False, description="Return order rows only, without customer and items"),
+):
+    """
+    Get a customer's orders, most recent first, including archived ones.
+
+    Pages are keyed on (order_date, id) rather than offsets, so each page is a
+    range scan of the (customer_id, order_date, id) index of the order table and of
+    the archive regardless of depth. The two are merged into one page.
+    """
+    customer = await Customer.filter(id=customer_id).first()
+    if customer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found"
+        )
+    
+    models = [Order]
+    # Only finished orders are ever archived
+    if status_filter is None or status_filter in ARCHIVABLE_STATUSES:
+        models.append(ArchivedOrder)
+    
+    items = []
+    for model in models:
+        query = model.filter(customer_id=customer_id)
+        if status_filter is not None:
+            query = query.filter(status=status_filter)
+        if start_date is not None:
+            query = query.filter(order_date__gte=start_date)
+        if end_date is not None:
+            query = query.filter(order_date__lt=end_date)
+        if cursor is not None:
+            last_date, last_id = decode_cursor(cursor)
+            query = query.filter(Q(order_date__lt=last_date) | Q(order_date=last_date, id__lt=last_id))
+        
+        # Fetch one extra row to know whether another page follows
+        query = query.order_by("-order_date", "-id").limit(limit + 1)
+        if summary:
+            # Plain rows: no related fetches and no model hydration
+            items.extend(await query.values(*ORDER_FIELDS))
+        else:
+            orders = await query.prefetch_related("items__product")
+            # All orders belong to the same customer, so reuse it instead of prefetching
+            for order in orders:
+                order.customer = customer
+            items.extend(format_order(order) for order in orders)
+    
+    if len(models) > 1:
+        items.sort(key=lambda item: (item["order_date"], item["id"]), reverse=True)
+    has_next = len(items) > limit
+    items = items[:limit]
+    
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1]["order_date"], items[-1]["id"]) if has_next else None,
+        "has_next": has_next
+    }
+
 @router.put("/{customer_id}", response_model=CustomerSchema)
 async def update_customer(customer_id: int, customer: CustomerUpdate):
     db_customer = await Customer.filter(id=customer_id).first()
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, HTTPException, status
 from typing import List
 from datetime import datetime, timezone
+from tortoise import transactions
 
+from app.api.utils import apply_inventory_deltas
 from app.models.models import Inventory, Product
-from app.schemas.schemas import InventoryCreate, Inventory as InventorySchema, InventoryUpdate
+from app.schemas.schemas import (
+    InventoryCreate, Inventory as InventorySchema, InventoryUpdate,
+    InventoryAdjustmentCreate, InventoryLevel
+)
 
 router = APIRouter()
 
+# Number of products updated per UPDATE statement, kept well below SQLite's bound parameter limit
+ADJUSTMENT_BATCH_SIZE = 200
+
 @router.post("/", response_model=InventorySchema, status_code=status.HTTP_201_CREATED)
 async def create_inventory(inventory: InventoryCreate):
     # Check if product exists
@@ -29,6 +37,89 @@ async def create_inventory(inventory: InventoryCreate):
     db_inventory = await Inventory.create(**inventory.dict())
     return db_inventory
 
+@router.post("/adjustments", response_model=List[InventoryLevel])
+async def adjust_inventory(adjustment: InventoryAdjustmentCreate):
+    """
+    Apply a batch of inventory deltas (e.g. a warehouse receipt) in one transaction.
+
+    Lines may reference products by ID or SKU; deltas for the same product are summed.
+    Products without an inventory record get one when their net delta is not negative.
+    """
+    async with transactions.in_transaction():
+        # Resolve every referenced product with a single query per key type
+        product_ids = {item.product_id for item in adjustment.items if item.product_id is not None}
+        skus = {item.sku for item in adjustment.items if item.sku is not None}
+
+        products = {}
+        if product_ids:
+            for product_id, sku in await Product.filter(id__in=product_ids).values_list("id", "sku"):
+                products[product_id] = sku
+        sku_to_id = {}
+        if skus:
+            for product_id, sku in await Product.filter(sku__in=skus).values_list("id", "sku"):
+                products[product_id] = sku
+                sku_to_id[sku] = product_id
+
+        missing = sorted(str(pid) for pid in product_ids if pid not in products)
+        missing += sorted(sku for sku in skus if sku not in sku_to_id)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Products not found: {', '.join(missing)}"
+            )
+
+        # Collapse the receipt into one net delta per product
+        deltas = {}
+        for item in adjustment.items:
+            product_id = item.product_id if item.product_id is not None else sku_to_id[item.sku]
+            deltas[product_id] = deltas.get(product_id, 0) + item.delta
+
+        current = dict(
+            await Inventory.filter(product_id__in=list(deltas)).values_list("product_id", "quantity")
+        )
+        for product_id, delta in deltas.items():
+            if current.get(product_id, 0) + delta < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Not enough inventory for product with ID {product_id}"
+                )
+
+        now = datetime.now(timezone.utc)
+
+        # Create inventory records for products that have none yet
+        new_inventories = [
+            Inventory(
+                product_id=product_id,
+                quantity=delta,
+                last_restock_date=now if delta > 0 else None
+            )
+            for product_id, delta in deltas.items()
+            if product_id not in current
+        ]
+        if new_inventories:
+            await Inventory.bulk_create(new_inventories, batch_size=ADJUSTMENT_BATCH_SIZE)
+
+        # Apply the remaining deltas as set-based UPDATEs, one statement per batch
+        changed = [(pid, delta) for pid, delta in deltas.items() if pid in current and delta != 0]
+        await apply_inventory_deltas(changed, now)
+
+        # Receipts (net positive deltas) count as a restock
+        restocked = [pid for pid, delta in changed if delta > 0]
+        for start in range(0, len(restocked), ADJUSTMENT_BATCH_SIZE):
+            await Inventory.filter(product_id__in=restocked[start:start + ADJUSTMENT_BATCH_SIZE]).update(
+                last_restock_date=now
+            )
+
+        levels = {
+            level["product_id"]: level
+            for level in await Inventory.filter(product_id__in=list(deltas)).values(
+                "product_id", "quantity", "last_restock_date"
+            )
+        }
+
+    # Report new levels in the order products first appeared in the request
+    return [{**levels[product_id], "sku": products[product_id]} for product_id in deltas]
+
 @router.get("/", response_model=List[InventorySchema])
 async def read_inventories(skip: int = 0, limit: int = 100):
     inventories = await Inventory.all().prefetch_related("product").offset(skip).limit(limit)
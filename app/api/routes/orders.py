@@ -1,12 +1,33 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
 from tortoise import transactions
 
-from app.models.models import Order, Customer, Product, Inventory, OrderItem
-from app.schemas.schemas import OrderCreate, Order as OrderSchema, OrderUpdate, OrderItem as OrderItemSchema
+from app.api.utils import (
+    parse_ids, order_by_ids, parse_order_projection, fetch_orders, format_order, apply_inventory_deltas
+)
+from app.models.models import Order, ArchivedOrder, Customer, Product, Inventory, OrderItem
+from app.schemas.schemas import OrderCreate, Order as OrderSchema, OrderUpdate, OrderItem as OrderItemSchema, OrderPartial
 
 router = APIRouter()
 
+async def ensure_not_archived(order_id: int) -> None:
+    """Reject changes to an order that is not in the order table because it was archived."""
+    if await ArchivedOrder.filter(id=order_id).exists():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Archived orders cannot be changed"
+        )
+
+# Sort options accepted by the order list
+OrderSort = Literal["id", "-id", "order_date", "-order_date", "total_amount", "-total_amount"]
+
+FIELDS_DESCRIPTION = "Comma-separated order columns to return (id is always included)"
+INCLUDE_DESCRIPTION = (
+    "Comma-separated relations to embed (customer, items); empty for a list view that "
+    "relies on the denormalized item_count/total_quantity/item_summary columns"
+)
+
 @router.post("/", response_model=OrderSchema, status_code=status.HTTP_201_CREATED)
 async def create_order(order: OrderCreate):
     # Check if customer exists
@@ -18,152 +39,136 @@ async def create_order(order: OrderCreate):
         )
     
     async with transactions.in_transaction():
-        # Create new order
-        db_order = await Order.create(customer=customer, status=order.status)
+        # Products and stock of every line, one query each however many lines there are
+        product_ids = list(dict.fromkeys(item.product_id for item in order.items))
+        products = {}
+        stock = {}
+        if product_ids:
+            products = {product.id: product for product in await Product.filter(id__in=product_ids)}
+            stock = dict(await Inventory.filter(product_id__in=product_ids).values_list("product_id", "quantity"))
         
         total_amount = 0.0
+        item_summary = []
+        order_items = []
+        deltas = {}
         
         # Add order items
         for item in order.items:
             # Check if product exists
-            product = await Product.filter(id=item.product_id).first()
+            product = products.get(item.product_id)
             if not product:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Product with ID {item.product_id} not found"
                 )
             
-            # Check inventory
-            inventory = await Inventory.filter(product_id=item.product_id).first()
-            if not inventory or inventory.quantity < item.quantity:
+            # Check inventory; lines for the same product draw on the same stock
+            if stock.get(item.product_id) is None or stock[item.product_id] < item.quantity:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Not enough inventory for product with ID {item.product_id}"
                 )
-            
-            # Update inventory
-            inventory.quantity -= item.quantity
-            await inventory.save()
+            stock[item.product_id] -= item.quantity
+            deltas[item.product_id] = deltas.get(item.product_id, 0) - item.quantity
             
             # Add product to order with quantity and price
             item_subtotal = product.price * item.quantity
-            await OrderItem.create(
-                order=db_order,
+            order_items.append(OrderItem(
                 product=product,
                 quantity=item.quantity,
                 unit_price=product.price,
                 subtotal=item_subtotal
-            )
+            ))
             
             # Update total amount
-            total_amount += product.price * item.quantity
+            total_amount += item_subtotal
+            item_summary.append((product.name, item.quantity))
         
-        # Update order total
-        db_order.total_amount = total_amount
+        # Create the order with its total and denormalized item summary
+        db_order = Order(customer=customer, status=order.status, total_amount=total_amount)
+        db_order.set_item_summary(item_summary)
         await db_order.save()
+        
+        for order_item in order_items:
+            order_item.order = db_order
+        if order_items:
+            await OrderItem.bulk_create(order_items)
+        
+        # Update inventory
+        await apply_inventory_deltas(list(deltas.items()), datetime.now(timezone.utc))
     
     # Fetch the created order with all related data
     created_order = await Order.filter(id=db_order.id).prefetch_related('customer', 'items__product').first()
+    return format_order(created_order)
+
+@router.get("/", response_model=List[OrderPartial], response_model_exclude_unset=True)
+async def read_orders(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="Comma-separated order IDs to fetch in one query"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Only orders with this status"),
+    customer_id: Optional[int] = Query(None, description="Only orders placed by this customer"),
+    start_date: Optional[datetime] = Query(None, description="Only orders placed at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only orders placed before this time"),
+    min_total: Optional[float] = Query(None, ge=0, description="Minimum total amount"),
+    max_total: Optional[float] = Query(None, ge=0, description="Maximum total amount"),
+    sort: OrderSort = Query("id", description="Sort field, prefixed with '-' for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+):
+    columns, relations = parse_order_projection(fields, include)
     
-    # Format the order with customer data
-    order_dict = {
-        "id": created_order.id,
-        "customer_id": created_order.customer.id,
-        "status": created_order.status,
-        "order_date": created_order.order_date,
-        "total_amount": created_order.total_amount,
-        "created_at": created_order.created_at,
-        "updated_at": created_order.updated_at,
-        "customer": created_order.customer,
-        "items": []
-    }
+    order_ids = parse_ids(ids)
+    if order_ids is not None:
+        orders = await fetch_orders(Order.filter(id__in=order_ids), columns, relations)
+        return order_by_ids(orders, order_ids, response)
     
-    # Add order items
-    for item in created_order.items:
-        order_dict["items"].append({
-            "product_id": item.product.id,
-            "product_name": item.product.name,
-            "quantity": item.quantity,
-            "unit_price": item.unit_price,
-            "subtotal": item.subtotal
-        })
+    # Filters, sorting and paging all run in SQL, so the prefetch only touches returned rows
+    query = Order.all()
+    if status_filter is not None:
+        query = query.filter(status=status_filter)
+    if customer_id is not None:
+        query = query.filter(customer_id=customer_id)
+    if start_date is not None:
+        query = query.filter(order_date__gte=start_date)
+    if end_date is not None:
+        query = query.filter(order_date__lt=end_date)
+    if min_total is not None:
+        query = query.filter(total_amount__gte=min_total)
+    if max_total is not None:
+        query = query.filter(total_amount__lte=max_total)
     
-    return order_dict
+    # Use id as a tie-breaker so pages are stable for non-unique sort fields
+    order_by = [sort] if sort.lstrip("-") == "id" else [sort, "-id" if sort.startswith("-") else "id"]
+    return await fetch_orders(query.order_by(*order_by).offset(skip).limit(limit), columns, relations)
 
-@router.get("/", response_model=List[OrderSchema])
-async def read_orders(skip: int = 0, limit: int = 100):
-    # Use prefetch_related to load the customer and items in a single query
-    orders = await Order.all().prefetch_related('customer', 'items__product').offset(skip).limit(limit)
-    
-    # Process each order to properly format the response
-    result = []
-    for order in orders:
-        # Format the order with customer data
-        order_dict = {
-            "id": order.id,
-            "customer_id": order.customer.id,
-            "status": order.status,
-            "order_date": order.order_date,
-            "total_amount": order.total_amount,
-            "created_at": order.created_at,
-            "updated_at": order.updated_at,
-            "customer": order.customer,
-            "items": []
-        }
-        
-        # Add order items
-        for item in order.items:
-            order_dict["items"].append({
-                "product_id": item.product.id,
-                "product_name": item.product.name,
-                "quantity": item.quantity,
-                "unit_price": item.unit_price,
-                "subtotal": item.subtotal
-            })
-        
-        result.append(order_dict)
+@router.get("/{order_id}", response_model=OrderPartial, response_model_exclude_unset=True)
+async def read_order(
+    order_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+):
+    columns, relations = parse_order_projection(fields, include)
     
-    return result
-
-@router.get("/{order_id}", response_model=OrderSchema)
-async def read_order(order_id: int):
-    # Get order with prefetched relations
-    db_order = await Order.filter(id=order_id).prefetch_related('customer', 'items__product').first()
-    if db_order is None:
+    # Get the order with only the requested relations prefetched
+    orders = await fetch_orders(Order.filter(id=order_id), columns, relations)
+    if not orders:
+        # Finished orders may have been moved to the archive tables
+        orders = await fetch_orders(ArchivedOrder.filter(id=order_id), columns, relations)
+    if not orders:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
         )
     
-    # Format the order with customer data
-    order_dict = {
-        "id": db_order.id,
-        "customer_id": db_order.customer.id,
-        "status": db_order.status,
-        "order_date": db_order.order_date,
-        "total_amount": db_order.total_amount,
-        "created_at": db_order.created_at,
-        "updated_at": db_order.updated_at,
-        "customer": db_order.customer,
-        "items": []
-    }
-    
-    # Add order items
-    for item in db_order.items:
-        order_dict["items"].append({
-            "product_id": item.product.id,
-            "product_name": item.product.name,
-            "quantity": item.quantity,
-            "unit_price": item.unit_price,
-            "subtotal": item.subtotal
-        })
-    
-    return order_dict
+    return orders[0]
 
 @router.put("/{order_id}", response_model=OrderSchema)
 async def update_order(order_id: int, order: OrderUpdate):
     db_order = await Order.filter(id=order_id).first()
     if db_order is None:
+        await ensure_not_archived(order_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
@@ -178,36 +183,13 @@ async def update_order(order_id: int, order: OrderUpdate):
     
     # Fetch the updated order with all related data
     updated_order = await Order.filter(id=order_id).prefetch_related('customer', 'items__product').first()
-    
-    # Format the order with customer data
-    order_dict = {
-        "id": updated_order.id,
-        "customer_id": updated_order.customer.id,
-        "status": updated_order.status,
-        "order_date": updated_order.order_date,
-        "total_amount": updated_order.total_amount,
-        "created_at": updated_order.created_at,
-        "updated_at": updated_order.updated_at,
-        "customer": updated_order.customer,
-        "items": []
-    }
-    
-    # Add order items
-    for item in updated_order.items:
-        order_dict["items"].append({
-            "product_id": item.product.id,
-            "product_name": item.product.name,
-            "quantity": item.quantity,
-            "unit_price": item.unit_price,
-            "subtotal": item.subtotal
-        })
-    
-    return order_dict
+    return format_order(updated_order)
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(order_id: int):
-    db_order = await Order.filter(id=order_id).prefetch_related('items__product').first()
+    db_order = await Order.filter(id=order_id).prefetch_related('items').first()
     if db_order is None:
+        await ensure_not_archived(order_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
@@ -215,12 +197,11 @@ async def delete_order(order_id: int):
     
     async with transactions.in_transaction():
         # Restore inventory for each product
+        deltas = {}
         for item in db_order.items:
             if item.quantity > 0:
-                inventory = await Inventory.filter(product_id=item.product.id).first()
-                if inventory:
-                    inventory.quantity += item.quantity
-                    await inventory.save()
+                deltas[item.product_id] = deltas.get(item.product_id, 0) + item.quantity
+        await apply_inventory_deltas(list(deltas.items()), datetime.now(timezone.utc))
         
         # Delete the order (this will also delete related order items due to cascade)
         await db_order.delete()
@@ -231,6 +212,9 @@ async def delete_order(order_id: int):
 async def read_order_items(order_id: int):
     # Check if order exists
     order = await Order.filter(id=order_id).prefetch_related('items__product').first()
+    if not order:
+        # Finished orders may have been moved to the archive tables
+        order = await ArchivedOrder.filter(id=order_id).prefetch_related('items__product').first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
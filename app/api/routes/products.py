@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from typing import List, Optional
+from tortoise import transactions
 
+from app.api.utils import parse_ids, order_by_ids
 from app.models.models import Product
-from app.schemas.schemas import ProductCreate, Product as ProductSchema, ProductUpdate
+from app.schemas.schemas import (
+    ProductCreate, Product as ProductSchema, ProductUpdate,
+    ProductBulkUpsert, ProductBulkUpsertResult
+)
 
 router = APIRouter()
 
+# Number of products looked up and written per statement during a bulk upsert
+UPSERT_BATCH_SIZE = 500
+
+# Columns compared to decide whether an existing product changed, and rewritten when it did
+UPSERT_CONTENT_FIELDS = ("name", "description", "price")
+
 @router.post("/", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def create_product(product: ProductCreate):
     # Check if product with SKU already exists
@@ -20,8 +31,63 @@ async def create_product(product: ProductCreate):
     db_product = await Product.create(**product.dict())
     return db_product
 
+@router.post("/bulk", response_model=ProductBulkUpsertResult)
+async def bulk_upsert_products(feed: ProductBulkUpsert):
+    """
+    Create or update products keyed on SKU.
+
+    Each batch costs one lookup of the existing rows and one INSERT ... ON CONFLICT(sku)
+    statement; rows whose content matches what is stored are not written at all.
+    If a SKU appears more than once in the feed, the last occurrence wins.
+    """
+    items = list({item.sku: item for item in feed.items}.values())
+    result = {"created": 0, "updated": 0, "unchanged": 0}
+
+    async with transactions.in_transaction():
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+
+            existing = {
+                row[0]: tuple(row[1:])
+                for row in await Product.filter(sku__in=[item.sku for item in batch]).values_list(
+                    "sku", *UPSERT_CONTENT_FIELDS
+                )
+            }
+
+            to_write = []
+            for item in batch:
+                data = item.model_dump()
+                content = tuple(data[field] for field in UPSERT_CONTENT_FIELDS)
+                if item.sku not in existing:
+                    result["created"] += 1
+                elif existing[item.sku] == content:
+                    result["unchanged"] += 1
+                    continue
+                else:
+                    result["updated"] += 1
+                to_write.append(Product(**data))
+
+            if to_write:
+                await Product.bulk_create(
+                    to_write,
+                    on_conflict=["sku"],
+                    update_fields=[*UPSERT_CONTENT_FIELDS, "updated_at"]
+                )
+
+    return result
+
 @router.get("/", response_model=List[ProductSchema])
-async def read_products(skip: int = 0, limit: int = 100):
+async def read_products(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="Comma-separated product IDs to fetch in one query"),
+):
+    product_ids = parse_ids(ids)
+    if product_ids is not None:
+        products = await Product.filter(id__in=product_ids)
+        return order_by_ids(products, product_ids, response)
+    
     products = await Product.all().offset(skip).limit(limit)
     return products
 
@@ -2,19 +2,21 @@ from fastapi import APIRouter, HTTPException, status, Query
 from typing import List, Optional
 from math import ceil
 
+from app.api.utils import parse_fields, PRODUCT_FIELDS
 from app.models.models import Product
-from app.schemas.schemas import Product as ProductSchema
+from app.schemas.schemas import Product as ProductSchema, ProductPartial
 from app.schemas.v2.schemas import PaginatedResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=PaginatedResponse[ProductSchema])
+@router.get("/", response_model=PaginatedResponse[ProductPartial], response_model_exclude_unset=True)
 async def read_products(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     name: Optional[str] = Query(None, description="Filter products by name"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
+    fields: Optional[str] = Query(None, description="Comma-separated product columns to return (id is always included)"),
 ):
     """
     Get a paginated list of products with optional filtering.
@@ -24,7 +26,12 @@ async def read_products(
     - **name**: Optional filter by product name (case-insensitive partial match)
     - **min_price**: Optional filter for minimum price
     - **max_price**: Optional filter for maximum price
+    - **fields**: Optional list of columns to return, e.g. `name,price`
     """
+    columns = parse_fields(fields, PRODUCT_FIELDS, "fields")
+    if "id" not in columns:
+        columns = ("id",) + columns
+    
     # Start with base query
     query = Product.all()
     
@@ -40,8 +47,8 @@ async def read_products(
     total_items = await query.count()
     total_pages = ceil(total_items / page_size)
     
-    # Apply pagination
-    products = await query.offset((page - 1) * page_size).limit(page_size)
+    # Apply pagination, selecting only the requested columns
+    products = await query.offset((page - 1) * page_size).limit(page_size).values(*columns)
     
     # Prepare response with pagination metadata
     return {
@@ -0,0 +1,156 @@
+from fastapi import HTTPException, Response, status
+from typing import List, Optional, Tuple
+from datetime import datetime
+from tortoise.expressions import F, Case, When
+import base64
+
+from app.models.models import Inventory
+
+# Upper bound on the number of IDs accepted by a single batch lookup
+MAX_BATCH_IDS = 1000
+
+# Response header listing requested IDs that do not exist
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+# Order columns and relations that can be selected with the `fields` and `include` parameters
+ORDER_FIELDS = (
+    "id", "customer_id", "status", "order_date", "total_amount",
+    "item_count", "total_quantity", "item_summary", "created_at", "updated_at"
+)
+ORDER_RELATIONS = ("customer", "items")
+
+# Product columns that can be selected with the `fields` parameter
+PRODUCT_FIELDS = ("id", "name", "description", "price", "sku", "created_at", "updated_at")
+
+def parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse a comma-separated `ids` query parameter.
+
+    Returns None when the parameter was not supplied. Duplicates are dropped while
+    keeping the order in which IDs were first requested.
+    """
+    if ids is None:
+        return None
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers"
+        )
+    parsed = list(dict.fromkeys(parsed))
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_IDS} ids can be requested at once"
+        )
+    return parsed
+
+def order_by_ids(objects: list, ids: List[int], response: Response) -> list:
+    """
+    Arrange objects fetched with an `id__in` query in the requested order.
+
+    Accepts model instances or `.values()` rows. IDs with no matching object are
+    reported in the X-Missing-Ids response header.
+    """
+    by_id = {obj["id"] if isinstance(obj, dict) else obj.id: obj for obj in objects}
+    missing = [str(object_id) for object_id in ids if object_id not in by_id]
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(missing)
+    return [by_id[object_id] for object_id in ids if object_id in by_id]
+
+def encode_cursor(order_date: datetime, order_id: int) -> str:
+    """Encode the (order_date, id) position of the last row of a page as an opaque cursor."""
+    raw = f"{order_date.isoformat()}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        order_date, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(order_date), int(order_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def parse_fields(value: Optional[str], allowed: Tuple[str, ...], name: str) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated projection parameter such as `fields` or `include`.
+
+    Returns every allowed name when the parameter was not supplied, keeping
+    responses unchanged for clients that do not ask for a projection.
+    """
+    if value is None:
+        return allowed
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = sorted(requested - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown {name}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return tuple(part for part in allowed if part in requested)
+
+def parse_order_projection(fields: Optional[str], include: Optional[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Parse order `fields`/`include` parameters; the id column is always returned."""
+    columns = parse_fields(fields, ORDER_FIELDS, "fields")
+    if "id" not in columns:
+        columns = ("id",) + columns
+    return columns, parse_fields(include, ORDER_RELATIONS, "include")
+
+def format_order(order, fields: Tuple[str, ...] = ORDER_FIELDS, include: Tuple[str, ...] = ORDER_RELATIONS) -> dict:
+    """
+    Format an order for an Order response.
+
+    Only the requested columns and relations are included; the relations must have
+    been prefetched (`customer` and `items__product`).
+    """
+    result = {field: getattr(order, field) for field in fields}
+    if "customer" in include:
+        result["customer"] = order.customer
+    if "items" in include:
+        result["items"] = [
+            {
+                "product_id": item.product.id,
+                "product_name": item.product.name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "subtotal": item.subtotal
+            }
+            for item in order.items
+        ]
+    return result
+
+async def fetch_orders(query, fields: Tuple[str, ...] = ORDER_FIELDS, include: Tuple[str, ...] = ORDER_RELATIONS) -> list:
+    """
+    Run an order query and format the rows, fetching only what the projection needs.
+
+    Without relations the rows come straight from `.values()`, skipping both the
+    prefetch queries and model hydration.
+    """
+    if not include:
+        return await query.values(*fields)
+    prefetch = []
+    if "customer" in include:
+        prefetch.append("customer")
+    if "items" in include:
+        prefetch.append("items__product")
+    orders = await query.prefetch_related(*prefetch)
+    return [format_order(order, fields, include) for order in orders]
+
+# Products updated per inventory UPDATE statement, kept well below SQLite's bound parameter limit
+INVENTORY_BATCH_SIZE = 200
+
+async def apply_inventory_deltas(deltas: List[Tuple[int, int]], now: datetime) -> None:
+    """Add each (product_id, delta) to the product's stock, one set-based UPDATE per batch."""
+    for start in range(0, len(deltas), INVENTORY_BATCH_SIZE):
+        batch = deltas[start:start + INVENTORY_BATCH_SIZE]
+        await Inventory.filter(product_id__in=[pid for pid, _ in batch]).update(
+            quantity=Case(
+                *[When(product_id=pid, then=F("quantity") + delta) for pid, delta in batch],
+                default=F("quantity")
+            ),
+            updated_at=now
+        )
@@ -0,0 +1,8 @@
+import secrets
+from typing import Optional
+
+from app import config
+
+def valid_admin_token(token: Optional[str]) -> bool:
+    """Whether `token` is the configured admin token; always False when none is set."""
+    return bool(config.ADMIN_TOKEN) and secrets.compare_digest(token or "", config.ADMIN_TOKEN)
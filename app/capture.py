@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only API traffic is captured; admin, metrics and docs requests are not worth replaying
+CAPTURE_PATH_PREFIX = "/api/"
+
+# JSON body fields that may hold personal data or secrets, at any nesting depth
+SENSITIVE_FIELDS = frozenset({
+    "name", "email", "phone", "address", "description", "password", "token", "secret",
+})
+
+# Records waiting for the writer thread; requests beyond this are dropped, not blocked
+QUEUE_SIZE = 10000
+
+def pseudonym(value: str, salt: bytes) -> str:
+    """Replace a value with a stable token, so equal inputs stay equal (and unique) in the capture."""
+    digest = hashlib.sha256(salt + value.encode()).hexdigest()[:16]
+    if "@" in value:
+        return f"user-{digest}@example.com"
+    return f"redacted-{digest}"
+
+def sanitize(value, salt: bytes, sensitive: bool = False):
+    """Pseudonymize the strings under sensitive keys of a decoded JSON body, keeping its shape."""
+    if isinstance(value, dict):
+        return {key: sanitize(item, salt, sensitive or key in SENSITIVE_FIELDS) for key, item in value.items()}
+    if isinstance(value, list):
+        return [sanitize(item, salt, sensitive) for item in value]
+    if sensitive and isinstance(value, str):
+        return pseudonym(value, salt)
+    return value
+
+class TrafficRecorder:
+    """
+    Append sanitized API requests to a JSON lines file.
+
+    Requests hand their record to a bounded queue and a background thread serializes and
+    writes it, so the cost on the request path is building one small dict. When the writer
+    falls behind, new records are dropped and counted rather than slowing requests down.
+    Only a `sample_rate` fraction of requests is recorded, chosen deterministically by
+    request number; bodies larger than `max_body` bytes or that are not JSON are omitted.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, max_body: int = 65536,
+                 salt: Optional[bytes] = None, queue_size: int = QUEUE_SIZE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_body = max_body
+        # Random per capture unless given, so pseudonyms cannot be matched across captures
+        self.salt = salt if salt is not None else os.urandom(16)
+        self.recorded = 0
+        self.dropped = 0
+        self._seen = 0
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        logger.info("Capturing %.0f%% of API traffic to %s", self.sample_rate * 100, self.path)
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self.dropped:
+            logger.warning("Traffic capture dropped %d requests because the writer fell behind", self.dropped)
+
+    def should_record(self, path: str) -> bool:
+        if not path.startswith(CAPTURE_PATH_PREFIX):
+            return False
+        # Spread samples evenly: record whenever the running total crosses a whole number
+        self._seen += 1
+        return int(self._seen * self.sample_rate) != int((self._seen - 1) * self.sample_rate)
+
+    def record(self, scope, body: Optional[bytes], body_bytes: int, started: float,
+               status: int, duration: float) -> None:
+        """Queue one request; `body` is None when it was over the size limit."""
+        record = {
+            "ts": round(started, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if body_bytes:
+            # The body is decoded and sanitized on the writer thread
+            record["body"] = body
+            record["body_bytes"] = body_bytes
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                f.write(json.dumps(self._finish(record), separators=(",", ":")) + "\n")
+                self.recorded += 1
+                if self._queue.empty():
+                    f.flush()
+
+    def _finish(self, record: dict) -> dict:
+        if "body" not in record:
+            return record
+        body = record["body"]
+        if body is None:
+            record["body_omitted"] = "too large"
+            return record
+        try:
+            record["body"] = sanitize(json.loads(body), self.salt)
+        except ValueError:
+            record["body"] = None
+            record["body_omitted"] = "not JSON"
+        return record
+
+def read_capture(path: str) -> Iterator[dict]:
+    """Records of a capture file, in the order they were written."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# Set at startup when TRAFFIC_CAPTURE_FILE is configured
+RECORDER: Optional[TrafficRecorder] = None
+
+def start_recording(path: str, sample_rate: float = 1.0, max_body: int = 65536) -> TrafficRecorder:
+    global RECORDER
+    stop_recording()
+    RECORDER = TrafficRecorder(path, sample_rate, max_body)
+    RECORDER.start()
+    return RECORDER
+
+def stop_recording() -> None:
+    global RECORDER
+    recorder, RECORDER = RECORDER, None
+    if recorder is not None:
+        recorder.close()
@@ -0,0 +1,94 @@
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+# "production" boots without DDL: the schema must already be migrated by Aerich
+APP_ENV = os.getenv("APP_ENV", "development")
+PRODUCTION = APP_ENV == "production"
+
+# SQLite database file
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(PROJECT_DIR, "order_management.db"))
+
+# How long a connection waits for another process's write lock before failing
+SQLITE_BUSY_TIMEOUT_MS = env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+# Take the write lock when a transaction begins (BEGIN IMMEDIATE); needed with several worker processes
+SQLITE_IMMEDIATE_TRANSACTIONS = env_flag("SQLITE_IMMEDIATE_TRANSACTIONS")
+
+# Shed API requests with 503 when their route class (reads, writes, bulk) is over budget
+ADMISSION_CONTROL = env_flag("ADMISSION_CONTROL", True)
+
+# Requests of each class handled at once (0 for no limit); SQLite runs one writer at a time
+ADMISSION_READ_CONCURRENCY = env_int("ADMISSION_READ_CONCURRENCY", 32)
+ADMISSION_WRITE_CONCURRENCY = env_int("ADMISSION_WRITE_CONCURRENCY", 2)
+ADMISSION_BULK_CONCURRENCY = env_int("ADMISSION_BULK_CONCURRENCY", 2)
+
+# Requests of each class waiting for a slot before new ones are shed at once
+ADMISSION_READ_QUEUE = env_int("ADMISSION_READ_QUEUE", 64)
+ADMISSION_WRITE_QUEUE = env_int("ADMISSION_WRITE_QUEUE", 16)
+ADMISSION_BULK_QUEUE = env_int("ADMISSION_BULK_QUEUE", 8)
+
+# How long a request may wait for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT_MS = env_float("ADMISSION_QUEUE_TIMEOUT_MS", 500.0)
+
+# Retry-After header of shed requests, in seconds
+ADMISSION_RETRY_AFTER = env_int("ADMISSION_RETRY_AFTER", 1)
+
+# Queries and transactions each priority lane may run at once (0 for no limit); see app/db/lanes.py
+LANE_INTERACTIVE_CONCURRENCY = env_int("LANE_INTERACTIVE_CONCURRENCY", 0)
+LANE_BULK_CONCURRENCY = env_int("LANE_BULK_CONCURRENCY", 1)
+LANE_ADMIN_CONCURRENCY = env_int("LANE_ADMIN_CONCURRENCY", 1)
+
+# List requests asking for more rows than this run in the bulk lane
+BULK_PAGE_SIZE = env_int("BULK_PAGE_SIZE", 500)
+
+# Encode JSON responses with orjson when it is installed (same output, less CPU on large lists)
+FAST_JSON = env_flag("FAST_JSON", True)
+
+# Debug mode adds diagnostic headers to responses; never enable it in production
+DEBUG = env_flag("APP_DEBUG")
+
+# Log requests that issue more SQL queries than this
+QUERY_COUNT_LOG_THRESHOLD = env_int("QUERY_COUNT_LOG_THRESHOLD", 20)
+
+# Log a possible N+1 pattern when one statement runs this many times in a request
+N_PLUS_ONE_THRESHOLD = env_int("N_PLUS_ONE_THRESHOLD", 5)
+
+# Statements slower than this are logged with their query plan; 0 or less disables the log
+SLOW_QUERY_THRESHOLD_MS = env_float("SLOW_QUERY_THRESHOLD_MS", 100.0)
+
+# Capture EXPLAIN QUERY PLAN output for each new slow statement
+SLOW_QUERY_EXPLAIN = env_flag("SLOW_QUERY_EXPLAIN", True)
+
+# Token expected in the X-Admin-Token header by /admin endpoints; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Append sanitized API requests to this JSON lines file for replay; unset disables capture
+TRAFFIC_CAPTURE_FILE = os.getenv("TRAFFIC_CAPTURE_FILE")
+
+# Fraction of API requests to capture
+TRAFFIC_CAPTURE_SAMPLE_RATE = env_float("TRAFFIC_CAPTURE_SAMPLE_RATE", 1.0)
+
+# Request bodies larger than this many bytes are not captured
+TRAFFIC_CAPTURE_MAX_BODY = env_int("TRAFFIC_CAPTURE_MAX_BODY", 65536)
+
+# Serve the API docs (/docs, /redoc) and /openapi.json
+DOCS_ENABLED = env_flag("DOCS_ENABLED", True)
+
+# Serve the OpenAPI document from a file built at deploy time (scripts/build_openapi.py)
+OPENAPI_CACHE = env_flag("OPENAPI_CACHE", PRODUCTION)
+OPENAPI_CACHE_DIR = os.getenv("OPENAPI_CACHE_DIR", os.path.join(PROJECT_DIR, "build"))
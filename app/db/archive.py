@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from tortoise.transactions import in_transaction
+
+from app.models.models import Order
+
+# Orders in these states never change again and can be moved to the archive tables
+ARCHIVABLE_STATUSES = ("completed", "cancelled")
+
+# Orders older than this many days are archived by default
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+
+# Orders moved per transaction, kept below SQLite's bound parameter limit
+DEFAULT_ARCHIVE_BATCH_SIZE = 500
+
+ORDER_COLUMNS = (
+    '"id", "customer_id", "order_date", "status", "total_amount", '
+    '"item_count", "total_quantity", "item_summary", "created_at", "updated_at"'
+)
+ORDER_ITEM_COLUMNS = '"id", "order_id", "product_id", "quantity", "unit_price", "subtotal", "created_at", "updated_at"'
+
+async def archive_order_batch(
+    cutoff: datetime,
+    statuses: Iterable[str] = ARCHIVABLE_STATUSES,
+    batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Move one batch of finished orders placed before `cutoff` into the archive tables.
+
+    Orders and their items are copied with INSERT ... SELECT and deleted from the hot
+    tables in the same transaction. Returns the number of orders moved.
+    """
+    async with in_transaction() as connection:
+        order_ids = await Order.filter(
+            status__in=list(statuses), order_date__lt=cutoff
+        ).order_by("id").limit(batch_size).using_db(connection).values_list("id", flat=True)
+        if not order_ids:
+            return 0
+
+        placeholders = ", ".join("?" for _ in order_ids)
+        await connection.execute_query(
+            f'INSERT INTO "order_archive" ({ORDER_COLUMNS}, "archived_at") '
+            f'SELECT {ORDER_COLUMNS}, ? FROM "order" WHERE "id" IN ({placeholders})',
+            [datetime.now(timezone.utc), *order_ids]
+        )
+        await connection.execute_query(
+            f'INSERT INTO "order_items_archive" ({ORDER_ITEM_COLUMNS}) '
+            f'SELECT {ORDER_ITEM_COLUMNS} FROM "order_items" WHERE "order_id" IN ({placeholders})',
+            order_ids
+        )
+        await connection.execute_query(f'DELETE FROM "order_items" WHERE "order_id" IN ({placeholders})', order_ids)
+        await connection.execute_query(f'DELETE FROM "order" WHERE "id" IN ({placeholders})', order_ids)
+    return len(order_ids)
+
+async def archive_orders(
+    older_than_days: int = DEFAULT_ARCHIVE_AFTER_DAYS,
+    statuses: Iterable[str] = ARCHIVABLE_STATUSES,
+    batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Archive all finished orders older than `older_than_days`, one batch per transaction.
+
+    Short transactions keep the SQLite write lock available to request handlers
+    between batches. Returns the total number of orders moved.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    statuses = tuple(statuses)
+    total = 0
+    while True:
+        moved = await archive_order_batch(cutoff, statuses, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
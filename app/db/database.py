@@ -1,24 +1,120 @@
 from tortoise import Tortoise, fields
+from tortoise.exceptions import OperationalError, TransactionManagementError
 from tortoise.models import Model
 from tortoise import run_async
+from tortoise.backends.sqlite.client import SqliteTransactionWrapper
 from tortoise.transactions import in_transaction
+from typing import Optional
 import os
+import sqlite3
+
+from app import config
+from app.db import instrumentation
+from app.db.slow_queries import SLOW_QUERY_LOG
+from app.startup import STARTUP
 
 # Get the absolute path to the project root directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# SQLite database URL with absolute path
-DATABASE_URL = f"sqlite://{os.path.join(BASE_DIR, 'order_management.db')}"
+# SQLite database URL with absolute path (DATABASE_PATH, default order_management.db in the project root)
+DATABASE_URL = f"sqlite://{config.DATABASE_PATH}"
 # Keep the old name for backward compatibility with existing code
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
+# Aerich migration files and the app name it records versions under (see aerich.ini)
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations", "models")
+AERICH_APP = "models"
+
+def migration_command(db_url: str = DATABASE_URL):
+    """Aerich command for the project's migrations, whatever the working directory."""
+    # Imported here: only the migration scripts need Aerich
+    from aerich import Command
+    return Command(
+        tortoise_config={
+            "connections": {"default": db_url},
+            "apps": {
+                AERICH_APP: {
+                    "models": ["app.models.models", "aerich.models"],
+                    "default_connection": "default",
+                },
+            },
+        },
+        app=AERICH_APP,
+        location=os.path.dirname(MIGRATIONS_DIR),
+    )
+
+class SchemaVersionError(RuntimeError):
+    """The database has not been migrated to the schema this code expects."""
+
+def latest_migration() -> Optional[str]:
+    """File name of the newest migration, which Aerich records as the version once applied."""
+    versions = [
+        name for name in os.listdir(MIGRATIONS_DIR)
+        if name.endswith(".py") and name.split("_", 1)[0].isdigit()
+    ]
+    return max(versions, key=lambda name: int(name.split("_", 1)[0]), default=None)
+
+async def check_schema_version() -> str:
+    """Fail unless the newest migration is the last one Aerich applied, using a single query."""
+    expected = latest_migration()
+    try:
+        rows = await Tortoise.get_connection("default").execute_query_dict(
+            'SELECT "version" FROM "aerich" WHERE "app" = ? ORDER BY "id" DESC LIMIT 1', [AERICH_APP]
+        )
+    except OperationalError:
+        # No aerich table: the database was never migrated
+        rows = []
+    current = rows[0]["version"] if rows else None
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {current or 'no recorded version'}, expected {expected}; "
+            "run `python scripts/run_migrations.py upgrade`"
+        )
+    return current
+
+async def _begin_immediate(self) -> None:
+    # Same as SqliteTransactionWrapper.begin, but takes the write lock up front
+    try:
+        await self._connection.commit()
+        await self._connection.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError as exc:
+        raise TransactionManagementError(exc)
+
+def use_immediate_transactions() -> None:
+    """
+    Start transactions with BEGIN IMMEDIATE.
+
+    With several processes on one database file, a deferred transaction that reads and
+    then writes fails with "database is locked" as soon as another process has written
+    in between, and SQLite cannot wait that conflict out. Taking the write lock when the
+    transaction begins makes the transaction wait up to the busy timeout instead.
+    """
+    SqliteTransactionWrapper.begin = _begin_immediate
+
 # Dependency to get DB session
 async def init():
+    if config.SQLITE_IMMEDIATE_TRANSACTIONS:
+        use_immediate_transactions()
     await Tortoise.init(
-        db_url=DATABASE_URL,
+        # Wait for other processes' write locks instead of failing at once
+        db_url=f"{DATABASE_URL}?busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}",
         modules={"models": ["app.models.models"]}
     )
-    await Tortoise.generate_schemas()
+    STARTUP.mark("orm_init")
+    if config.PRODUCTION:
+        # Migrations own the schema in production; only confirm they have run
+        try:
+            await check_schema_version()
+        except SchemaVersionError:
+            # Close the connection thread so the process can exit
+            await Tortoise.close_connections()
+            raise
+        STARTUP.mark("schema_check")
+    else:
+        await Tortoise.generate_schemas()
+        STARTUP.mark("generate_schemas")
+    if config.SLOW_QUERY_THRESHOLD_MS > 0:
+        instrumentation.set_slow_query_log(SLOW_QUERY_LOG)
 
 async def close():
     await Tortoise.close_connections()
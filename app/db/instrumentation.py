@@ -0,0 +1,126 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from tortoise.backends.sqlite.client import SqliteClient, SqliteTransactionContext, SqliteTransactionWrapper
+
+class QueryStats:
+    """Database activity recorded for one unit of work, usually a request."""
+
+    __slots__ = ("scope", "queries", "query_time", "transactions", "transaction_wait", "lane_wait", "statements")
+
+    def __init__(self, scope: Optional[dict] = None):
+        # ASGI scope of the request, used to attribute slow queries to a route
+        self.scope = scope
+        self.queries = 0
+        self.query_time = 0.0
+        self.transactions = 0
+        self.transaction_wait = 0.0
+        # Time spent waiting for a slot in the request's priority lane; see app/db/lanes.py
+        self.lane_wait = 0.0
+        # SQL text -> times run. Tortoise binds values as parameters, so a statement
+        # repeated many times in one request is the signature of an N+1 pattern
+        self.statements: Dict[str, int] = {}
+
+    def record(self, query: str, elapsed: float) -> None:
+        self.queries += 1
+        self.query_time += elapsed
+        self.statements[query] = self.statements.get(query, 0) + 1
+
+    def repeated_statements(self, threshold: int) -> List[tuple]:
+        """(SQL, count) of statements run at least `threshold` times, most repeated first."""
+        repeated = [(query, count) for query, count in self.statements.items() if count >= threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+# Stats of the request being handled; concurrent tasks started by the request (e.g.
+# prefetches run with asyncio.gather) copy the context and add to the same object
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_stats", default=None)
+
+# Client methods that send SQL to the database
+QUERY_METHODS = ("execute_insert", "execute_many", "execute_query", "execute_query_dict", "execute_script")
+
+# Process-wide recorders from capture_queries(), which see queries from any task or thread
+_captures: List[QueryStats] = []
+
+# Receives queries slower than its threshold; see app/db/slow_queries.py
+_slow_query_log = None
+
+_installed = False
+
+@contextmanager
+def track_queries():
+    """Record the database activity of the enclosed block into a new QueryStats."""
+    stats = QueryStats()
+    token = current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_stats.reset(token)
+
+@contextmanager
+def capture_queries():
+    """
+    Record every query run in the process during the enclosed block.
+
+    Unlike track_queries() this does not rely on the context, so it also sees queries
+    run by TestClient, which handles requests on its own thread and event loop.
+    """
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+def set_slow_query_log(slow_query_log) -> None:
+    """Send queries slower than `slow_query_log.threshold` seconds to `slow_query_log.record()`."""
+    global _slow_query_log
+    _slow_query_log = slow_query_log
+
+def _wrap_query(method):
+    async def wrapper(self, query, *args, **kwargs):
+        stats = current_stats.get()
+        if stats is None and not _captures and _slow_query_log is None:
+            return await method(self, query, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if stats is not None:
+                stats.record(query, elapsed)
+            for capture in _captures:
+                capture.record(query, elapsed)
+            if _slow_query_log is not None and elapsed >= _slow_query_log.threshold:
+                values = args[0] if args else kwargs.get("values")
+                await _slow_query_log.record(self, query, values, elapsed, stats)
+    wrapper.__wrapped__ = method
+    return wrapper
+
+def _wrap_transaction_enter(method):
+    async def wrapper(self):
+        stats = current_stats.get()
+        if stats is None:
+            return await method(self)
+        # SQLite has one connection, so opening a transaction waits for any other
+        # transaction to finish first
+        started = time.perf_counter()
+        connection = await method(self)
+        stats.transactions += 1
+        stats.transaction_wait += time.perf_counter() - started
+        return connection
+    wrapper.__wrapped__ = method
+    return wrapper
+
+def install():
+    """Hook the SQLite client so queries run while tracking are counted and timed."""
+    global _installed
+    if _installed:
+        return
+    for client_class in (SqliteClient, SqliteTransactionWrapper):
+        for name in QUERY_METHODS:
+            # Only wrap methods the class defines itself, so nothing is counted twice
+            if name in vars(client_class):
+                setattr(client_class, name, _wrap_query(vars(client_class)[name]))
+    SqliteTransactionContext.__aenter__ = _wrap_transaction_enter(SqliteTransactionContext.__aenter__)
+    _installed = True
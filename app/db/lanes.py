@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from tortoise.backends.sqlite.client import SqliteClient, SqliteTransactionWrapper
+
+from app import config
+from app.admission import Budget
+from app.db.instrumentation import QUERY_METHODS, current_stats
+
+# Priority lanes: checkout and other user-facing requests, back-office batch work, operations
+INTERACTIVE = "interactive"
+BULK = "bulk"
+ADMIN = "admin"
+
+# Database work each lane may have running or queued on the connection at once
+LANES: Dict[str, Budget] = {
+    INTERACTIVE: Budget(INTERACTIVE, config.LANE_INTERACTIVE_CONCURRENCY),
+    BULK: Budget(BULK, config.LANE_BULK_CONCURRENCY),
+    ADMIN: Budget(ADMIN, config.LANE_ADMIN_CONCURRENCY),
+}
+
+# Lane of the request being handled; None (scripts, startup) runs unscheduled
+current_lane: ContextVar[Optional[Budget]] = ContextVar("current_lane", default=None)
+
+_installed = False
+
+async def _wait_for_slot(lane: Budget) -> None:
+    started = time.perf_counter()
+    await lane.acquire(None)
+    stats = current_stats.get()
+    if stats is not None:
+        stats.lane_wait += time.perf_counter() - started
+
+def _wrap_query(method):
+    async def wrapper(self, query, *args, **kwargs):
+        lane = current_lane.get()
+        # Inside a transaction, which holds the slot already (see install())
+        if lane is None or lane.concurrency <= 0 or isinstance(self, SqliteTransactionWrapper):
+            return await method(self, query, *args, **kwargs)
+        await _wait_for_slot(lane)
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            lane.release()
+    wrapper.__wrapped__ = method
+    return wrapper
+
+class LaneTransactionContext:
+    """Holds a slot of the lane for the whole transaction, taken before the connection lock."""
+
+    __slots__ = ("context", "lane")
+
+    def __init__(self, context, lane: Budget):
+        self.context = context
+        self.lane = lane
+
+    async def __aenter__(self):
+        await _wait_for_slot(self.lane)
+        try:
+            return await self.context.__aenter__()
+        except BaseException:
+            self.lane.release()
+            raise
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return await self.context.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.lane.release()
+
+def _wrap_in_transaction(method):
+    def wrapper(self):
+        lane = current_lane.get()
+        if lane is None or lane.concurrency <= 0:
+            return method(self)
+        return LaneTransactionContext(method(self), lane)
+    wrapper.__wrapped__ = method
+    return wrapper
+
+def install():
+    """
+    Schedule database work by the lane of the request it runs for.
+
+    SQLite runs everything on one connection, first come first served, so a bulk
+    request with many large queries in flight delays every checkout behind them. Here
+    each query, and each transaction as a whole, first takes a slot in its lane's
+    budget. A lane with a budget of 1 never has more than one statement or transaction
+    ahead of an interactive one. Queries inside a transaction are not scheduled on their
+    own: they already hold the transaction's slot and the connection, and making them
+    wait for another slot could deadlock with queries that hold a slot while they wait
+    for the connection.
+    """
+    global _installed
+    if _installed:
+        return
+    for name in QUERY_METHODS:
+        if name in vars(SqliteClient):
+            setattr(SqliteClient, name, _wrap_query(vars(SqliteClient)[name]))
+    SqliteClient._in_transaction = _wrap_in_transaction(SqliteClient._in_transaction)
+    _installed = True
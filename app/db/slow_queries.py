@@ -0,0 +1,142 @@
+import logging
+import math
+import re
+from collections import deque
+from typing import Dict, List, Optional
+
+from app import config
+from app.db.instrumentation import QueryStats
+
+logger = logging.getLogger(__name__)
+
+# Durations kept per fingerprint for percentiles
+SAMPLE_SIZE = 1000
+# Distinct fingerprints kept; further new statements are counted but not stored
+MAX_FINGERPRINTS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+def fingerprint(query: str) -> str:
+    """Normalize a statement so the same query shape with different values aggregates together."""
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    # IN lists of any length share one fingerprint
+    query = _PLACEHOLDER_LIST.sub("?, ...", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+def redact(values) -> Optional[list]:
+    """Keep numbers and NULLs, which help explain a plan; hide text and anything else that may be personal data."""
+    if values is None:
+        return None
+    if values and isinstance(values[0], (list, tuple)):
+        # execute_many: show the first row only
+        values = values[0]
+    return [
+        value if value is None or isinstance(value, (bool, int, float)) else f"<{type(value).__name__}>"
+        for value in values
+    ]
+
+def route_of(stats: Optional[QueryStats]) -> str:
+    if stats is None or stats.scope is None:
+        return "<no request>"
+    scope = stats.scope
+    endpoint = scope.get("endpoint")
+    name = f" ({endpoint.__name__})" if endpoint is not None else ""
+    return f'{scope["method"]} {scope["path"]}{name}'
+
+class SlowQuery:
+    """Aggregate of the slow executions of one statement fingerprint."""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.routes: Dict[str, int] = {}
+        self.last_sql = ""
+        self.last_params: Optional[list] = None
+        self.plan: List[str] = []
+
+    def add(self, query: str, params: Optional[list], route: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.samples.append(elapsed)
+        self.routes[route] = self.routes.get(route, 0) + 1
+        self.last_sql = query
+        self.last_params = params
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "last_sql": self.last_sql,
+            "last_params": self.last_params,
+            "routes": self.routes,
+            "plan": self.plan,
+        }
+
+class SlowQueryLog:
+    """
+    Log and aggregate statements slower than `threshold` seconds.
+
+    The query plan is captured with EXPLAIN QUERY PLAN the first time a fingerprint is
+    seen, on the same connection, so later occurrences only cost the bookkeeping.
+    """
+
+    def __init__(self, threshold: float, explain: bool = True):
+        self.threshold = threshold
+        self.explain = explain
+        self.queries: Dict[str, SlowQuery] = {}
+        self.dropped = 0
+
+    async def record(self, client, query: str, values, elapsed: float, stats: Optional[QueryStats]) -> None:
+        key = fingerprint(query)
+        params = redact(values)
+        route = route_of(stats)
+        logger.warning("Slow query (%.1f ms) in %s: %s params=%s", elapsed * 1000, route, query, params)
+
+        entry = self.queries.get(key)
+        if entry is None:
+            if len(self.queries) >= MAX_FINGERPRINTS:
+                self.dropped += 1
+                return
+            entry = self.queries[key] = SlowQuery(key)
+            if self.explain:
+                entry.plan = await self.query_plan(client, query, values)
+                logger.warning("Query plan for %s:\n  %s", key, "\n  ".join(entry.plan))
+        entry.add(query, params, route, elapsed)
+
+    async def query_plan(self, client, query: str, values) -> List[str]:
+        if values and isinstance(values[0], (list, tuple)):
+            values = values[0]
+        try:
+            # Uses the raw connection so the EXPLAIN is not itself counted or logged
+            async with client.acquire_connection() as connection:
+                rows = await connection.execute_fetchall(f"EXPLAIN QUERY PLAN {query}", values or [])
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        return [row[3] for row in rows]
+
+    def summary(self) -> List[dict]:
+        """Aggregated slow statements, the most total time first."""
+        entries = sorted(self.queries.values(), key=lambda entry: entry.total, reverse=True)
+        return [entry.to_dict() for entry in entries]
+
+    def reset(self) -> None:
+        self.queries.clear()
+        self.dropped = 0
+
+SLOW_QUERY_LOG = SlowQueryLog(config.SLOW_QUERY_THRESHOLD_MS / 1000, config.SLOW_QUERY_EXPLAIN)
@@ -0,0 +1,106 @@
+from typing import AsyncIterator, Dict, List, Optional
+from tortoise import Tortoise
+
+# Row sources for the inspection scripts. Each query exposes an "id" column, which
+# is used for keyset paging, and output column names that `where` clauses can use.
+TABLE_QUERIES: Dict[str, str] = {
+    "customers": (
+        'SELECT "id", "name", "email", "phone", "address", "notes", "created_at" FROM "customer"'
+    ),
+    "products": (
+        'SELECT "id", "name", "description", "price", "sku", "created_at" FROM "product"'
+    ),
+    "inventory": (
+        'SELECT "i"."id", "i"."product_id", "p"."name" AS "product_name", "i"."quantity", '
+        '"i"."last_restock_date" FROM "inventory" AS "i" JOIN "product" AS "p" ON "p"."id" = "i"."product_id"'
+    ),
+    "orders": (
+        'SELECT "o"."id", "o"."customer_id", "c"."name" AS "customer_name", "o"."order_date", "o"."status", '
+        '"o"."total_amount", "o"."item_count" FROM "order" AS "o" JOIN "customer" AS "c" ON "c"."id" = "o"."customer_id"'
+    ),
+    "order_items": (
+        'SELECT "oi"."id", "oi"."order_id", "oi"."product_id", "p"."name" AS "product_name", "oi"."quantity", '
+        '"oi"."unit_price", "oi"."subtotal" FROM "order_items" AS "oi" JOIN "product" AS "p" ON "p"."id" = "oi"."product_id"'
+    ),
+}
+
+# Base table behind each query, used for fast unfiltered counts
+TABLE_NAMES = {
+    "customers": "customer",
+    "products": "product",
+    "inventory": "inventory",
+    "orders": "order",
+    "order_items": "order_items",
+}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+async def count_rows(table: str, where: Optional[str] = None) -> int:
+    """Count the rows of a table in SQL, optionally restricted by a WHERE clause."""
+    connection = Tortoise.get_connection("default")
+    if where:
+        sql = f'SELECT COUNT(*) AS "count" FROM ({TABLE_QUERIES[table]}) AS "t" WHERE {where}'
+    else:
+        sql = f'SELECT COUNT(*) AS "count" FROM "{TABLE_NAMES[table]}"'
+    rows = await connection.execute_query_dict(sql)
+    return rows[0]["count"]
+
+async def stream_rows(
+    table: str,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[List[dict]]:
+    """
+    Yield the rows of a table in id order, one chunk at a time.
+
+    `where` is a raw SQL condition over the query's output columns; these are local
+    inspection tools, so it is trusted input. Only the first chunk uses OFFSET; later
+    chunks continue after the last id seen, so memory and per-chunk cost stay flat.
+    """
+    connection = Tortoise.get_connection("default")
+    condition = f"({where})" if where else "1"
+    last_id = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        if last_id is None:
+            sql = (
+                f'SELECT * FROM ({TABLE_QUERIES[table]}) AS "t" WHERE {condition} '
+                f'ORDER BY "id" LIMIT ? OFFSET ?'
+            )
+            values = [size, offset]
+        else:
+            sql = (
+                f'SELECT * FROM ({TABLE_QUERIES[table]}) AS "t" WHERE {condition} AND "id" > ? '
+                f'ORDER BY "id" LIMIT ?'
+            )
+            values = [last_id, size]
+
+        rows = await connection.execute_query_dict(sql, values)
+        if not rows:
+            return
+        yield rows
+
+        last_id = rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
+
+async def fetch_order_items(order_ids: List[int]) -> Dict[int, List[dict]]:
+    """Fetch the items of a chunk of orders in one query, grouped by order id."""
+    items: Dict[int, List[dict]] = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return items
+    connection = Tortoise.get_connection("default")
+    placeholders = ", ".join("?" for _ in order_ids)
+    rows = await connection.execute_query_dict(
+        f'SELECT * FROM ({TABLE_QUERIES["order_items"]}) AS "t" '
+        f'WHERE "order_id" IN ({placeholders}) ORDER BY "order_id", "id"',
+        list(order_ids)
+    )
+    for row in rows:
+        items[row["order_id"]].append(row)
+    return items
@@ -1,25 +1,64 @@
+# Imported first so the startup timer covers every other import
+from app.startup import STARTUP
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import datetime
 
-from app.api.routes import customers, products, orders, inventory
+from app.api.routes import customers, products, orders, inventory, admin
 from app.api.routes.v2 import products as products_v2
+from app.api.utils import MISSING_IDS_HEADER
+from app import capture, config
 from app.db.database import init, close
+from app.db import instrumentation, lanes
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.capture import TrafficCaptureMiddleware
+from app.middleware.lanes import PriorityLaneMiddleware
+from app.middleware.metrics import MetricsMiddleware, REGISTRY
+from app.middleware.query_count import QueryCountMiddleware
+from app.middleware.profiling import ProfileMiddleware
+from app.openapi import DOCS_URL, SchemaCache, add_docs_routes, cache_path
+from app.responses import json_response_class
+
+# Count and time SQL queries per request for the metrics below
+instrumentation.install()
+# Schedule database work by priority lane (interactive, bulk, admin)
+lanes.install()
+
+STARTUP.mark("imports")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup code here
+    STARTUP.mark("server_setup")
     await init()  # Initialize Tortoise ORM
+    if config.TRAFFIC_CAPTURE_FILE:
+        capture.start_recording(
+            config.TRAFFIC_CAPTURE_FILE, config.TRAFFIC_CAPTURE_SAMPLE_RATE, config.TRAFFIC_CAPTURE_MAX_BODY
+        )
+    if config.DOCS_ENABLED and config.OPENAPI_CACHE:
+        OPENAPI_SCHEMA.load()
+        STARTUP.mark("openapi")
+    STARTUP.report()
+    REGISTRY.record_startup(STARTUP.phases)
     yield
     # Shutdown code here
+    capture.stop_recording()  # Flush captured traffic
     await close()  # Close Tortoise ORM connections
 
 app = FastAPI(
     title="Order Management System",
     description="A simple API for managing orders, customers, products, and inventory",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Encodes every route's JSON response (FAST_JSON)
+    default_response_class=json_response_class(config.FAST_JSON),
+    # Served by add_docs_routes below from a pre-serialized schema
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
 # Configure CORS
@@ -29,8 +68,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let cross-origin clients read which ids a batch lookup could not find
+    expose_headers=[MISSING_IDS_HEADER],
 )
 
+# Opt-in per-request profiling with the X-Profile header
+app.add_middleware(ProfileMiddleware)
+
+# Query count headers (debug mode) and logging of query-heavy and N+1 requests
+app.add_middleware(QueryCountMiddleware)
+
+# Pick each request's priority lane for the database scheduler
+app.add_middleware(PriorityLaneMiddleware)
+
+# Shed API requests with 503 when reads or writes are over budget, before any other work
+app.add_middleware(AdmissionControlMiddleware)
+
+# Opt-in capture of API traffic for replay (TRAFFIC_CAPTURE_FILE); outside admission
+# control so shed requests and admission waits are captured as clients saw them
+app.add_middleware(TrafficCaptureMiddleware)
+
+# Added last so it wraps the other middleware and times the whole request
+app.add_middleware(MetricsMiddleware)
+
 # API version prefixes
 API_V1_PREFIX = "/api/v1"
 API_V2_PREFIX = "/api/v2"
@@ -44,11 +104,19 @@ app.include_router(inventory.router, prefix=f"{API_V1_PREFIX}/inventory", tags=[
 # Include v2 routers
 app.include_router(products_v2.router, prefix=f"{API_V2_PREFIX}/products", tags=["products-v2"])
 
+# Operational endpoints, enabled by setting ADMIN_TOKEN
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/", tags=["root"])
 async def root():
     return {
         "message": "Welcome to the Order Management System API",
-        "docs": "/docs",
+        "docs": DOCS_URL if config.DOCS_ENABLED else None,
         "endpoints": {
             "v1": [
                 f"{API_V1_PREFIX}/customers",
@@ -61,4 +129,11 @@ async def root():
             ]
         },
         "versions": ["v1", "v2"]
-    } 
\ No newline at end of file
+    } 
+
+# The OpenAPI document is built (or read from the deploy-time cache) once per process
+OPENAPI_SCHEMA = SchemaCache(app, cache_path(app) if config.OPENAPI_CACHE else None)
+if config.DOCS_ENABLED:
+    add_docs_routes(app, OPENAPI_SCHEMA)
+
+STARTUP.mark("routers")
@@ -0,0 +1,93 @@
+import json
+import time
+from typing import Dict, Optional
+
+from app import config
+from app.admission import Budget
+from app.db.lanes import BULK
+from app.middleware.lanes import lane_for
+from app.middleware.metrics import LATENCY_BUCKETS, REGISTRY, MetricsRegistry, observe
+
+# Route classes: writes contend for SQLite's single writer, reads do not, and bulk
+# requests (the bulk priority lane) are budgeted apart from both
+READ = "read"
+WRITE = "write"
+
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+OVERLOADED_BODY = json.dumps({"detail": "Service overloaded, retry later"}).encode()
+
+def default_budgets() -> Dict[str, Budget]:
+    return {
+        READ: Budget(READ, config.ADMISSION_READ_CONCURRENCY, config.ADMISSION_READ_QUEUE),
+        WRITE: Budget(WRITE, config.ADMISSION_WRITE_CONCURRENCY, config.ADMISSION_WRITE_QUEUE),
+        BULK: Budget(BULK, config.ADMISSION_BULK_CONCURRENCY, config.ADMISSION_BULK_QUEUE),
+    }
+
+def route_class(scope) -> Optional[str]:
+    """Budget a request counts against; None for everything outside the API (metrics, docs, admin)."""
+    if not scope["path"].startswith("/api/"):
+        return None
+    # Bulk requests wait for the bulk lane's database slot; in the read or write budget
+    # they would hold slots that interactive requests need while they wait
+    if lane_for(scope) == BULK:
+        return BULK
+    return READ if scope["method"] in SAFE_METHODS else WRITE
+
+class AdmissionControlMiddleware:
+    """
+    Shed API requests with 503 and Retry-After when their route class is over budget.
+
+    Each class (reads, writes, bulk) may run a limited number of requests at once. Excess
+    requests wait in a bounded queue for at most config.ADMISSION_QUEUE_TIMEOUT_MS, and
+    are rejected when the queue is full or the wait runs out. Rejecting early keeps the
+    latency of admitted requests bounded while the database is saturated, instead of
+    every request slowing down until clients time out. Queue waits, in-flight and queued
+    requests, and shed counts per class are exported in /metrics.
+    """
+
+    def __init__(self, app, budgets: Optional[Dict[str, Budget]] = None,
+                 queue_timeout: Optional[float] = None, retry_after: Optional[int] = None,
+                 registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.budgets = budgets if budgets is not None else default_budgets()
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None else config.ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        )
+        self.retry_after = str(retry_after if retry_after is not None else config.ADMISSION_RETRY_AFTER).encode()
+        self.registry = registry
+        self._wait_series = {name: registry.admission_wait.series((name,)) for name in self.budgets}
+        registry.track_budgets(self.budgets.values(), registry.admission_in_flight, registry.admission_queued)
+
+    async def __call__(self, scope, receive, send):
+        budget = None
+        if scope["type"] == "http" and config.ADMISSION_CONTROL:
+            budget = self.budgets.get(route_class(scope))
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        shed_reason = await budget.acquire(self.queue_timeout)
+        observe(LATENCY_BUCKETS, self._wait_series[budget.name], time.perf_counter() - started)
+        if shed_reason is not None:
+            self.registry.shed.inc((budget.name, shed_reason))
+            await self.reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+
+    async def reject(self, send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(OVERLOADED_BODY)).encode()),
+                (b"retry-after", self.retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": OVERLOADED_BODY})
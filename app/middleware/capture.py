@@ -0,0 +1,66 @@
+import time
+
+from app import capture
+
+class TrafficCaptureMiddleware:
+    """
+    Record API requests for replay when a traffic capture is running.
+
+    Does nothing unless TRAFFIC_CAPTURE_FILE is set, in which case the app starts a
+    TrafficRecorder at startup. The request body is copied as it is received, up to the
+    recorder's size limit, and the record is queued once the response has been sent.
+    It runs outside admission control, so shed requests are recorded too, with their
+    503 and the time they waited; their body is read before the response goes out, as
+    the app never reads it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        recorder = capture.RECORDER
+        if scope["type"] != "http" or recorder is None or not recorder.should_record(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        size = 0
+        truncated = False
+        body_read = False
+        status_code = 500
+
+        async def receive_wrapper():
+            nonlocal size, truncated, body_read
+            message = await receive()
+            if message["type"] == "http.request":
+                body_read = not message.get("more_body", False)
+                if not truncated:
+                    body = message.get("body", b"")
+                    size += len(body)
+                    if size > recorder.max_body:
+                        truncated = True
+                        chunks.clear()
+                    else:
+                        chunks.append(body)
+            else:
+                body_read = True
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Answered without reading the body (e.g. shed): read it while the request is open
+                while not body_read:
+                    await receive_wrapper()
+            await send(message)
+
+        started_wall = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            recorder.record(
+                scope, None if truncated else b"".join(chunks), size, started_wall, status_code,
+                time.perf_counter() - started
+            )
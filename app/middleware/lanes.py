@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from app import config
+from app.admission import Budget
+from app.db.lanes import ADMIN, BULK, INTERACTIVE, LANES, current_lane
+from app.middleware.metrics import REGISTRY, MetricsRegistry
+
+LANE_HEADER = b"x-priority-lane"
+
+# Routes that are batch work whatever their parameters
+BULK_ROUTES = frozenset((
+    ("POST", "/api/v1/products/bulk"),
+    ("POST", "/api/v1/inventory/adjustments"),
+))
+
+def page_size(scope) -> Optional[int]:
+    query_string = scope.get("query_string", b"")
+    if b"limit=" not in query_string:
+        return None
+    values = parse_qs(query_string.decode("latin-1")).get("limit")
+    try:
+        return int(values[-1]) if values else None
+    except ValueError:
+        return None
+
+def lane_for(scope) -> str:
+    """
+    Pick the priority lane of a request.
+
+    /admin is always the admin lane. Bulk routes and list requests for more than
+    config.BULK_PAGE_SIZE rows are bulk. Anything else is interactive unless the client
+    sends `X-Priority-Lane: bulk`; the header can move a request into the bulk lane but
+    never out of it.
+    """
+    path = scope["path"]
+    if path.startswith("/admin"):
+        return ADMIN
+    if (scope["method"], path) in BULK_ROUTES:
+        return BULK
+    size = page_size(scope)
+    if size is not None and size > config.BULK_PAGE_SIZE:
+        return BULK
+    for name, value in scope["headers"]:
+        if name == LANE_HEADER:
+            return BULK if value.strip().lower() == BULK.encode() else INTERACTIVE
+    return INTERACTIVE
+
+class PriorityLaneMiddleware:
+    """
+    Run each request's database work in its priority lane (see app/db/lanes.py).
+
+    Back-office jobs such as exports, large order pages and inventory sweeps share the
+    one SQLite connection with checkout. Their queries are limited to the bulk lane's
+    budget, so interactive requests wait behind at most that many of them. Waits are
+    exported per route as `db_lane_wait_seconds`, and lane occupancy as `db_lane_in_flight`
+    and `db_lane_queued`.
+    """
+
+    def __init__(self, app, lanes: Optional[Dict[str, Budget]] = None, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.lanes = lanes if lanes is not None else LANES
+        registry.track_budgets(self.lanes.values(), registry.lane_in_flight, registry.lane_queued)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_lane.set(self.lanes[lane_for(scope)])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_lane.reset(token)
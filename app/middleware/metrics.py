@@ -0,0 +1,256 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from app.db.instrumentation import QueryStats, current_stats
+
+# Latency buckets in seconds, and buckets for queries issued per request
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Route label for requests that did not match any route, to keep label cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, label_values: LabelValues = (), amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {format_value(value)}")
+        return lines
+
+class Gauge(Counter):
+    def dec(self, label_values: LabelValues = (), amount: float = 1) -> None:
+        self.inc(label_values, -amount)
+
+    def set(self, label_values: LabelValues, value: float) -> None:
+        self.values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self.values: Dict[LabelValues, list] = {}
+
+    def series(self, label_values: LabelValues) -> list:
+        """Return the mutable [bucket counts, sum, count] of one label set, creating it if needed."""
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        return series
+
+    def observe(self, label_values: LabelValues, value: float) -> None:
+        observe(self.buckets, self.series(label_values), value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                labels = format_labels(self.labels + ("le",), label_values + (format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def observe(buckets: Tuple[float, ...], series: list, value: float) -> None:
+    # Counts are stored per bucket and made cumulative when rendered
+    series[0][bisect_left(buckets, value)] += 1
+    series[1] += value
+    series[2] += 1
+
+def format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """In-process metrics of one worker, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route")
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+        self.db_queries = Histogram(
+            "db_queries_per_request", "SQL queries issued per HTTP request.", ("method", "route"),
+            buckets=QUERY_COUNT_BUCKETS
+        )
+        self.db_time = Histogram(
+            "db_query_duration_seconds_per_request", "Time spent in SQL queries per HTTP request.",
+            ("method", "route")
+        )
+        self.db_transaction_wait = Histogram(
+            "db_transaction_wait_seconds", "Time spent waiting to open a database transaction, per request.",
+            ("method", "route")
+        )
+        self.startup = Gauge("app_startup_duration_seconds", "Time spent in each startup phase.", ("phase",))
+        self.admission_in_flight = Gauge(
+            "http_admission_in_flight", "Admitted requests being handled, per route class.", ("class",)
+        )
+        self.admission_queued = Gauge(
+            "http_admission_queued", "Requests waiting for admission, per route class.", ("class",)
+        )
+        self.admission_wait = Histogram(
+            "http_admission_wait_seconds", "Time requests waited for admission, per route class.", ("class",)
+        )
+        self.shed = Counter(
+            "http_requests_shed_total", "Requests rejected with 503 because their route class was over budget.",
+            ("class", "reason")
+        )
+        self.db_lane_wait = Histogram(
+            "db_lane_wait_seconds", "Time spent per request waiting for a slot in its priority lane.",
+            ("method", "route")
+        )
+        self.lane_in_flight = Gauge(
+            "db_lane_in_flight", "Queries and transactions running or queued on the connection, per lane.", ("lane",)
+        )
+        self.lane_queued = Gauge("db_lane_queued", "Queries and transactions waiting for a lane slot.", ("lane",))
+        # (budget, in-flight gauge, queued gauge) of budgets whose counts are read when rendering
+        self.budgets = []
+        self.metrics = [
+            self.requests, self.latency, self.in_flight,
+            self.db_queries, self.db_time, self.db_transaction_wait, self.startup,
+            self.admission_in_flight, self.admission_queued, self.admission_wait, self.shed,
+            self.db_lane_wait, self.lane_in_flight, self.lane_queued,
+        ]
+
+    def track_budgets(self, budgets: Iterable, in_flight: Gauge, queued: Gauge) -> None:
+        self.budgets.extend((budget, in_flight, queued) for budget in budgets)
+
+    def record_startup(self, phases: Dict[str, float]) -> None:
+        for phase, seconds in phases.items():
+            self.startup.set((phase,), seconds)
+
+    def render(self) -> str:
+        for budget, in_flight, queued in self.budgets:
+            in_flight.set((budget.name,), budget.in_flight)
+            queued.set((budget.name,), budget.queued)
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+class RouteSeries:
+    """The series of one (method, route) pair, resolved once so recording a request is cheap."""
+
+    __slots__ = (
+        "registry", "labels", "request_labels", "latency", "db_queries", "db_time", "db_transaction_wait",
+        "db_lane_wait",
+    )
+
+    def __init__(self, registry: MetricsRegistry, labels: LabelValues):
+        self.registry = registry
+        self.labels = labels
+        # status code -> label values of the request counter
+        self.request_labels: Dict[int, LabelValues] = {}
+        self.latency = registry.latency.series(labels)
+        self.db_queries = registry.db_queries.series(labels)
+        self.db_time = registry.db_time.series(labels)
+        self.db_transaction_wait = registry.db_transaction_wait.series(labels)
+        self.db_lane_wait = registry.db_lane_wait.series(labels)
+
+    def record(self, status_code: int, elapsed: float, stats: QueryStats) -> None:
+        registry = self.registry
+        request_labels = self.request_labels.get(status_code)
+        if request_labels is None:
+            request_labels = self.request_labels[status_code] = self.labels + (str(status_code),)
+        registry.requests.inc(request_labels)
+        observe(LATENCY_BUCKETS, self.latency, elapsed)
+        observe(QUERY_COUNT_BUCKETS, self.db_queries, stats.queries)
+        observe(LATENCY_BUCKETS, self.db_time, stats.query_time)
+        observe(LATENCY_BUCKETS, self.db_transaction_wait, stats.transaction_wait)
+        observe(LATENCY_BUCKETS, self.db_lane_wait, stats.lane_wait)
+
+class MetricsMiddleware:
+    """
+    Record per-route request metrics and the database activity of each request.
+
+    Written as a plain ASGI middleware rather than BaseHTTPMiddleware, which would add a
+    task and a response stream per request. Routes are labelled by their path template,
+    looked up from the endpoint Starlette stores in the scope after routing.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.registry = registry
+        self._route_paths: Dict[object, str] = {}
+        self._series: Dict[Tuple[str, object], RouteSeries] = {}
+
+    def route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            self._route_paths = {
+                getattr(route, "endpoint", None): route.path for route in scope["app"].routes
+            }
+            path = self._route_paths.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Set the context variable directly; a contextmanager costs more than the metrics here
+        stats = QueryStats(scope)
+        token = current_stats.set(stats)
+        in_flight = registry.in_flight.values
+        in_flight[()] = in_flight.get((), 0) + 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight[()] -= 1
+            current_stats.reset(token)
+            key = (scope["method"], scope.get("endpoint"))
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = RouteSeries(registry, (key[0], self.route_label(scope)))
+            series.record(status_code, elapsed, stats)
@@ -0,0 +1,56 @@
+import threading
+import uuid
+
+from app import config
+from app.auth import valid_admin_token
+from app.profiling import PROFILES, Sampler, collapse
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Per-request profiles sample more often than on-demand ones, as requests are short
+REQUEST_SAMPLE_INTERVAL = 0.001
+
+class ProfileMiddleware:
+    """
+    Profile single requests on demand.
+
+    A request sent with `X-Profile: <admin token>` is sampled while it runs; the response
+    carries an `X-Profile-Id` header, and the collapsed stacks are served by
+    GET /admin/profiles/{id}. The sampler sees the whole event loop thread, so other
+    requests running at the same time show up in the profile too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.ADMIN_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                token = value.decode("latin-1")
+                break
+        if token is None or not valid_admin_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler(threading.get_ident(), REQUEST_SAMPLE_INTERVAL)
+        # The id goes out in the response headers; the profile is stored once the request ends
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile_id.encode()),
+                ]
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            PROFILES.add(profile_id, collapse(sampler.stop()))
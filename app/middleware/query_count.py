@@ -0,0 +1,57 @@
+import logging
+
+from app import config
+from app.db.instrumentation import QueryStats, current_stats
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = b"x-query-count"
+QUERY_TIME_HEADER = b"x-query-time-ms"
+
+class QueryCountMiddleware:
+    """
+    Report the SQL queries issued by each request.
+
+    In debug mode the query count and time are added as response headers. Requests over
+    config.QUERY_COUNT_LOG_THRESHOLD queries are logged, as are statements repeated
+    config.N_PLUS_ONE_THRESHOLD times or more, which usually means a query in a loop.
+    Shares the request's QueryStats with MetricsMiddleware when that runs outside it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats(scope)
+            token = current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and config.DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (QUERY_COUNT_HEADER, str(stats.queries).encode()),
+                    (QUERY_TIME_HEADER, f"{stats.query_time * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                current_stats.reset(token)
+            self.report(scope, stats)
+
+    def report(self, scope, stats: QueryStats) -> None:
+        request = f'{scope["method"]} {scope["path"]}'
+        if stats.queries > config.QUERY_COUNT_LOG_THRESHOLD:
+            logger.warning(
+                "%s issued %d SQL queries (%.1f ms)", request, stats.queries, stats.query_time * 1000
+            )
+        for query, count in stats.repeated_statements(config.N_PLUS_ONE_THRESHOLD):
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", request, count, query)
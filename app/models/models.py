@@ -1,5 +1,4 @@
 from tortoise import Model, fields
-from datetime import datetime, timezone
 
 class Customer(Model):
     id = fields.IntField(pk=True)
@@ -8,7 +7,7 @@ class Customer(Model):
     phone = fields.CharField(max_length=50, null=True)
     address = fields.CharField(max_length=255, null=True)
     notes = fields.TextField(null=True)
-    created_at = fields.DatetimeField(default=datetime.now(timezone.utc))
+    created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
     # Relationship with orders
@@ -20,7 +19,7 @@ class Product(Model):
     description = fields.TextField(null=True)
     price = fields.FloatField()
     sku = fields.CharField(max_length=255, unique=True)
-    created_at = fields.DatetimeField(default=datetime.now(timezone.utc))
+    created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
     # Relationship with inventory
@@ -32,15 +31,43 @@ class Product(Model):
 class Order(Model):
     id = fields.IntField(pk=True)
     customer = fields.ForeignKeyField("models.Customer", related_name="orders")
-    order_date = fields.DatetimeField(default=datetime.now(timezone.utc))
+    order_date = fields.DatetimeField(auto_now_add=True)
     status = fields.CharField(max_length=50, default="pending")  # pending, completed, cancelled
     total_amount = fields.FloatField(default=0.0)
-    created_at = fields.DatetimeField(default=datetime.now(timezone.utc))
+    # Denormalized item summary for list views, maintained alongside item writes
+    item_count = fields.IntField(default=0)
+    total_quantity = fields.IntField(default=0)
+    item_summary = fields.CharField(max_length=255, null=True)  # e.g. "Laptop +2 more"
+    created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
     # Add relation to order items
     items = fields.ReverseRelation["OrderItem"]
 
+    class Meta:
+        indexes = (
+            # Supports per-customer order history in date order (keyset pagination)
+            ("customer_id", "order_date", "id"),
+            # Supports status polls such as fulfillment fetching pending orders by date
+            ("status", "order_date"),
+        )
+
+    def set_item_summary(self, items):
+        """
+        Recompute the denormalized summary columns from (product_name, quantity) pairs.
+
+        Call this in the same transaction that writes the order's items, then save the order.
+        """
+        items = list(items)
+        self.item_count = len(items)
+        self.total_quantity = sum(quantity for _, quantity in items)
+        if not items:
+            self.item_summary = None
+        else:
+            suffix = f" +{len(items) - 1} more" if len(items) > 1 else ""
+            # Shorten the name, never the suffix, so the count survives long names
+            self.item_summary = items[0][0][:255 - len(suffix)] + suffix
+
 class OrderItem(Model):
     id = fields.IntField(pk=True)
     order = fields.ForeignKeyField("models.Order", related_name="items")
@@ -48,16 +75,52 @@ class OrderItem(Model):
     quantity = fields.IntField(default=1)
     unit_price = fields.FloatField()  # Price at time of purchase
     subtotal = fields.FloatField()  # unit_price * quantity
-    created_at = fields.DatetimeField(default=datetime.now(timezone.utc))
+    created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
     class Meta:
         table = "order_items"
+        # SQLite does not index foreign keys; item prefetches and summaries look up by order
+        indexes = (("order_id",),)
+
+# Completed/cancelled orders moved out of the hot tables by app/db/archive.py
+class ArchivedOrder(Model):
+    id = fields.IntField(pk=True, generated=False)  # Keeps the original order id
+    customer = fields.ForeignKeyField("models.Customer", related_name="archived_orders")
+    order_date = fields.DatetimeField()
+    status = fields.CharField(max_length=50)
+    total_amount = fields.FloatField(default=0.0)
+    item_count = fields.IntField(default=0)
+    total_quantity = fields.IntField(default=0)
+    item_summary = fields.CharField(max_length=255, null=True)
+    created_at = fields.DatetimeField()
+    updated_at = fields.DatetimeField()
+    archived_at = fields.DatetimeField(auto_now_add=True)
+
+    items = fields.ReverseRelation["ArchivedOrderItem"]
+
+    class Meta:
+        table = "order_archive"
+        indexes = (("customer_id", "order_date", "id"),)
+
+class ArchivedOrderItem(Model):
+    id = fields.IntField(pk=True, generated=False)  # Keeps the original order item id
+    order = fields.ForeignKeyField("models.ArchivedOrder", related_name="items")
+    product = fields.ForeignKeyField("models.Product", related_name="archived_order_items")
+    quantity = fields.IntField(default=1)
+    unit_price = fields.FloatField()
+    subtotal = fields.FloatField()
+    created_at = fields.DatetimeField()
+    updated_at = fields.DatetimeField()
+
+    class Meta:
+        table = "order_items_archive"
+        indexes = (("order_id",),)
 
 class Inventory(Model):
     id = fields.IntField(pk=True)
     product = fields.OneToOneField("models.Product", related_name="inventory")
     quantity = fields.IntField(default=0)
     last_restock_date = fields.DatetimeField(null=True)
-    created_at = fields.DatetimeField(default=datetime.now(timezone.utc))
+    created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+import fastapi
+import pydantic
+from fastapi import FastAPI, Request
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+from fastapi.responses import Response
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+OPENAPI_URL = "/openapi.json"
+DOCS_URL = "/docs"
+REDOC_URL = "/redoc"
+OAUTH2_REDIRECT_URL = f"{DOCS_URL}/oauth2-redirect"
+
+# Source tree the routes and schemas are defined in
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def source_fingerprint(directory: str = APP_DIR) -> str:
+    """
+    Hash of the app's Python source and of the FastAPI and Pydantic versions.
+
+    Everything the OpenAPI document is generated from, so any deploy that can change
+    the document changes the hash. Hashing the files takes about a millisecond, much
+    less than building the document.
+    """
+    digest = hashlib.sha256(f"fastapi {fastapi.__version__} pydantic {pydantic.VERSION}".encode())
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def cache_path(app: FastAPI, directory: Optional[str] = None) -> str:
+    """Cache file of the running code; changed routes or schemas never read an old document."""
+    return os.path.join(directory or config.OPENAPI_CACHE_DIR, f"openapi-{app.version}-{source_fingerprint()}.json")
+
+def render_schema(app: FastAPI) -> bytes:
+    # Serialized the way FastAPI's own /openapi.json response would be
+    return json.dumps(app.openapi(), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def write_schema(app: FastAPI, path: str) -> bytes:
+    """Build the schema and write it to `path`, atomically so concurrent workers never read half a file."""
+    body = render_schema(app)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(body)
+    os.replace(temporary, path)
+    return body
+
+class SchemaCache:
+    """
+    The OpenAPI document as ready-to-send bytes.
+
+    With a `path`, the document is read from the file written at deploy time by
+    scripts/build_openapi.py. If that file is missing it is built in memory and not
+    written, so only the deploy step ever produces cache files. Without a path it is
+    built on first use. Either way it is built and serialized at most once per process.
+    """
+
+    def __init__(self, app: FastAPI, path: Optional[str] = None):
+        self.app = app
+        self.path = path
+        self.body: Optional[bytes] = None
+
+    def load(self) -> None:
+        """Read or build the document now, so no request pays for it."""
+        if self.body is not None or self.path is None:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                self.body = f.read()
+        except FileNotFoundError:
+            logger.warning("No OpenAPI schema cached at %s; building it (run scripts/build_openapi.py at deploy)",
+                           self.path)
+            self.body = render_schema(self.app)
+
+    def get(self) -> bytes:
+        if self.body is None:
+            if self.path is not None:
+                self.load()
+            else:
+                self.body = render_schema(self.app)
+        return self.body
+
+def add_docs_routes(app: FastAPI, cache: SchemaCache) -> None:
+    """Serve /openapi.json from `cache`, plus the Swagger UI and ReDoc pages that read it."""
+
+    def openapi_url(request: Request) -> str:
+        return request.scope.get("root_path", "").rstrip("/") + OPENAPI_URL
+
+    @app.get(OPENAPI_URL, include_in_schema=False)
+    async def openapi():
+        return Response(cache.get(), media_type="application/json")
+
+    @app.get(DOCS_URL, include_in_schema=False)
+    async def swagger_ui(request: Request):
+        return get_swagger_ui_html(
+            openapi_url=openapi_url(request),
+            title=f"{app.title} - Swagger UI",
+            oauth2_redirect_url=OAUTH2_REDIRECT_URL,
+        )
+
+    @app.get(OAUTH2_REDIRECT_URL, include_in_schema=False)
+    async def swagger_ui_redirect():
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @app.get(REDOC_URL, include_in_schema=False)
+    async def redoc(request: Request):
+        return get_redoc_html(openapi_url=openapi_url(request), title=f"{app.title} - ReDoc")
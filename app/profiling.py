@@ -0,0 +1,114 @@
+import inspect
+import os
+import sys
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Per-request profiles kept for GET /admin/profiles/{id}
+MAX_STORED_PROFILES = 20
+
+class Sampler:
+    """
+    Statistical CPU profiler for one thread.
+
+    A background thread reads the target thread's current Python stack every `interval`
+    seconds and counts identical stacks. Only what is on the thread's stack is seen, so
+    for the event loop thread this is the CPU work being done at that moment; suspended
+    coroutines do not show up. Stacks of an idle loop are dropped unless `include_idle`
+    is set (see `is_idle`).
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.01, include_idle: bool = False):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_frame = None
+
+    def start(self) -> None:
+        if threading.get_ident() == self.thread_id:
+            self._loop_frame = loop_frame(sys._getframe())
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            if not self.include_idle and self.is_idle(frame):
+                continue
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def is_idle(self, frame) -> bool:
+        """
+        Whether the thread is waiting for I/O rather than running code.
+
+        The asyncio loop waits in the selector module. uvloop waits inside its own
+        compiled run method, which leaves the frame that started the loop on top of the
+        stack; that frame is found when the sampler is started from the loop thread.
+        """
+        return frame.f_code.co_filename.endswith("selectors.py") or frame is self._loop_frame
+
+def loop_frame(frame):
+    """The frame below the outermost coroutine on the stack: the one driving the event loop."""
+    caller = None
+    while frame is not None:
+        if frame.f_code.co_flags & (inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR):
+            caller = frame.f_back
+        frame = frame.f_back
+    return caller
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})"
+
+def short_path(filename: str) -> str:
+    # Trim installation prefixes so frames read as package/module.py
+    index = filename.rfind("site-packages" + os.sep)
+    if index != -1:
+        return filename[index + len("site-packages") + 1:]
+    if filename.startswith(PROJECT_DIR + os.sep):
+        return os.path.relpath(filename, PROJECT_DIR)
+    return os.path.basename(filename)
+
+def collapse(stacks: Counter) -> str:
+    """Render stacks in the collapsed format read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+class ProfileStore:
+    """The most recent per-request profiles, by id."""
+
+    def __init__(self, size: int = MAX_STORED_PROFILES):
+        self.size = size
+        self.profiles: "OrderedDict[str, str]" = OrderedDict()
+
+    def add(self, profile_id: str, collapsed: str) -> None:
+        self.profiles[profile_id] = collapsed
+        while len(self.profiles) > self.size:
+            self.profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self.profiles.get(profile_id)
+
+PROFILES = ProfileStore()
+
+# Only one on-demand profile runs at a time
+profile_lock = threading.Lock()
@@ -0,0 +1,32 @@
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: without it responses use the standard library encoder
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson.
+
+    FastAPI has already turned the route's return value into plain JSON types (datetimes
+    are ISO strings) before it gets here, so the output is the same bytes the standard
+    encoder writes: compact separators, UTF-8 rather than \\u escapes, non-string keys as
+    strings. Two differences remain:
+    - floats below 1e-4 or from 1e16 up keep their value but are written without the
+      exponent sign or padding (1e16, not 1e+16);
+    - NaN and infinity become null, where the standard encoder fails the request.
+    """
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, lone surrogates, ...: do exactly what JSONResponse does
+            return super().render(content)
+
+def json_response_class(fast: bool) -> Type[JSONResponse]:
+    """The app's default response class: FastJSONResponse when enabled and orjson is installed."""
+    return FastJSONResponse if fast and orjson is not None else JSONResponse
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, model_validator
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
 # Customer schemas
@@ -52,6 +52,26 @@ class ProductInDB(ProductBase):
 class Product(ProductInDB):
     pass
 
+# Sparse product representation returned when a subset of fields is requested
+class ProductPartial(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    sku: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+# Bulk product upsert schemas
+class ProductBulkUpsert(BaseModel):
+    items: List[ProductCreate] = Field(..., min_length=1)
+
+class ProductBulkUpsertResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+
 # Inventory schemas
 class InventoryBase(BaseModel):
     product_id: int
@@ -75,6 +95,29 @@ class Inventory(InventoryInDB):
     model_config = ConfigDict(from_attributes=True)
     product: Product
 
+# Bulk inventory adjustment schemas
+class InventoryAdjustment(BaseModel):
+    product_id: Optional[int] = None
+    sku: Optional[str] = None
+    delta: int
+
+    @model_validator(mode="after")
+    def check_product_reference(self):
+        # Each line must identify its product by exactly one of product_id or sku
+        if (self.product_id is None) == (self.sku is None):
+            raise ValueError("Provide exactly one of product_id or sku")
+        return self
+
+class InventoryAdjustmentCreate(BaseModel):
+    items: List[InventoryAdjustment] = Field(..., min_length=1)
+
+class InventoryLevel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    product_id: int
+    sku: str
+    quantity: int
+    last_restock_date: Optional[datetime] = None
+
 # Order Item schema for order creation
 class OrderItemCreate(BaseModel):
     product_id: int
@@ -105,6 +148,9 @@ class OrderInDB(OrderBase):
     id: int
     order_date: datetime
     total_amount: float
+    item_count: int = 0
+    total_quantity: int = 0
+    item_summary: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -112,4 +158,44 @@ class Order(OrderInDB):
     model_config = ConfigDict(from_attributes=True)
     customer: Customer
     items: List[OrderItem] = []
-    
\ No newline at end of file
+    
+# Sparse order representation returned when a subset of fields or relations is requested
+class OrderPartial(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    customer_id: Optional[int] = None
+    status: Optional[str] = None
+    order_date: Optional[datetime] = None
+    total_amount: Optional[float] = None
+    item_count: Optional[int] = None
+    total_quantity: Optional[int] = None
+    item_summary: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    customer: Optional[Customer] = None
+    items: Optional[List[OrderItem]] = None
+
+# Customer order history page (keyset pagination)
+class OrderHistoryPage(BaseModel):
+    # Full orders, or OrderInDB rows when only summaries were requested
+    items: List[Union[Order, OrderInDB]]
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+    has_next: bool
+
+# Admin: aggregated slow query log
+class SlowQueryStats(BaseModel):
+    fingerprint: str = Field(..., description="Statement with literals and IN lists normalized")
+    count: int
+    total_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+    last_sql: str
+    last_params: Optional[List[Any]] = Field(None, description="Parameters of the last occurrence, text redacted")
+    routes: Dict[str, int] = Field(..., description="Occurrences per calling request")
+    plan: List[str] = Field(..., description="EXPLAIN QUERY PLAN output")
+
+class SlowQueryReport(BaseModel):
+    threshold_ms: float
+    dropped: int = Field(..., description="Slow statements not stored because the fingerprint limit was reached")
+    queries: List[SlowQueryStats]
@@ -0,0 +1,33 @@
+import logging
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """
+    Durations of the startup phases, measured back to back.
+
+    Created when app.main starts importing, so the first phase covers the imports; each
+    `mark` closes the phase that has been running since the previous one.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def report(self) -> None:
+        phases = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.phases.items())
+        logger.info("Ready in %.1f ms (%s)", self.total * 1000, phases)
+
+STARTUP = StartupTimer()
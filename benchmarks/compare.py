@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Fail when benchmark results regress against the checked-in baseline.
+
+Each metric has a relative and an absolute tolerance; a value regresses when it
+exceeds baseline * (1 + relative) + absolute. Query counts default to no tolerance at
+all, since they are deterministic and an extra query per item is exactly the kind of
+regression this gate exists to catch. Latency tolerances are loose because the baseline
+may come from a different machine.
+"""
+import argparse
+import json
+import os
+import sys
+
+from tabulate import tabulate
+
+# Add the project root to the path so the benchmarks package imports when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import BENCH_DIR, DEFAULT_OUTPUT, main as run_benchmarks
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Used for any metric the baseline does not configure
+DEFAULT_TOLERANCES = {
+    "p50_ms": {"relative": 1.0, "absolute": 5.0},
+    "p95_ms": {"relative": 1.0, "absolute": 10.0},
+    # A p99 of a few hundred requests is set by a handful of samples; one GC pause or
+    # WAL checkpoint moves it by tens of milliseconds
+    "p99_ms": {"relative": 1.5, "absolute": 50.0},
+    "queries_per_request": {"relative": 0.0, "absolute": 0.0},
+    "max_queries": {"relative": 0.0, "absolute": 0.0},
+    "alloc_kb_per_request": {"relative": 0.25, "absolute": 16.0},
+    "errors": {"relative": 0.0, "absolute": 0.0},
+}
+
+def tolerance_for(baseline, scenario, metric):
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances.update(baseline.get("tolerances", {}))
+    tolerance = dict(tolerances[metric])
+    # Per-scenario overrides, e.g. for a route that is known to be noisy
+    tolerance.update(baseline.get("scenario_tolerances", {}).get(scenario, {}).get(metric, {}))
+    return tolerance
+
+def compare(baseline, current):
+    """Return (rows, regressions) comparing every baseline scenario and metric with the current run."""
+    rows = []
+    regressions = 0
+    for scenario, expected in baseline["results"].items():
+        actual = current["results"].get(scenario)
+        if actual is None:
+            rows.append([scenario, "-", "-", "-", "-", "MISSING"])
+            regressions += 1
+            continue
+        for metric in DEFAULT_TOLERANCES:
+            if metric not in expected or metric not in actual:
+                continue
+            tolerance = tolerance_for(baseline, scenario, metric)
+            limit = expected[metric] * (1 + tolerance["relative"]) + tolerance["absolute"]
+            if actual[metric] > limit:
+                status = "REGRESSION"
+                regressions += 1
+            elif actual[metric] < expected[metric]:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append([scenario, metric, expected[metric], actual[metric], round(limit, 3), status])
+
+    for scenario in current["results"]:
+        if scenario not in baseline["results"]:
+            rows.append([scenario, "-", "-", "-", "-", "new (not in baseline)"])
+    return rows, regressions
+
+def update_baseline(path, baseline, current):
+    """Replace the baseline's results with the current run, keeping its tolerances."""
+    updated = {key: value for key, value in baseline.items() if key not in ("meta", "results")}
+    updated["meta"] = current["meta"]
+    updated["results"] = current["results"]
+    with open(path, "w") as f:
+        json.dump(updated, f, indent=2)
+        f.write("\n")
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results with the stored baseline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"Baseline file (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--current", default=DEFAULT_OUTPUT, help=f"Results to check (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--run", action="store_true",
+                        help="Run the benchmarks first, with the baseline's data size and load settings")
+    parser.add_argument("--all", action="store_true", help="Show every metric, not only regressions")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the current results into the baseline instead of checking them")
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    if args.run:
+        meta = baseline["meta"]
+        data = meta["data"]
+        current = run_benchmarks([
+            "--customers", str(data["customers"]),
+            "--products", str(data["products"]),
+            "--orders", str(data["orders"]),
+            "--concurrency", str(meta["concurrency"]),
+            "--requests", str(meta["requests_per_scenario"]),
+            "--warmup", str(meta["warmup"]),
+            "--alloc-samples", str(meta.get("alloc_samples", 0)),
+            "--seed", str(meta["seed"]),
+            "--output", args.current,
+        ])
+    else:
+        current = load(args.current)
+
+    if args.update_baseline:
+        update_baseline(args.baseline, baseline, current)
+        print(f"Baseline {args.baseline} updated from {args.current}")
+        return 0
+
+    rows, regressions = compare(baseline, current)
+    shown = rows if args.all else [row for row in rows if row[-1] not in ("ok", "improved")]
+    if shown:
+        print(tabulate(shown, headers=["Scenario", "Metric", "Baseline", "Current", "Limit", "Status"], tablefmt="github"))
+    if regressions:
+        print(f"\n{regressions} regression(s) against {args.baseline}")
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
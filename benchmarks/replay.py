@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Replay captured API traffic against the in-process app or a running server.
+
+Reads a capture written by the TRAFFIC_CAPTURE_FILE middleware and sends the same
+requests in the same order. At `--speed 1` each request is sent at its original offset
+from the start of the capture, without waiting for earlier responses, so bursts and
+lulls are reproduced; `--speed 2` compresses the timeline by half, and `--speed 0` sends
+requests back to back from `--concurrency` workers. Latency percentiles are reported per
+route next to the latencies recorded in the capture.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from tabulate import tabulate
+from tortoise import Tortoise
+
+# Add the project root to the path so the app and benchmarks packages import when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.capture import read_capture
+from app.main import app
+from benchmarks.run import BENCH_DIR, DEFAULT_DB, percentile
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "replay.json")
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def route_of(record: dict) -> str:
+    """Group requests by method and path with numeric ids replaced."""
+    return f'{record["method"]} {_ID_SEGMENT.sub("/{id}", record["path"])}'
+
+def load_capture(path, limit=None):
+    """Return (records in start order, number skipped because their body was not captured)."""
+    records = []
+    skipped = 0
+    for record in read_capture(path):
+        if "body_omitted" in record:
+            skipped += 1
+            continue
+        records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    if limit is not None:
+        records = records[:limit]
+    return records, skipped
+
+async def send(client, record):
+    """Send one captured request; return (status, seconds). Status 0 means no response."""
+    url = record["path"] + (f'?{record["query"]}' if record.get("query") else "")
+    started = time.perf_counter()
+    try:
+        response = await client.request(record["method"], url, json=record.get("body"))
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 0
+    return status, time.perf_counter() - started
+
+async def replay(client, records, speed=1.0, concurrency=8):
+    """
+    Replay records and return one (record, status, seconds, lag) tuple per request.
+
+    `lag` is how late a request was sent compared with its scheduled time; a large lag
+    means the replayer itself could not keep up and the timeline was not reproduced.
+    """
+    results = []
+    if not records:
+        return results
+
+    if speed <= 0:
+        pending = iter(records)
+
+        async def worker():
+            for record in pending:
+                status, elapsed = await send(client, record)
+                results.append((record, status, elapsed, 0.0))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results
+
+    first = records[0]["ts"]
+    started = time.perf_counter()
+
+    async def scheduled(record, due):
+        lag = time.perf_counter() - due
+        status, elapsed = await send(client, record)
+        results.append((record, status, elapsed, lag))
+
+    tasks = []
+    for record in records:
+        due = started + (record["ts"] - first) / speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(scheduled(record, due)))
+    await asyncio.gather(*tasks)
+    return results
+
+def summarize(results):
+    """Latency and status summary per route, plus an "ALL" row."""
+    groups = {"ALL": []}
+    for result in results:
+        groups["ALL"].append(result)
+        groups.setdefault(route_of(result[0]), []).append(result)
+
+    summary = {}
+    for route, group in groups.items():
+        latencies = sorted(elapsed for _, _, elapsed, _ in group)
+        recorded = sorted(record["duration_ms"] for record, _, _, _ in group)
+        lags = sorted(lag for _, _, _, lag in group)
+        summary[route] = {
+            "requests": len(group),
+            "errors": sum(1 for _, status, _, _ in group if status == 0 or status >= 500),
+            "status_mismatches": sum(1 for record, status, _, _ in group if status != record["status"]),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3),
+            "recorded_p50_ms": percentile(recorded, 0.50),
+            "recorded_p99_ms": percentile(recorded, 0.99),
+            "lag_p99_ms": round(percentile(lags, 0.99) * 1000, 3),
+        }
+    return summary
+
+async def run_replay(args, records):
+    if args.target:
+        async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout) as client:
+            return await replay(client, records, args.speed, args.concurrency)
+
+    if not os.path.exists(args.db):
+        sys.exit(f"Database {args.db} not found; seed one with `python -m benchmarks` or pass --db")
+    await Tortoise.init(db_url=f"sqlite://{args.db}", modules={"models": ["app.models.models"]})
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://replay") as client:
+            return await replay(client, records, args.speed, args.concurrency)
+    finally:
+        await Tortoise.close_connections()
+
+def print_summary(summary):
+    rows = [
+        [route, r["requests"], r["errors"], r["status_mismatches"], r["p50_ms"], r["p95_ms"], r["p99_ms"],
+         r["recorded_p50_ms"], r["recorded_p99_ms"], r["lag_p99_ms"]]
+        for route, r in summary.items()
+    ]
+    headers = ["Route", "Requests", "Errors", "Status diff", "p50 ms", "p95 ms", "p99 ms",
+               "Recorded p50", "Recorded p99", "Lag p99 ms"]
+    print(tabulate(rows, headers=headers, tablefmt="github"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a traffic capture and report latencies.")
+    parser.add_argument("capture", help="Capture file written by TRAFFIC_CAPTURE_FILE")
+    parser.add_argument("--target", help="Base URL of a running server (default: the app in-process)")
+    parser.add_argument("--db", default=DEFAULT_DB,
+                        help=f"Database for in-process replay; writes are replayed too (default: {DEFAULT_DB})")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Timeline speed-up; 0 sends back to back (default: 1, the original timing)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers when --speed is 0 (default: 8)")
+    parser.add_argument("--limit", type=int, help="Only replay the first N requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout against --target (default: 30)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Report file (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args(argv)
+
+    records, skipped = load_capture(args.capture, args.limit)
+    if not records:
+        sys.exit(f"No replayable requests in {args.capture}")
+    print(f"Replaying {len(records)} requests from {args.capture}"
+          + (f" ({skipped} skipped without a captured body)" if skipped else ""))
+
+    started = time.perf_counter()
+    results = asyncio.run(run_replay(args, records))
+    wall = time.perf_counter() - started
+    summary = summarize(results)
+    print_summary(summary)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "capture": args.capture,
+            "target": args.target or "in-process",
+            "speed": args.speed,
+            "requests": len(records),
+            "skipped": skipped,
+            "captured_seconds": round(records[-1]["ts"] - records[0]["ts"], 3),
+            "replay_seconds": round(wall, 3),
+        },
+        "results": summary,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    return report
+
+if __name__ == "__main__":
+    main()
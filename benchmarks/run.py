@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark every v1/v2 route in-process against a seeded SQLite database.
+
+Requests go straight into the ASGI app through httpx, so results measure the
+application and database only, with no network or server in between. Each scenario is
+driven by a fixed number of concurrent workers; latency percentiles, SQL queries per
+request and memory allocated per request are written as JSON for comparison between runs.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+from tabulate import tabulate
+from tortoise import Tortoise
+
+# Add the project root to the path so we can import the app modules
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from app import config
+from app.main import app
+from benchmarks.scenarios import SCENARIOS, discover
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(BENCH_DIR, "bench.db")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+
+# Data volumes passed to scripts/generate_data.py
+SIZES = {
+    "small": {"customers": 1000, "products": 200, "orders": 10000},
+    "medium": {"customers": 20000, "products": 2000, "orders": 200000},
+    "large": {"customers": 100000, "products": 20000, "orders": 2000000},
+}
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def seed_database(db_path, size, seed):
+    """Create a fresh database of the given size with the load-test data generator."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    command = [
+        sys.executable, os.path.join(PROJECT_DIR, "scripts", "generate_data.py"),
+        "--db", db_path, "--seed", str(seed),
+        "--customers", str(size["customers"]),
+        "--products", str(size["products"]),
+        "--orders", str(size["orders"]),
+    ]
+    print(f"Seeding {db_path}: {size}")
+    subprocess.run(command, check=True)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_scenario(client, scenario, data, rng, requests, warmup, concurrency):
+    """Run one scenario and return its summary."""
+    latencies = []
+    queries = []
+    errors = 0
+
+    async def send():
+        path, body = scenario.build(rng, data)
+        started = time.perf_counter()
+        response = await client.request(scenario.method, path, json=body)
+        return time.perf_counter() - started, response
+
+    for _ in range(warmup):
+        await send()
+
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            elapsed, response = await send()
+            latencies.append(elapsed)
+            queries.append(int(response.headers.get("x-query-count", 0)))
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+    }
+
+async def measure_allocations(client, scenario, data, rng, samples):
+    """
+    Mean peak memory allocated while handling one request, in KiB.
+
+    Measured in a separate sequential pass because tracemalloc slows every allocation
+    down too much to run alongside the latency measurements.
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            path, body = scenario.build(rng, data)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.request(scenario.method, path, json=body)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return round(sum(peaks) / len(peaks) / 1024, 1)
+
+async def run_benchmarks(args, size):
+    await Tortoise.init(db_url=f"sqlite://{args.db}", modules={"models": ["app.models.models"]})
+    # Debug mode makes every response report its SQL query count
+    config.DEBUG = True
+    results = {}
+    try:
+        rng = random.Random(args.seed)
+        data = await discover()
+        scenarios = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+        # Reads first, so writes do not change what the reads measure
+        scenarios.sort(key=lambda s: s.write)
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            for scenario in scenarios:
+                result = await run_scenario(
+                    client, scenario, data, rng, args.requests, args.warmup, args.concurrency
+                )
+                if args.alloc_samples:
+                    result["alloc_kb_per_request"] = await measure_allocations(
+                        client, scenario, data, rng, args.alloc_samples
+                    )
+                results[scenario.name] = result
+                print(f"{scenario.name:<28} p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+                      f"{result['queries_per_request']:>6.1f} queries/request")
+    finally:
+        await Tortoise.close_connections()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "data": size,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "warmup": args.warmup,
+            "alloc_samples": args.alloc_samples,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+def print_summary(report):
+    rows = [
+        [name, r["requests"], r["errors"], r["throughput_rps"], r["p50_ms"], r["p95_ms"], r["p99_ms"],
+         r["queries_per_request"], r.get("alloc_kb_per_request")]
+        for name, r in report["results"].items()
+    ]
+    headers = ["Scenario", "Requests", "Errors", "Req/s", "p50 ms", "p95 ms", "p99 ms", "Queries/req", "KiB/req"]
+    print(tabulate(rows, headers=headers, tablefmt="github"))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API routes in-process.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Benchmark database (default: {DEFAULT_DB})")
+    parser.add_argument("--size", choices=SIZES, default="small", help="Data volume preset (default: small)")
+    parser.add_argument("--customers", type=int, help="Override the preset's customer count")
+    parser.add_argument("--products", type=int, help="Override the preset's product count")
+    parser.add_argument("--orders", type=int, help="Override the preset's order count")
+    parser.add_argument("--reuse-db", action="store_true",
+                        help="Run against the existing database instead of reseeding it")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests per scenario (default: 8)")
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario (default: 300)")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario (default: 20)")
+    parser.add_argument("--alloc-samples", type=int, default=20,
+                        help="Requests per scenario measured for allocations; 0 skips them (default: 20)")
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios (default: all)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the data and the request mix (default: 1)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Results file (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios or []) - {s.name for s in SCENARIOS}
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    size = dict(SIZES[args.size])
+    for key in size:
+        if getattr(args, key) is not None:
+            size[key] = getattr(args, key)
+
+    # Write scenarios change the data, so results are only comparable on a fresh database
+    if not args.reuse_db or not os.path.exists(args.db):
+        seed_database(args.db, size, args.seed)
+
+    report = asyncio.run(run_benchmarks(args, size))
+    print_summary(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import random
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from tortoise import Tortoise
+
+# Products need at least this much stock to be used by write scenarios
+MIN_STOCK = 100
+
+class BenchData:
+    """Ids sampled from the seeded database, so requests hit rows that exist."""
+
+    def __init__(self, customer_ids, product_ids, stocked_product_ids, skus, order_ids):
+        self.customer_ids: List[int] = customer_ids
+        self.product_ids: List[int] = product_ids
+        self.stocked_product_ids: List[int] = stocked_product_ids
+        self.skus: List[str] = skus
+        self.order_ids: List[int] = order_ids
+
+async def sample_column(sql: str, size: int) -> list:
+    """Take `size` values spread across the table, the same ones on every run for the same data."""
+    connection = Tortoise.get_connection("default")
+    rows = await connection.execute_query_dict(
+        f'SELECT * FROM ({sql}) AS "t" ORDER BY ("rowid" * 7919) % 10007, "rowid" LIMIT ?', [size]
+    )
+    return [next(iter(row.values())) for row in rows]
+
+async def discover(sample_size: int = 500) -> BenchData:
+    return BenchData(
+        customer_ids=await sample_column('SELECT "id" FROM "customer"', sample_size),
+        product_ids=await sample_column('SELECT "id" FROM "product"', sample_size),
+        stocked_product_ids=await sample_column(
+            f'SELECT "product_id" FROM "inventory" WHERE "quantity" >= {MIN_STOCK}', sample_size
+        ),
+        skus=await sample_column('SELECT "sku" FROM "product"', sample_size),
+        order_ids=await sample_column('SELECT "id" FROM "order"', sample_size),
+    )
+
+# (path, JSON body) of one request
+Request = Tuple[str, Optional[dict]]
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    build: Callable[[random.Random, BenchData], Request]
+    # Write scenarios change the data and run after all reads
+    write: bool = False
+
+def order_items(rng: random.Random, data: BenchData) -> List[dict]:
+    products = rng.sample(data.stocked_product_ids, min(3, len(data.stocked_product_ids)))
+    return [{"product_id": product_id, "quantity": 1} for product_id in products]
+
+SCENARIOS = [
+    # v1 customers
+    Scenario("customers.list", "GET", lambda rng, data: ("/api/v1/customers/?limit=100", None)),
+    Scenario("customers.get", "GET", lambda rng, data: (f"/api/v1/customers/{rng.choice(data.customer_ids)}", None)),
+    Scenario("customers.orders", "GET", lambda rng, data: (
+        f"/api/v1/customers/{rng.choice(data.customer_ids)}/orders?limit=20", None
+    )),
+    Scenario("customers.orders_summary", "GET", lambda rng, data: (
+        f"/api/v1/customers/{rng.choice(data.customer_ids)}/orders?limit=20&summary=true", None
+    )),
+    # v1 products
+    Scenario("products.list", "GET", lambda rng, data: ("/api/v1/products/?limit=100", None)),
+    Scenario("products.get", "GET", lambda rng, data: (f"/api/v1/products/{rng.choice(data.product_ids)}", None)),
+    Scenario("products.batch", "GET", lambda rng, data: (
+        "/api/v1/products/?ids=" + ",".join(str(i) for i in rng.sample(data.product_ids, min(20, len(data.product_ids)))),
+        None
+    )),
+    # v1 orders
+    Scenario("orders.list", "GET", lambda rng, data: ("/api/v1/orders/?limit=50", None)),
+    Scenario("orders.list_lean", "GET", lambda rng, data: ("/api/v1/orders/?limit=50&include=", None)),
+    Scenario("orders.list_filtered", "GET", lambda rng, data: (
+        "/api/v1/orders/?limit=50&status=pending&sort=-order_date&include=", None
+    )),
+    Scenario("orders.get", "GET", lambda rng, data: (f"/api/v1/orders/{rng.choice(data.order_ids)}", None)),
+    Scenario("orders.items", "GET", lambda rng, data: (f"/api/v1/orders/{rng.choice(data.order_ids)}/items", None)),
+    # v1 inventory
+    Scenario("inventory.list", "GET", lambda rng, data: ("/api/v1/inventory/?limit=100", None)),
+    Scenario("inventory.by_product", "GET", lambda rng, data: (
+        f"/api/v1/inventory/product/{rng.choice(data.product_ids)}", None
+    )),
+    # v2 products
+    Scenario("v2.products.list", "GET", lambda rng, data: ("/api/v2/products/?page_size=50", None)),
+    Scenario("v2.products.list_lean", "GET", lambda rng, data: ("/api/v2/products/?page_size=50&fields=name,price", None)),
+    Scenario("v2.products.get", "GET", lambda rng, data: (f"/api/v2/products/{rng.choice(data.product_ids)}", None)),
+    # Writes
+    Scenario("orders.create", "POST", lambda rng, data: (
+        "/api/v1/orders/", {"customer_id": rng.choice(data.customer_ids), "items": order_items(rng, data)}
+    ), write=True),
+    Scenario("inventory.adjust", "POST", lambda rng, data: (
+        "/api/v1/inventory/adjustments",
+        {"items": [{"sku": sku, "delta": 1} for sku in rng.sample(data.skus, min(10, len(data.skus)))]}
+    ), write=True),
+]
@@ -1,287 +1,355 @@
-from locust import HttpUser, task, between
+"""
+Load test profiles for the order API.
+
+Every profile drives a fixed arrival rate rather than a fixed number of users thinking
+between requests: each simulated user issues USER_RATE requests per second and the
+shape below keeps rate / USER_RATE users running. As long as responses come back within
+1 / USER_RATE seconds the request rate does not drop when the server slows down, so the
+percentiles show the latency a steady stream of clients would see.
+
+Ids come from the seeded database (see scripts/generate_data.py), so requests hit rows
+that exist. When the run ends, the p99 latency and error rate are checked against the
+profile's SLOs and locust exits with status 1 if either is exceeded.
+
+    locust -f locustfile.py --headless --host http://localhost:8000 --run-time 5m --profile read-heavy
+    locust -f locustfile.py --headless --host http://localhost:8000 --run-time 5m --profile flash-sale --rate 40
+    locust -f locustfile.py --headless --host http://localhost:8000 --run-time 2m --mix "orders.create=5,products.get=1"
+"""
+import logging
+import math
+import os
 import random
-import json
-
-class OrdersUser(HttpUser):
-    wait_time = between(1, 5)  # Wait between 1-5 seconds between tasks
-    
-    # Sample data for testing - updated to match actual database IDs
-    sample_customers = list(range(6, 11))  # Customer IDs 6-10 from database
-    sample_products = list(range(11, 21))  # Product IDs 11-20 from database
-    
+import sqlite3
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from locust import HttpUser, LoadTestShape, constant_throughput, events
+from locust.runners import MasterRunner, WorkerRunner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "order_management.db")
+
+# Requests per second issued by each simulated user
+USER_RATE = 1.0
+# Ids sampled from each table at startup
+SAMPLE_SIZE = 1000
+# Products need at least this much stock to be ordered
+MIN_STOCK = 100
+ORDER_STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+
+class TestData:
+    """Ids sampled from the seeded database."""
+
+    def __init__(self, customer_ids, product_ids, stocked_product_ids, hot_product_ids, skus, order_ids):
+        self.customer_ids: List[int] = customer_ids
+        self.product_ids: List[int] = product_ids
+        self.stocked_product_ids: List[int] = stocked_product_ids
+        self.hot_product_ids: List[int] = hot_product_ids
+        self.skus: List[str] = skus
+        self.order_ids: List[int] = order_ids
+
+DATA: Optional[TestData] = None
+
+def discover(db_path: str, hot_products: int, sample_size: int = SAMPLE_SIZE) -> TestData:
+    """Sample ids spread across each table, the same ones on every run for the same data."""
+    if not os.path.exists(db_path):
+        raise SystemExit(f"Database {db_path} not found; seed it with scripts/generate_data.py or pass --db")
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        def sample(sql, *params):
+            rows = connection.execute(
+                f'SELECT * FROM ({sql}) AS "t" ORDER BY ("rowid" * 7919) % 10007, "rowid" LIMIT ?',
+                [*params, sample_size]
+            ).fetchall()
+            return [row[0] for row in rows]
+
+        data = TestData(
+            customer_ids=sample('SELECT "id" FROM "customer"'),
+            product_ids=sample('SELECT "id" FROM "product"'),
+            stocked_product_ids=sample('SELECT "product_id" FROM "inventory" WHERE "quantity" >= ?', MIN_STOCK),
+            # A flash sale concentrates on a few products with plenty of stock
+            hot_product_ids=[row[0] for row in connection.execute(
+                'SELECT "product_id" FROM "inventory" ORDER BY "quantity" DESC, "product_id" LIMIT ?', [hot_products]
+            )],
+            skus=sample('SELECT "sku" FROM "product"'),
+            order_ids=sample('SELECT "id" FROM "order"'),
+        )
+    finally:
+        connection.close()
+
+    if not data.customer_ids or not data.stocked_product_ids or not data.order_ids:
+        raise SystemExit(f"Database {db_path} has no customers, stocked products or orders; seed it first")
+    return data
+
+# Tasks. Requests are named after the route template so stats aggregate per route, not per id.
+
+def get_product(user):
+    user.client.get(f"/api/v1/products/{random.choice(DATA.product_ids)}", name="/api/v1/products/{id}")
+
+def list_products(user):
+    user.client.get(f"/api/v1/products/?skip={random.randrange(0, 500, 50)}&limit=50", name="/api/v1/products/")
+
+def batch_products(user):
+    ids = ",".join(str(i) for i in random.sample(DATA.product_ids, min(20, len(DATA.product_ids))))
+    user.client.get(f"/api/v1/products/?ids={ids}", name="/api/v1/products/?ids=")
+
+def list_products_v2(user):
+    user.client.get("/api/v2/products/?page_size=50&fields=name,price", name="/api/v2/products/")
+
+def get_customer(user):
+    user.client.get(f"/api/v1/customers/{random.choice(DATA.customer_ids)}", name="/api/v1/customers/{id}")
+
+def customer_orders(user):
+    user.client.get(
+        f"/api/v1/customers/{random.choice(DATA.customer_ids)}/orders?limit=20&summary=true",
+        name="/api/v1/customers/{id}/orders"
+    )
+
+def list_orders(user):
+    user.client.get("/api/v1/orders/?limit=50&sort=-order_date&include=", name="/api/v1/orders/")
+
+def get_order(user):
+    user.client.get(f"/api/v1/orders/{random.choice(user.order_ids)}", name="/api/v1/orders/{id}")
+
+def order_items(user):
+    user.client.get(f"/api/v1/orders/{random.choice(user.order_ids)}/items", name="/api/v1/orders/{id}/items")
+
+def inventory_by_product(user):
+    user.client.get(
+        f"/api/v1/inventory/product/{random.choice(DATA.product_ids)}", name="/api/v1/inventory/product/{id}"
+    )
+
+def place_order(user, product_ids, name):
+    items = [
+        {"product_id": product_id, "quantity": 1}
+        for product_id in random.sample(product_ids, min(random.randint(1, 3), len(product_ids)))
+    ]
+    order = {"customer_id": random.choice(DATA.customer_ids), "items": items}
+    with user.client.post("/api/v1/orders/", json=order, name=name, catch_response=True) as response:
+        if response.status_code == 201:
+            user.order_ids.append(response.json()["id"])
+        elif response.status_code == 400:
+            # Sold out is a normal answer under load, not a server error
+            response.success()
+
+def create_order(user):
+    place_order(user, DATA.stocked_product_ids, "/api/v1/orders/")
+
+def update_order_status(user):
+    user.client.put(
+        f"/api/v1/orders/{random.choice(user.order_ids)}",
+        json={"status": random.choice(ORDER_STATUSES)},
+        name="/api/v1/orders/{id}"
+    )
+
+def adjust_inventory(user):
+    # A warehouse receipt, which also keeps write-heavy runs from selling out
+    skus = random.sample(DATA.skus, min(10, len(DATA.skus)))
+    user.client.post(
+        "/api/v1/inventory/adjustments",
+        json={"items": [{"sku": sku, "delta": random.randint(1, 20)} for sku in skus]},
+        name="/api/v1/inventory/adjustments"
+    )
+
+def get_hot_product(user):
+    user.client.get(f"/api/v1/products/{random.choice(DATA.hot_product_ids)}", name="/api/v1/products/{id} (hot)")
+
+def hot_inventory(user):
+    user.client.get(
+        f"/api/v1/inventory/product/{random.choice(DATA.hot_product_ids)}",
+        name="/api/v1/inventory/product/{id} (hot)"
+    )
+
+def create_hot_order(user):
+    place_order(user, DATA.hot_product_ids, "/api/v1/orders/ (hot)")
+
+TASKS: Dict[str, Callable] = {
+    "products.get": get_product,
+    "products.list": list_products,
+    "products.batch": batch_products,
+    "v2.products.list": list_products_v2,
+    "customers.get": get_customer,
+    "customers.orders": customer_orders,
+    "orders.list": list_orders,
+    "orders.get": get_order,
+    "orders.items": order_items,
+    "inventory.by_product": inventory_by_product,
+    "orders.create": create_order,
+    "orders.update_status": update_order_status,
+    "inventory.adjust": adjust_inventory,
+    "hot.products.get": get_hot_product,
+    "hot.inventory": hot_inventory,
+    "hot.orders.create": create_hot_order,
+}
+
+class Profile(NamedTuple):
+    # Relative task weights
+    mix: Dict[str, int]
+    # Total requests per second
+    rate: float
+    # SLOs checked at the end of the run
+    p99_ms: float
+    error_rate: float
+    # Multiply the rate by --spike-factor during the spike window
+    spike: bool = False
+
+PROFILES = {
+    # Browsing: mostly product and order reads, a few checkouts
+    "read-heavy": Profile(
+        mix={
+            "products.get": 30, "products.list": 10, "products.batch": 5, "v2.products.list": 10,
+            "customers.get": 5, "customers.orders": 15, "orders.list": 5, "orders.get": 10,
+            "orders.items": 5, "inventory.by_product": 5, "orders.create": 4, "orders.update_status": 1,
+        },
+        rate=100, p99_ms=250, error_rate=0.001,
+    ),
+    # Order intake and fulfilment: checkouts, status changes and warehouse receipts
+    "write-heavy": Profile(
+        mix={
+            "orders.create": 40, "orders.update_status": 15, "inventory.adjust": 10,
+            "orders.get": 15, "products.get": 10, "customers.orders": 10,
+        },
+        rate=30, p99_ms=500, error_rate=0.005,
+    ),
+    # Everyone hits the same few products at once, with a traffic spike mid-run
+    "flash-sale": Profile(
+        mix={
+            "hot.products.get": 50, "hot.orders.create": 30, "hot.inventory": 10,
+            "products.get": 5, "customers.orders": 5,
+        },
+        rate=50, p99_ms=1000, error_rate=0.01, spike=True,
+    ),
+}
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "name=weight,name=weight" into task weights."""
+    mix = {}
+    for part in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in TASKS:
+            raise SystemExit(f"Unknown task {name!r} in --mix; choose from {', '.join(TASKS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+def weighted_tasks(mix: Dict[str, int]) -> List[Callable]:
+    return [TASKS[name] for name, weight in mix.items() for _ in range(weight)]
+
+class Settings(NamedTuple):
+    profile: str
+    mix: Dict[str, int]
+    rate: float
+    p99_ms: float
+    error_rate: float
+    spike: bool
+
+def settings(options) -> Settings:
+    """The profile's defaults with any command-line overrides applied."""
+    profile = PROFILES[options.profile]
+    mix = dict(profile.mix)
+    if options.mix:
+        # --mix adjusts the profile's weights; a weight of 0 drops a task
+        mix.update(parse_mix(options.mix))
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise SystemExit("The traffic mix is empty")
+    return Settings(
+        profile=options.profile,
+        mix=mix,
+        rate=options.rate if options.rate is not None else profile.rate,
+        p99_ms=options.slo_p99_ms if options.slo_p99_ms is not None else profile.p99_ms,
+        error_rate=options.slo_error_rate if options.slo_error_rate is not None else profile.error_rate,
+        spike=profile.spike,
+    )
+
+@events.init_command_line_parser.add_listener
+def add_options(parser):
+    group = parser.add_argument_group("Order API load profile")
+    group.add_argument("--profile", choices=list(PROFILES), default="read-heavy", env_var="LOCUST_PROFILE",
+                       help="Traffic profile (default: read-heavy)")
+    group.add_argument("--rate", type=float, env_var="LOCUST_RATE",
+                       help="Total requests per second (default: the profile's rate)")
+    group.add_argument("--mix", default="", env_var="LOCUST_MIX",
+                       help='Task weight overrides, e.g. "orders.create=10,products.get=0"')
+    group.add_argument("--db", default=DEFAULT_DB, env_var="LOCUST_DB",
+                       help="Seeded database to sample ids from (default: order_management.db)")
+    group.add_argument("--hot-products", type=int, default=5, env_var="LOCUST_HOT_PRODUCTS",
+                       help="Products targeted by a flash sale (default: 5)")
+    group.add_argument("--spike-factor", type=float, default=5.0, env_var="LOCUST_SPIKE_FACTOR",
+                       help="Rate multiplier during a flash-sale spike (default: 5)")
+    group.add_argument("--spike-at", type=float, default=60.0, env_var="LOCUST_SPIKE_AT",
+                       help="Seconds into the run when the spike starts (default: 60)")
+    group.add_argument("--spike-duration", type=float, default=60.0, env_var="LOCUST_SPIKE_DURATION",
+                       help="Length of the spike in seconds (default: 60)")
+    group.add_argument("--slo-p99-ms", type=float, env_var="LOCUST_SLO_P99_MS",
+                       help="Fail the run above this p99 latency (default: the profile's SLO)")
+    group.add_argument("--slo-error-rate", type=float, env_var="LOCUST_SLO_ERROR_RATE",
+                       help="Fail the run above this fraction of failed requests (default: the profile's SLO)")
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    global DATA
+    options = environment.parsed_options
+    if options is None:
+        return
+    current = settings(options)
+    ApiUser.tasks = weighted_tasks(current.mix)
+    # The master only coordinates; workers and standalone runs send the requests
+    if not isinstance(environment.runner, MasterRunner):
+        DATA = discover(options.db, options.hot_products)
+    logger.info("Profile %s at %.1f req/s, mix %s", current.profile, current.rate, current.mix)
+
+class ApiUser(HttpUser):
+    wait_time = constant_throughput(USER_RATE)
+    # Replaced with the selected profile's mix at startup
+    tasks = weighted_tasks(PROFILES["read-heavy"].mix)
+
     def on_start(self):
-        """Initialize user session - can be used for login if needed"""
-        # If your API requires authentication, add it here
-        # self.client.post("/login", json={"username": "test", "password": "test"})
-        self.created_orders = []  # Initialize the list to store created order IDs
-    
-    @task(3)
-    def create_order(self):
-        """Test order creation - higher weight (3) as it's likely a common operation"""
-        # First check inventory levels to make smarter product choices
-        with self.client.get("/api/v1/orders/debug/inventory", catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    inventory_data = response.json()
-                    # Filter products with sufficient inventory (5 or more items)
-                    sufficient_inventory = [item["product_id"] for item in inventory_data if item["inventory_level"] >= 5]
-                    
-                    # If we have products with sufficient inventory, prefer those
-                    # Otherwise, fall back to the sample products
-                    product_pool = sufficient_inventory if sufficient_inventory else self.sample_products
-                    
-                    # Generate a random order with 1-3 items
-                    items = []
-                    for _ in range(random.randint(1, 3)):
-                        if product_pool:
-                            product_id = random.choice(product_pool)
-                            # Find the inventory level for this product
-                            inventory_level = next((item["inventory_level"] for item in inventory_data 
-                                                if item["product_id"] == product_id), 0)
-                            # Set quantity to be at most the inventory level (or 1-3 if sufficient)
-                            max_quantity = min(3, inventory_level) if inventory_level > 0 else 1
-                            quantity = random.randint(1, max_quantity)
-                            
-                            items.append({
-                                "product_id": product_id,
-                                "quantity": quantity
-                            })
-                    
-                    # Only proceed if we have items to order
-                    if items:
-                        order_data = {
-                            "customer_id": random.choice(self.sample_customers),
-                            "status": random.choice(["pending", "processing", "shipped", "delivered"]),
-                            "items": items
-                        }
-                        
-                        # Send the request and capture response
-                        with self.client.post("/api/v1/orders/", json=order_data, catch_response=True) as order_response:
-                            if order_response.status_code == 201:
-                                # Save the order ID for future use if successful
-                                try:
-                                    order_id = order_response.json().get("id")
-                                    if order_id:
-                                        self.created_orders.append(order_id)
-                                except json.JSONDecodeError:
-                                    order_response.failure("Response could not be decoded as JSON")
-                            elif order_response.status_code == 400:
-                                # Log the error details for debugging
-                                try:
-                                    error_detail = order_response.json().get("detail", "No detail provided")
-                                    print(f"400 Bad Request: {error_detail}")
-                                    # Still mark as success since this might be expected (e.g., insufficient inventory)
-                                    order_response.success()
-                                except json.JSONDecodeError:
-                                    print(f"400 Bad Request with non-JSON response: {order_response.text}")
-                                    order_response.success()
-                            elif order_response.status_code == 404:
-                                # Customer or product not found
-                                order_response.failure(f"404 Not Found: {order_response.text}")
-                            else:
-                                order_response.failure(f"Failed to create order: {order_response.status_code}")
-                    else:
-                        # No items with sufficient inventory, skip this order
-                        print("Skipping order creation due to insufficient inventory for all products")
-                        
-                except json.JSONDecodeError:
-                    response.failure("Response could not be decoded as JSON")
-            else:
-                # Fall back to original behavior if inventory check fails
-                self._create_order_fallback()
-    
-    def _create_order_fallback(self):
-        """Fallback method for order creation if inventory check fails"""
-        # Generate a random order with 1-3 items
-        items = []
-        for _ in range(random.randint(1, 3)):
-            product_id = random.choice(self.sample_products)
-            items.append({
-                "product_id": product_id,
-                "quantity": random.randint(1, 3)
-            })
-        
-        order_data = {
-            "customer_id": random.choice(self.sample_customers),
-            "status": random.choice(["pending", "processing", "shipped", "delivered"]),
-            "items": items
-        }
-        
-        # Send the request and capture response
-        with self.client.post("/api/v1/orders/", json=order_data, catch_response=True) as response:
-            if response.status_code == 201:
-                # Save the order ID for future use if successful
-                try:
-                    order_id = response.json().get("id")
-                    if order_id:
-                        self.created_orders.append(order_id)
-                except json.JSONDecodeError:
-                    response.failure("Response could not be decoded as JSON")
-            elif response.status_code == 400:
-                # Log the error details for debugging
-                try:
-                    error_detail = response.json().get("detail", "No detail provided")
-                    print(f"400 Bad Request: {error_detail}")
-                    # Still mark as success since this might be expected (e.g., insufficient inventory)
-                    response.success()
-                except json.JSONDecodeError:
-                    print(f"400 Bad Request with non-JSON response: {response.text}")
-                    response.success()
-            elif response.status_code == 404:
-                # Customer or product not found
-                response.failure(f"404 Not Found: {response.text}")
-            else:
-                response.failure(f"Failed to create order: {response.status_code}")
-    
-    @task(5)
-    def get_orders_list(self):
-        """Test retrieving orders list - highest weight (5) as it's likely most common"""
-        # Randomly use pagination
-        skip = random.choice([0, 10, 20])
-        limit = random.choice([10, 20, 50])
-        
-        with self.client.get(f"/api/v1/orders/?skip={skip}&limit={limit}", catch_response=True) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to get orders: {response.status_code}")
-    
-    @task(2)
-    def get_order_detail(self):
-        """Test retrieving a specific order"""
-        # Either use a previously created order or a random ID from existing orders (2-21)
-        if self.created_orders:
-            order_id = random.choice(self.created_orders)
-        else:
-            # Use existing order IDs from the database (2-21)
-            order_id = random.randint(2, 21)
-        
-        with self.client.get(f"/api/v1/orders/{order_id}", catch_response=True) as response:
-            if response.status_code == 404:
-                # Not found is acceptable if using random IDs
-                response.success()
-            elif response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to get order {order_id}: {response.status_code}")
-    
-    @task(1)
-    def update_order(self):
-        """Test updating an order - lower weight as less common"""
-        # Either use a previously created order or a random ID from existing orders
-        if self.created_orders:
-            order_id = random.choice(self.created_orders)
-        else:
-            # Use existing order IDs from the database (2-21)
-            order_id = random.randint(2, 21)
-        
-        # Update just the status
-        update_data = {
-            "status": random.choice(["processing", "shipped", "delivered", "cancelled"])
-        }
-        
-        with self.client.put(f"/api/v1/orders/{order_id}", json=update_data, catch_response=True) as response:
-            if response.status_code == 404:
-                # Not found is acceptable if using random IDs
-                response.success()
-            elif response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to update order {order_id}: {response.status_code}")
-    
-    @task(1)
-    def get_order_items(self):
-        """Test retrieving order items for a specific order"""
-        # Either use a previously created order or a random ID from existing orders
-        if self.created_orders:
-            order_id = random.choice(self.created_orders)
-        else:
-            # Use existing order IDs from the database (2-21)
-            order_id = random.randint(2, 21)
-        
-        with self.client.get(f"/api/v1/orders/{order_id}/items", catch_response=True) as response:
-            if response.status_code == 404:
-                # Not found is acceptable if using random IDs
-                response.success()
-            elif response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to get order items for {order_id}: {response.status_code}")
-    
-    @task(1)
-    def delete_order(self):
-        """Test deleting an order - lowest weight as it's least common"""
-        # Only delete orders we've created during this session
-        if self.created_orders:
-            order_id = self.created_orders.pop()  # Remove the ID so we don't try to use it again
-            
-            with self.client.delete(f"/api/v1/orders/{order_id}", catch_response=True) as response:
-                if response.status_code == 204:
-                    response.success()
-                elif response.status_code == 404:
-                    # Order might have been deleted already
-                    response.success()
-                else:
-                    response.failure(f"Failed to delete order {order_id}: {response.status_code}")
-    
-    @task(1)
-    def check_inventory(self):
-        """Check inventory levels for debugging"""
-        with self.client.get("/api/v1/orders/debug/inventory", catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    inventory_data = response.json()
-                    # Log products with low inventory (less than 5 items)
-                    low_inventory = [item for item in inventory_data if item["inventory_level"] < 5]
-                    if low_inventory:
-                        print(f"Low inventory products: {low_inventory}")
-                    response.success()
-                except json.JSONDecodeError:
-                    response.failure("Response could not be decoded as JSON")
-            else:
-                response.failure(f"Failed to get inventory data: {response.status_code}")
-    
-    @task(2)  # Higher weight to ensure inventory is replenished frequently
-    def replenish_inventory(self):
-        """Replenish inventory for products with low stock"""
-        with self.client.get("/api/v1/orders/debug/inventory", catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    inventory_data = response.json()
-                    # Find products with low inventory (less than 5 items)
-                    low_inventory = [item for item in inventory_data if item["inventory_level"] < 5]
-                    
-                    for item in low_inventory:
-                        # Get the inventory ID for this product
-                        product_id = item["product_id"]
-                        with self.client.get(f"/api/v1/inventory/product/{product_id}", catch_response=True) as inv_response:
-                            if inv_response.status_code == 200:
-                                try:
-                                    inventory = inv_response.json()
-                                    inventory_id = inventory["id"]
-                                    
-                                    # Replenish inventory to 20 units
-                                    update_data = {
-                                        "quantity": 20  # Set to a reasonable amount
-                                    }
-                                    
-                                    with self.client.put(f"/api/v1/inventory/{inventory_id}", 
-                                                        json=update_data, 
-                                                        catch_response=True) as update_response:
-                                        if update_response.status_code == 200:
-                                            print(f"Replenished inventory for product {item['product_name']} (ID: {product_id}) to 20 units")
-                                            update_response.success()
-                                        else:
-                                            print(f"Failed to update inventory for product {product_id}: {update_response.status_code}")
-                                            update_response.success()  # Still mark as success to continue the test
-                                except json.JSONDecodeError:
-                                    inv_response.failure("Response could not be decoded as JSON")
-                            else:
-                                print(f"Could not find inventory for product {product_id}")
-                                inv_response.success()  # Still mark as success to continue the test
-                    
-                    response.success()
-                except json.JSONDecodeError:
-                    response.failure("Response could not be decoded as JSON")
-            else:
-                response.failure(f"Failed to get inventory data: {response.status_code}")
\ No newline at end of file
+        # Orders this user reads and updates; the ones it creates are added as it goes
+        self.order_ids = list(DATA.order_ids)
+
+class ArrivalRateShape(LoadTestShape):
+    """Run enough users to hold the profile's request rate, with a spike for flash sales."""
+
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        current = settings(options)
+        rate = current.rate
+        run_time = self.get_run_time()
+        if current.spike and options.spike_at <= run_time < options.spike_at + options.spike_duration:
+            rate *= options.spike_factor
+        users = max(1, math.ceil(rate / USER_RATE))
+        # Start or stop the whole difference within about a second
+        return users, users
+
+@events.quitting.add_listener
+def check_slos(environment, **kwargs):
+    """Set a failing exit code when the run missed its p99 latency or error rate SLO."""
+    if isinstance(environment.runner, WorkerRunner) or environment.parsed_options is None:
+        return
+    current = settings(environment.parsed_options)
+    total = environment.stats.total
+    if total.num_requests == 0:
+        logger.error("SLO check failed: no requests were made")
+        environment.process_exit_code = 1
+        return
+
+    p99 = total.get_response_time_percentile(0.99)
+    failures = []
+    if p99 > current.p99_ms:
+        failures.append(f"p99 {p99:.0f} ms > {current.p99_ms:.0f} ms")
+    if total.fail_ratio > current.error_rate:
+        failures.append(f"error rate {total.fail_ratio:.2%} > {current.error_rate:.2%}")
+
+    logger.info(
+        "%s: %d requests at %.1f req/s (target %.1f), p99 %.0f ms, error rate %.2f%%",
+        current.profile, total.num_requests, total.total_rps, current.rate, p99, total.fail_ratio * 100
+    )
+    if failures:
+        slowest = sorted(
+            environment.stats.entries.values(),
+            key=lambda entry: entry.get_response_time_percentile(0.99), reverse=True
+        )[:3]
+        for entry in slowest:
+            logger.error("  %s %s: p99 %.0f ms", entry.method, entry.name, entry.get_response_time_percentile(0.99))
+        logger.error("SLO check failed: %s", "; ".join(failures))
+        environment.process_exit_code = 1
@@ -0,0 +1,28 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "order" ADD "item_count" INT NOT NULL DEFAULT 0;
+        ALTER TABLE "order" ADD "total_quantity" INT NOT NULL DEFAULT 0;
+        ALTER TABLE "order" ADD "item_summary" VARCHAR(255);
+        UPDATE "order" SET
+            "item_count" = (SELECT COUNT(*) FROM "order_items" WHERE "order_id" = "order"."id"),
+            "total_quantity" = (SELECT COALESCE(SUM("quantity"), 0) FROM "order_items" WHERE "order_id" = "order"."id");
+        UPDATE "order" SET "item_summary" = (
+            SELECT "product"."name" FROM "order_items"
+            JOIN "product" ON "product"."id" = "order_items"."product_id"
+            WHERE "order_items"."order_id" = "order"."id"
+            ORDER BY "order_items"."id" LIMIT 1
+        );
+        UPDATE "order" SET "item_summary" =
+            substr("item_summary", 1, 255 - length(CASE WHEN "item_count" > 1 THEN ' +' || ("item_count" - 1) || ' more' ELSE '' END))
+            || CASE WHEN "item_count" > 1 THEN ' +' || ("item_count" - 1) || ' more' ELSE '' END
+        WHERE "item_summary" IS NOT NULL;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "order" DROP COLUMN "item_count";
+        ALTER TABLE "order" DROP COLUMN "total_quantity";
+        ALTER TABLE "order" DROP COLUMN "item_summary";"""
@@ -0,0 +1,36 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "order_archive" (
+    "id" INT NOT NULL PRIMARY KEY,
+    "order_date" TIMESTAMP NOT NULL,
+    "status" VARCHAR(50) NOT NULL,
+    "total_amount" REAL NOT NULL DEFAULT 0,
+    "item_count" INT NOT NULL DEFAULT 0,
+    "total_quantity" INT NOT NULL DEFAULT 0,
+    "item_summary" VARCHAR(255),
+    "created_at" TIMESTAMP NOT NULL,
+    "updated_at" TIMESTAMP NOT NULL,
+    "archived_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "customer_id" INT NOT NULL REFERENCES "customer" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_order_archi_custome_16edbb" ON "order_archive" ("customer_id", "order_date", "id");
+CREATE TABLE IF NOT EXISTS "order_items_archive" (
+    "id" INT NOT NULL PRIMARY KEY,
+    "quantity" INT NOT NULL DEFAULT 1,
+    "unit_price" REAL NOT NULL,
+    "subtotal" REAL NOT NULL,
+    "created_at" TIMESTAMP NOT NULL,
+    "updated_at" TIMESTAMP NOT NULL,
+    "order_id" INT NOT NULL REFERENCES "order_archive" ("id") ON DELETE CASCADE,
+    "product_id" INT NOT NULL REFERENCES "product" ("id") ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS "idx_order_items_order_i_5e7d43" ON "order_items_archive" ("order_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "order_items_archive";
+        DROP TABLE IF EXISTS "order_archive";"""
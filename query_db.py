@@ -1,12 +1,15 @@
-from app.models.models import Customer, Product, Order, Inventory, OrderItem
-from datetime import datetime
+import argparse
 import asyncio
 from tortoise import Tortoise
 from app.db.database import DATABASE_URL
+from app.db.streaming import DEFAULT_CHUNK_SIZE, count_rows, stream_rows, fetch_order_items
+
+SECTIONS = ["customers", "products", "inventory", "orders"]
 
 def format_datetime(dt):
+    # Raw SQL rows carry SQLite datetimes as "YYYY-MM-DD HH:MM:SS.ffffff+00:00" strings
     if dt:
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        return str(dt)[:19]
     return "N/A"
 
 def print_separator(char="-", length=80):
@@ -19,60 +22,80 @@ async def init_db():
         modules={"models": ["app.models.models"]}
     )
 
-async def query_database():
-    try:
-        # 1. Customers
-        print("\n=== CUSTOMERS ===")
-        print_separator()
+async def print_section(section, args):
+    """Print one section, streaming its rows in chunks."""
+    total = await count_rows(section, args.where)
+    print(f"\n=== {section.upper()} ({total} rows) ===")
+    print_separator()
+
+    if section == "customers":
         print(f"{'ID':<5} {'Name':<20} {'Email':<30} {'Phone':<15} {'Address':<30}")
         print_separator()
-        customers = await Customer.all()
-        for customer in customers:
-            print(f"{customer.id:<5} {customer.name[:20]:<20} {customer.email[:30]:<30} {(customer.phone or 'N/A')[:15]:<15} {(customer.address or 'N/A')[:30]:<30}")
+        async for customers in stream_rows(section, args.where, args.limit, args.offset, args.chunk_size):
+            for customer in customers:
+                print(f"{customer['id']:<5} {customer['name'][:20]:<20} {customer['email'][:30]:<30} {(customer['phone'] or 'N/A')[:15]:<15} {(customer['address'] or 'N/A')[:30]:<30}")
 
-        # 2. Products
-        print("\n=== PRODUCTS ===")
-        print_separator()
+    elif section == "products":
         print(f"{'ID':<5} {'Name':<20} {'SKU':<15} {'Price':<10} {'Description':<30}")
         print_separator()
-        products = await Product.all()
-        for product in products:
-            print(f"{product.id:<5} {product.name[:20]:<20} {product.sku[:15]:<15} ${product.price:<9.2f} {(product.description or 'N/A')[:30]:<30}")
+        async for products in stream_rows(section, args.where, args.limit, args.offset, args.chunk_size):
+            for product in products:
+                print(f"{product['id']:<5} {product['name'][:20]:<20} {product['sku'][:15]:<15} ${product['price']:<9.2f} {(product['description'] or 'N/A')[:30]:<30}")
 
-        # 3. Inventory
-        print("\n=== INVENTORY ===")
-        print_separator()
+    elif section == "inventory":
         print(f"{'ID':<5} {'Product Name':<20} {'Quantity':<10} {'Last Restock Date':<20}")
         print_separator()
-        inventory_items = await Inventory.all().prefetch_related('product')
-        for item in inventory_items:
-            print(f"{item.id:<5} {item.product.name[:20]:<20} {item.quantity:<10} {format_datetime(item.last_restock_date):<20}")
+        async for inventory_items in stream_rows(section, args.where, args.limit, args.offset, args.chunk_size):
+            for item in inventory_items:
+                print(f"{item['id']:<5} {item['product_name'][:20]:<20} {item['quantity']:<10} {format_datetime(item['last_restock_date']):<20}")
 
-        # 4. Orders
-        print("\n=== ORDERS ===")
-        print_separator()
+    elif section == "orders":
         print(f"{'ID':<5} {'Customer':<20} {'Status':<10} {'Total Amount':<12} {'Order Date':<20}")
         print_separator()
-        orders = await Order.all().prefetch_related('customer', 'items__product')
-        for order in orders:
-            print(f"{order.id:<5} {order.customer.name[:20]:<20} {order.status:<10} ${order.total_amount:<11.2f} {format_datetime(order.order_date):<20}")
-            
-            # Display order items
-            if hasattr(order, 'items') and order.items:
-                print(f"\t{'Product':<20} {'Quantity':<10} {'Unit Price':<12} {'Subtotal':<12}")
-                print(f"\t{'-' * 58}")
-                for item in order.items:
-                    print(f"\t{item.product.name[:20]:<20} {item.quantity:<10} ${item.unit_price:<11.2f} ${item.subtotal:<11.2f}")
-            else:
-                print("\tNo items in this order")
+        async for orders in stream_rows(section, args.where, args.limit, args.offset, args.chunk_size):
+            # One items query per chunk of orders
+            items_by_order = await fetch_order_items([order["id"] for order in orders])
+            for order in orders:
+                print(f"{order['id']:<5} {order['customer_name'][:20]:<20} {order['status']:<10} ${order['total_amount']:<11.2f} {format_datetime(order['order_date']):<20}")
+
+                # Display order items
+                items = items_by_order[order["id"]]
+                if items:
+                    print(f"\t{'Product':<20} {'Quantity':<10} {'Unit Price':<12} {'Subtotal':<12}")
+                    print(f"\t{'-' * 58}")
+                    for item in items:
+                        print(f"\t{item['product_name'][:20]:<20} {item['quantity']:<10} ${item['unit_price']:<11.2f} ${item['subtotal']:<11.2f}")
+                else:
+                    print("\tNo items in this order")
 
+async def query_database(args):
+    try:
+        for section in args.sections:
+            await print_section(section, args)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
-async def main():
+async def main(args):
     await init_db()
-    await query_database()
+    await query_database(args)
     await Tortoise.close_connections()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Print the database contents section by section.")
+    parser.add_argument("sections", nargs="*", metavar="section",
+                        help=f"Sections to print: {', '.join(SECTIONS)} (default: all)")
+    parser.add_argument("--where", help="SQL condition over the section's columns, e.g. \"status = 'pending'\"")
+    parser.add_argument("--limit", type=int, help="Maximum rows to print per section")
+    parser.add_argument("--offset", type=int, default=0, help="Rows to skip per section")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows fetched per query (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    args.sections = args.sections or SECTIONS
+    unknown = [section for section in args.sections if section not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    return args
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(parse_args()))
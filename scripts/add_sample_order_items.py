@@ -36,6 +36,7 @@ async def add_sample_order_items():
         selected_products = random.sample(list(products), min(num_products, len(products)))
         
         order_total = 0.0
+        item_summary = []
         
         for product in selected_products:
             # Random quantity between 1 and 5
@@ -53,11 +54,13 @@ async def add_sample_order_items():
             )
             
             order_total += subtotal
+            item_summary.append((product.name, quantity))
             
             print(f"Added {quantity} x {product.name} to Order #{order.id}")
         
-        # Update the order's total amount
+        # Update the order's total amount and denormalized item summary
         order.total_amount = order_total
+        order.set_item_summary(item_summary)
         await order.save()
         print(f"Updated Order #{order.id} total amount to ${order_total:.2f}")
     
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script to move old completed/cancelled orders into the archive tables.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tortoise import Tortoise
+from app.db.database import DATABASE_URL
+from app.db.archive import (
+    archive_orders, ARCHIVABLE_STATUSES, DEFAULT_ARCHIVE_AFTER_DAYS, DEFAULT_ARCHIVE_BATCH_SIZE
+)
+
+async def init_tortoise():
+    """Initialize Tortoise ORM."""
+    await Tortoise.init(
+        db_url=DATABASE_URL,
+        modules={"models": ["app.models.models"]}
+    )
+
+async def run_archive(args):
+    """Archive orders once, or repeatedly when an interval is given."""
+    await init_tortoise()
+    statuses = [status.strip() for status in args.statuses.split(",") if status.strip()]
+    
+    try:
+        while True:
+            started = time.perf_counter()
+            moved = await archive_orders(args.older_than_days, statuses, args.batch_size)
+            elapsed = time.perf_counter() - started
+            print(f"Archived {moved} orders older than {args.older_than_days} days in {elapsed:.2f}s")
+            
+            if not args.interval:
+                break
+            await asyncio.sleep(args.interval)
+    finally:
+        await Tortoise.close_connections()
+
+def main():
+    parser = argparse.ArgumentParser(description='Move old finished orders into the archive tables.')
+    parser.add_argument('--older-than-days', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS,
+                        help=f'Archive orders placed more than this many days ago (default: {DEFAULT_ARCHIVE_AFTER_DAYS})')
+    parser.add_argument('--statuses', default=",".join(ARCHIVABLE_STATUSES),
+                        help=f'Comma-separated order statuses to archive (default: {",".join(ARCHIVABLE_STATUSES)})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_ARCHIVE_BATCH_SIZE,
+                        help=f'Orders moved per transaction (default: {DEFAULT_ARCHIVE_BATCH_SIZE})')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='Keep running and archive every INTERVAL seconds (default: run once)')
+    
+    args = parser.parse_args()
+    asyncio.run(run_archive(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script to build the OpenAPI schema cache served by production workers.
+"""
+import sys
+import os
+import argparse
+import glob
+import time
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import config
+from app.main import app
+from app.openapi import cache_path, write_schema
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema for the current app code.")
+    parser.add_argument("--output-dir", default=config.OPENAPI_CACHE_DIR,
+                        help=f"Cache directory (default: {config.OPENAPI_CACHE_DIR})")
+    args = parser.parse_args()
+
+    path = cache_path(app, args.output_dir)
+    started = time.perf_counter()
+    body = write_schema(app, path)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {path} ({len(body)} bytes) in {elapsed * 1000:.0f} ms")
+
+    # Documents of earlier code are never read again
+    for stale in glob.glob(os.path.join(args.output_dir, "openapi-*.json")):
+        if stale != path:
+            os.remove(stale)
+            print(f"Removed {stale}")
+
+if __name__ == "__main__":
+    main()
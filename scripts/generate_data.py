@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Script to generate large volumes of realistic data for load testing and benchmarks.
+
+Rows are written with sqlite3 executemany in large transactions, with pragmas tuned
+for bulk loading, instead of one ORM call per row. Product popularity follows a Zipf
+distribution and order dates follow weekly and yearly seasonality.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import math
+import random
+import sqlite3
+import time
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tortoise import Tortoise
+from app.db.database import DATABASE_URL, migration_command
+
+STATUSES = ["pending", "processing", "shipped", "completed", "cancelled"]
+STATUS_WEIGHTS = [5, 5, 10, 70, 10]
+
+PRODUCT_WORDS = [
+    "Laptop", "Phone", "Headphones", "Tablet", "Watch", "Speaker", "Mouse", "Keyboard",
+    "Monitor", "Charger", "Cable", "Hub", "Camera", "Drive", "Router", "Lamp",
+]
+PRODUCT_ADJECTIVES = ["Pro", "Mini", "Max", "Lite", "Plus", "Ultra", "Air", "Basic"]
+FIRST_NAMES = ["John", "Jane", "Bob", "Alice", "Charlie", "Dana", "Eve", "Frank", "Grace", "Heidi"]
+LAST_NAMES = ["Doe", "Smith", "Johnson", "Brown", "Wilson", "Lee", "Garcia", "Martin", "Clark", "Lopez"]
+
+# Pragmas that trade durability for load speed; the database is consistent once the script exits
+LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": -262144,  # 256 MB
+}
+
+def to_db_datetime(value):
+    """Format a datetime the way Tortoise stores it in SQLite."""
+    return value.isoformat(" ")
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative Zipf weights: the product at rank r is picked with probability ~ 1 / r^exponent."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+def seasonal_day_cum_weights(days, end):
+    """Cumulative weights for order days: busier weekends and a November/December peak."""
+    weights = []
+    for offset in range(days):
+        day = end - timedelta(days=days - offset)
+        weekly = 1.3 if day.weekday() >= 5 else 1.0
+        yearly = 1.0 + 0.5 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 340) / 365)
+        weights.append(weekly * yearly)
+    return list(accumulate(weights))
+
+async def ensure_schema(db_path):
+    """
+    Bring the schema up to date so the generated rows match the models.
+
+    A new database, or one managed by Aerich, is migrated to the latest version, which
+    is recorded so that production startup accepts it. A database created by the
+    development server has no recorded version; its missing tables are created directly.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    finally:
+        connection.close()
+    if not tables or "aerich" in tables:
+        command = migration_command(f"sqlite://{db_path}")
+        await command.init()
+        try:
+            await command.upgrade()
+        finally:
+            await Tortoise.close_connections()
+        return
+    await Tortoise.init(
+        db_url=f"sqlite://{db_path}",
+        modules={"models": ["app.models.models"]}
+    )
+    await Tortoise.generate_schemas(safe=True)
+    await Tortoise.close_connections()
+
+# Rows archived by scripts/archive_orders.py keep their ids in these tables
+ARCHIVE_TABLES = {"order": "order_archive", "order_items": "order_items_archive"}
+
+def next_id(cursor, table):
+    """First id above every row the table holds, has archived, or has ever handed out."""
+    tables = [table, ARCHIVE_TABLES[table]] if table in ARCHIVE_TABLES else [table]
+    highest = [
+        cursor.execute(f'SELECT COALESCE(MAX("id"), 0) FROM "{name}"').fetchone()[0]
+        for name in tables
+    ]
+    # AUTOINCREMENT tables remember their highest id even after those rows are deleted
+    cursor.execute('SELECT "seq" FROM "sqlite_sequence" WHERE "name" = ?', (table,))
+    sequence = cursor.fetchone()
+    if sequence:
+        highest.append(sequence[0])
+    return max(highest) + 1
+
+def generate(connection, args):
+    """Generate all rows and return a dict of row counts per table."""
+    rng = random.Random(args.seed)
+    cursor = connection.cursor()
+    now = datetime.now(timezone.utc)
+    now_db = to_db_datetime(now)
+    counts = {}
+
+    # Customers
+    first_customer = next_id(cursor, "customer")
+    cursor.executemany(
+        'INSERT INTO "customer" ("id", "name", "email", "phone", "address", "notes", "created_at", "updated_at") '
+        'VALUES (?, ?, ?, ?, ?, NULL, ?, ?)',
+        (
+            (
+                customer_id,
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"customer{customer_id}@example.com",
+                f"555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}",
+                f"{rng.randrange(1, 9999)} Main St",
+                now_db,
+                now_db,
+            )
+            for customer_id in range(first_customer, first_customer + args.customers)
+        )
+    )
+    counts["customer"] = args.customers
+
+    # Products and their inventory
+    first_product = next_id(cursor, "product")
+    products = []
+    for product_id in range(first_product, first_product + args.products):
+        name = f"{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_ADJECTIVES)} {product_id}"
+        price = round(rng.lognormvariate(3.5, 1.0), 2) + 0.99
+        products.append((product_id, name, price))
+    cursor.executemany(
+        'INSERT INTO "product" ("id", "name", "description", "price", "sku", "created_at", "updated_at") '
+        'VALUES (?, ?, NULL, ?, ?, ?, ?)',
+        ((product_id, name, price, f"GEN-{product_id:08d}", now_db, now_db) for product_id, name, price in products)
+    )
+    cursor.executemany(
+        'INSERT INTO "inventory" ("product_id", "quantity", "last_restock_date", "created_at", "updated_at") '
+        'VALUES (?, ?, ?, ?, ?)',
+        ((product_id, rng.randint(0, 1000), now_db, now_db, now_db) for product_id, _, _ in products)
+    )
+    counts["product"] = counts["inventory"] = args.products
+
+    # Orders and items, generated in chunks to keep memory flat. The loop uses
+    # rng.random() with precomputed cumulative weights because randint/choices
+    # dominate the run time at millions of rows.
+    rand = rng.random
+    product_weights = zipf_cum_weights(len(products), args.zipf_exponent)
+    product_total = product_weights[-1]
+    day_weights = seasonal_day_cum_weights(args.days, now)
+    day_total = day_weights[-1]
+    status_weights = list(accumulate(STATUS_WEIGHTS))
+    status_total = status_weights[-1]
+    first_order = next_id(cursor, "order")
+    first_item = next_id(cursor, "order_items")
+    item_id = first_item
+    for chunk_start in range(0, args.orders, args.batch_size):
+        orders = []
+        items = []
+        for order_id in range(first_order + chunk_start, first_order + min(chunk_start + args.batch_size, args.orders)):
+            day = bisect(day_weights, rand() * day_total)
+            order_date = now - timedelta(days=args.days - day, seconds=int(rand() * 86400))
+            order_date_db = to_db_datetime(order_date)
+            item_count = min(1 + int(rng.expovariate(1 / args.mean_items)), args.max_items)
+            chosen = list(dict.fromkeys(
+                bisect(product_weights, rand() * product_total) for _ in range(item_count)
+            ))
+
+            total_amount = 0.0
+            total_quantity = 0
+            for index in chosen:
+                product_id, _, price = products[index]
+                quantity = 1 + int(rand() * 3)
+                subtotal = price * quantity
+                items.append((item_id, order_id, product_id, quantity, price, subtotal, order_date_db, order_date_db))
+                item_id += 1
+                total_amount += subtotal
+                total_quantity += quantity
+
+            first_name = products[chosen[0]][1]
+            summary = first_name if len(chosen) == 1 else f"{first_name} +{len(chosen) - 1} more"
+            orders.append((
+                order_id,
+                first_customer + int(rand() * args.customers),
+                order_date_db,
+                STATUSES[bisect(status_weights, rand() * status_total)],
+                round(total_amount, 2),
+                len(chosen),
+                total_quantity,
+                summary,
+                order_date_db,
+                order_date_db,
+            ))
+
+        cursor.executemany(
+            'INSERT INTO "order" ("id", "customer_id", "order_date", "status", "total_amount", "item_count", '
+            '"total_quantity", "item_summary", "created_at", "updated_at") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            orders
+        )
+        cursor.executemany(
+            'INSERT INTO "order_items" ("id", "order_id", "product_id", "quantity", "unit_price", "subtotal", '
+            '"created_at", "updated_at") VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            items
+        )
+    counts["order"] = args.orders
+    counts["order_items"] = item_id - first_item
+
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate large volumes of realistic data for load testing.')
+    parser.add_argument('--db', default=DATABASE_URL.replace("sqlite://", ""),
+                        help='SQLite database file to fill (default: the application database)')
+    parser.add_argument('--customers', type=int, default=10000, help='Customers to create (default: 10000)')
+    parser.add_argument('--products', type=int, default=2000, help='Products to create, each with inventory (default: 2000)')
+    parser.add_argument('--orders', type=int, default=100000, help='Orders to create (default: 100000)')
+    parser.add_argument('--mean-items', type=float, default=2.5, help='Average items per order (default: 2.5)')
+    parser.add_argument('--max-items', type=int, default=20, help='Maximum items per order (default: 20)')
+    parser.add_argument('--days', type=int, default=730, help='Spread order dates over this many past days (default: 730)')
+    parser.add_argument('--zipf-exponent', type=float, default=1.1, help='Skew of product popularity (default: 1.1)')
+    parser.add_argument('--batch-size', type=int, default=50000, help='Orders generated per executemany chunk (default: 50000)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+    args = parser.parse_args()
+
+    if args.customers < 1 or args.products < 1:
+        parser.error("--customers and --products must be at least 1")
+
+    asyncio.run(ensure_schema(args.db))
+
+    connection = sqlite3.connect(args.db, isolation_level=None)
+    for pragma, value in LOAD_PRAGMAS.items():
+        connection.execute(f"PRAGMA {pragma}={value}")
+
+    started = time.perf_counter()
+    connection.execute("BEGIN")
+    try:
+        counts = generate(connection, args)
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:<12} {count:>12,}")
+    print(f"Inserted {total:,} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/sec)")
+
+if __name__ == "__main__":
+    main()
@@ -9,32 +9,21 @@ import asyncio
 # Add the parent directory to the path so we can import the app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from aerich import Command
-from app.db.database import DATABASE_URL
-
-# Convert URL to Tortoise format if needed
-DB_URL = DATABASE_URL.replace('sqlite:///./','sqlite://')
-
-# Tortoise ORM config
-TORTOISE_ORM = {
-    "connections": {"default": DB_URL},
-    "apps": {
-        "models": {
-            "models": ["app.models.models", "aerich.models"],
-            "default_connection": "default",
-        },
-    },
-}
+from tortoise import Tortoise
+from app.db.database import migration_command
 
 async def init():
     """Initialize Aerich."""
-    command = Command(tortoise_config=TORTOISE_ORM, app="models")
+    command = migration_command()
     
     # Initialize Aerich
     await command.init()
     
-    # Initialize the database
-    await command.init_db(safe=True)
+    # Create the database by applying the project's migrations, which records their versions
+    try:
+        await command.upgrade()
+    finally:
+        await Tortoise.close_connections()
     
     print("Aerich initialized successfully!")
 
@@ -1,70 +1,186 @@
+#!/usr/bin/env python3
+"""
+Script to migrate the legacy order_product many-to-many table into order_items.
+
+The legacy table is streamed in rowid order, one chunk per transaction. Each chunk
+resolves product prices with a single join, bulk-inserts the OrderItems, refreshes the
+affected orders' item summaries and records a checkpoint in the same transaction, so an
+interrupted run resumes where it stopped. An (order, product) pair that already has an
+order item is not inserted again, so rerunning from the start with --reset is safe.
+"""
 import asyncio
+import argparse
 import sqlite3
 import os
 import sys
+import time
+from datetime import datetime, timezone
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from tortoise import Tortoise
-from app.models.models import Order, Product, OrderItem
 from app.db.database import DATABASE_URL
 
-async def migrate_order_items():
-    print("Starting migration of order items...")
-    
-    # Initialize Tortoise ORM
+CHECKPOINT_NAME = "order_product_to_order_items"
+DEFAULT_CHUNK_SIZE = 10000
+
+async def create_schema(db_path):
+    """Create the OrderItem table (and any other missing tables) through Tortoise."""
     await Tortoise.init(
-        db_url=DATABASE_URL,
+        db_url=f"sqlite://{db_path}",
         modules={"models": ["app.models.models"]}
     )
-    
-    # Generate schemas (creates the OrderItem table)
     print("Creating OrderItem table...")
     await Tortoise.generate_schemas(safe=True)
-    
-    # Get database path from DATABASE_URL
-    db_path = DATABASE_URL.replace("sqlite://", "")
-    
-    # Connect to SQLite database directly to check for existing many-to-many table
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Check if the order_product table exists (the default M2M table created by Tortoise)
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='order_product'")
-    order_product_exists = cursor.fetchone() is not None
-    
-    if order_product_exists:
-        print("Found existing order_product table, migrating data...")
-        
-        # Get all entries from the order_product table
-        cursor.execute("SELECT order_id, product_id FROM order_product")
-        order_product_entries = cursor.fetchall()
-        
-        # For each entry, create an OrderItem
-        for order_id, product_id in order_product_entries:
-            # Get the order and product
-            order = await Order.get(id=order_id)
-            product = await Product.get(id=product_id)
-            
-            # Create a new OrderItem
-            await OrderItem.create(
-                order=order,
-                product=product,
-                quantity=1,  # Default quantity
-                unit_price=product.price,  # Use current product price
-                subtotal=product.price  # unit_price * quantity
-            )
-            
-            print(f"Created OrderItem for Order {order_id}, Product {product_id}")
-    else:
-        print("No existing order_product table found. No data to migrate.")
-    
-    # Close connections
-    conn.close()
     await Tortoise.close_connections()
-    
+
+def load_checkpoint(conn, reset):
+    """Return (last migrated rowid, rows migrated so far), creating the checkpoint table if needed."""
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS "migration_checkpoint" ('
+        '"name" VARCHAR(100) NOT NULL PRIMARY KEY, "last_rowid" INT NOT NULL, "migrated" INT NOT NULL)'
+    )
+    if reset:
+        conn.execute('DELETE FROM "migration_checkpoint" WHERE "name" = ?', (CHECKPOINT_NAME,))
+    row = conn.execute(
+        'SELECT "last_rowid", "migrated" FROM "migration_checkpoint" WHERE "name" = ?', (CHECKPOINT_NAME,)
+    ).fetchone()
+    return row if row else (0, 0)
+
+def migrate_chunk(conn, last_rowid, chunk_size, migrated):
+    """
+    Migrate the next chunk after `last_rowid` in one transaction.
+
+    Returns (new last rowid, legacy rows read, order items inserted, rows skipped because
+    their order is gone, rows skipped because their product is gone); rows read is 0 when done.
+    """
+    rows = conn.execute(
+        'SELECT "op"."rowid", "op"."order_id", "op"."product_id", "p"."price", "o"."id", "p"."id" '
+        'FROM "order_product" AS "op" '
+        'LEFT JOIN "product" AS "p" ON "p"."id" = "op"."product_id" '
+        'LEFT JOIN "order" AS "o" ON "o"."id" = "op"."order_id" '
+        'WHERE "op"."rowid" > ? ORDER BY "op"."rowid" LIMIT ?',
+        (last_rowid, chunk_size)
+    ).fetchall()
+    if not rows:
+        return last_rowid, 0, 0, 0, 0
+
+    now = datetime.now(timezone.utc).isoformat(" ")
+    # Legacy rows pointing at deleted orders or products are skipped
+    items = [
+        (order_id, product_id, 1, price, price, now, now, order_id, product_id)
+        for _, order_id, product_id, price, existing_order, existing_product in rows
+        if existing_order is not None and existing_product is not None
+    ]
+    missing_orders = sum(1 for row in rows if row[4] is None)
+    missing_products = sum(1 for row in rows if row[4] is not None and row[5] is None)
+    order_ids = sorted({item[0] for item in items})
+    new_last_rowid = rows[-1][0]
+
+    conn.execute("BEGIN")
+    try:
+        changes = conn.total_changes
+        conn.executemany(
+            'INSERT INTO "order_items" ("order_id", "product_id", "quantity", "unit_price", "subtotal", '
+            '"created_at", "updated_at") SELECT ?, ?, ?, ?, ?, ?, ? '
+            'WHERE NOT EXISTS (SELECT 1 FROM "order_items" WHERE "order_id" = ? AND "product_id" = ?)',
+            items
+        )
+        inserted = conn.total_changes - changes
+        # Keep the denormalized order summary columns in step with the new items
+        affected = [(order_id,) for order_id in order_ids]
+        conn.executemany(
+            'UPDATE "order" SET '
+            '"item_count" = (SELECT COUNT(*) FROM "order_items" WHERE "order_id" = "order"."id"), '
+            '"total_quantity" = (SELECT COALESCE(SUM("quantity"), 0) FROM "order_items" WHERE "order_id" = "order"."id") '
+            'WHERE "id" = ?',
+            affected
+        )
+        conn.executemany(
+            'UPDATE "order" SET "item_summary" = ('
+            'SELECT "product"."name" FROM "order_items" '
+            'JOIN "product" ON "product"."id" = "order_items"."product_id" '
+            'WHERE "order_items"."order_id" = "order"."id" ORDER BY "order_items"."id" LIMIT 1'
+            ') || CASE WHEN "item_count" > 1 THEN \' +\' || ("item_count" - 1) || \' more\' ELSE \'\' END '
+            'WHERE "id" = ?',
+            affected
+        )
+        conn.execute(
+            'INSERT INTO "migration_checkpoint" ("name", "last_rowid", "migrated") VALUES (?, ?, ?) '
+            'ON CONFLICT ("name") DO UPDATE SET "last_rowid" = excluded."last_rowid", "migrated" = excluded."migrated"',
+            (CHECKPOINT_NAME, new_last_rowid, migrated + inserted)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return new_last_rowid, len(rows), inserted, missing_orders, missing_products
+
+def migrate_order_items(db_path, chunk_size=DEFAULT_CHUNK_SIZE, reset=False):
+    print("Starting migration of order items...")
+
+    # Connect to SQLite database directly; transactions are managed explicitly per chunk
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Check if the order_product table exists (the default M2M table created by Tortoise)
+        order_product_exists = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='order_product'"
+        ).fetchone() is not None
+        if not order_product_exists:
+            print("No existing order_product table found. No data to migrate.")
+            return
+
+        last_rowid, migrated = load_checkpoint(conn, reset)
+        if last_rowid:
+            print(f"Resuming after legacy row {last_rowid} ({migrated} order items already migrated)")
+        else:
+            print("Found existing order_product table, migrating data...")
+
+        started = time.perf_counter()
+        read_total = 0
+        inserted_total = 0
+        missing_orders_total = 0
+        missing_products_total = 0
+        while True:
+            chunk_started = time.perf_counter()
+            last_rowid, read, inserted, missing_orders, missing_products = migrate_chunk(
+                conn, last_rowid, chunk_size, migrated
+            )
+            if not read:
+                break
+            migrated += inserted
+            read_total += read
+            inserted_total += inserted
+            missing_orders_total += missing_orders
+            missing_products_total += missing_products
+            chunk_elapsed = time.perf_counter() - chunk_started
+            print(f"Migrated {inserted} order items up to legacy row {last_rowid} "
+                  f"({read / chunk_elapsed:,.0f} rows/sec, {migrated} total)")
+
+        elapsed = time.perf_counter() - started
+        already_migrated = read_total - inserted_total - missing_orders_total - missing_products_total
+        rate = read_total / elapsed if elapsed else 0
+        print(f"Read {read_total} legacy rows and inserted {inserted_total} order items "
+              f"in {elapsed:.2f}s ({rate:,.0f} rows/sec); skipped {missing_orders_total} rows for missing orders, "
+              f"{missing_products_total} for missing products and {already_migrated} already migrated")
+    finally:
+        conn.close()
+
     print("Migration completed successfully!")
 
+def main():
+    parser = argparse.ArgumentParser(description='Migrate the legacy order_product table into order_items.')
+    parser.add_argument('--db', default=DATABASE_URL.replace("sqlite://", ""),
+                        help='SQLite database file (default: the application database)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Legacy rows migrated per transaction (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--reset', action='store_true',
+                        help='Ignore any saved checkpoint and start from the beginning; items that already exist are kept')
+    args = parser.parse_args()
+
+    asyncio.run(create_schema(args.db))
+    migrate_order_items(args.db, args.chunk_size, args.reset)
+
 if __name__ == "__main__":
-    asyncio.run(migrate_order_items()) 
\ No newline at end of file
+    main()
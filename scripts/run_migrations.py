@@ -10,32 +10,32 @@ import asyncio
 # Add the parent directory to the path so we can import the app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from aerich import Command
-from app.db.database import DATABASE_URL
-
-# Convert URL to Tortoise format if needed
-# sqlite:///./order_management.db -> sqlite://order_management.db
-DB_URL = DATABASE_URL.replace('sqlite:///./','sqlite://')
-
-# Tortoise ORM config
-TORTOISE_ORM = {
-    "connections": {"default": DB_URL},
-    "apps": {
-        "models": {
-            "models": ["app.models.models", "aerich.models"],
-            "default_connection": "default",
-        },
-    },
-}
+from tortoise import Tortoise
+from app.db.database import latest_migration, migration_command
 
 async def run_migrations(args):
     """Run database migrations based on the provided arguments."""
-    command = Command(tortoise_config=TORTOISE_ORM, app="models")
-    
+    command = migration_command()
+
+    if args.command == 'init-db' and latest_migration() is not None:
+        # init-db writes the first migration; this project has its migrations already
+        print("Error: migrations already exist. Set up a new database with "
+              "'python run_migrations.py upgrade' instead.")
+        sys.exit(1)
+
+    # Every command needs Tortoise and the migration state loaded first
+    await command.init()
+    try:
+        await run_command(command, args)
+    finally:
+        await Tortoise.close_connections()
+
+    print("Done!")
+
+async def run_command(command, args):
     # Determine which command to run
     if args.command == 'init':
-        print("Initializing Aerich...")
-        await command.init()
+        print("Aerich initialized.")
     
     elif args.command == 'init-db':
         print("Initializing database...")
@@ -51,37 +51,31 @@ async def run_migrations(args):
     
     elif args.command == 'upgrade':
         print("Upgrading database to the latest version...")
-        await command.upgrade()
+        for version in await command.upgrade():
+            print(f"Applied {version}")
     
     elif args.command == 'downgrade':
-        if args.version:
+        if args.version is not None:
             print(f"Downgrading database to version {args.version}...")
-            await command.downgrade(args.version)
+            for version in await command.downgrade(args.version, delete=False):
+                print(f"Reverted {version}")
         else:
             print("Error: A version is required for the 'downgrade' command.")
             sys.exit(1)
     
     elif args.command == 'history':
         print("Showing migration history...")
-        migrations = await command.history()
-        for migration in migrations:
-            print(f"Version: {migration.version}")
-            print(f"App: {migration.app}")
-            print(f"Name: {migration.name}")
-            print(f"Applied: {migration.applied}")
-            print("-" * 50)
+        for version in await command.history():
+            print(version)
     
     elif args.command == 'heads':
-        print("Showing current heads...")
-        heads = await command.heads()
-        for head in heads:
-            print(f"App: {head[0]}, Version: {head[1]}")
+        print("Showing migrations not applied yet...")
+        for version in await command.heads():
+            print(version)
     
     else:
         print(f"Error: Unknown command '{args.command}'")
         sys.exit(1)
-    
-    print("Done!")
 
 def main():
     parser = argparse.ArgumentParser(description='Run database migrations with Aerich.')
@@ -102,7 +96,8 @@ def main():
     
     # Downgrade command
     downgrade_parser = subparsers.add_parser('downgrade', help='Revert the database to a previous version')
-    downgrade_parser.add_argument('--version', '-v', required=True, help='Version to downgrade to')
+    downgrade_parser.add_argument('--version', '-v', type=int, required=True,
+                                  help='Number of the oldest migration to revert (its file name prefix)')
     
     # History command
     history_parser = subparsers.add_parser('history', help='Show migration history')
@@ -1,19 +1,22 @@
 #!/usr/bin/env python3
 """
 Script to view the contents of the database using Tortoise ORM.
+
+Rows are streamed in chunks, so memory use stays constant for any database size.
 """
 import sys
 import os
-from datetime import datetime
+import argparse
+import csv
+import json
 from tabulate import tabulate
-import asyncio
 
 # Add the parent directory to the path so we can import the app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tortoise import Tortoise, run_async
 from app.db.database import DATABASE_URL
-from app.models.models import Customer, Product, Order, Inventory
+from app.db.streaming import TABLE_QUERIES, DEFAULT_CHUNK_SIZE, count_rows, stream_rows
 
 # Convert URL to Tortoise format if needed
 DB_URL = DATABASE_URL.replace('sqlite:///./','sqlite://')
@@ -25,104 +28,68 @@ async def init_tortoise():
         modules={"models": ["app.models.models"]}
     )
 
-async def view_database():
+async def view_table(table, args):
+    """Stream one table to stdout in the requested format."""
+    total = await count_rows(table, args.where)
+
+    if args.format == "table":
+        print(f"\n=== {table.upper()} ({total} rows) ===")
+    else:
+        print(f"{table}: {total} rows", file=sys.stderr)
+    if args.count_only:
+        return
+
+    writer = None
+    async for rows in stream_rows(table, args.where, args.limit, args.offset, args.chunk_size):
+        if args.format == "table":
+            # One grid per chunk, like pages of a pager
+            print(tabulate(rows, headers="keys", tablefmt="grid"))
+        elif args.format == "csv":
+            if writer is None:
+                writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+                writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                sys.stdout.write(json.dumps(row, default=str) + "\n")
+
+async def view_database(args):
     """View the contents of the database."""
     # Initialize Tortoise ORM
     await init_tortoise()
-    
+
     try:
-        # Get all data
-        customers = await Customer.all()
-        products = await Product.all()
-        orders = await Order.all().prefetch_related('customer')
-        inventories = await Inventory.all().prefetch_related('product')
-        
-        # Display customers
-        print("\n=== CUSTOMERS ===")
-        customer_data = [
-            [c.id, c.name, c.email, c.phone, c.address, 
-             c.notes if c.notes else "N/A", 
-             c.created_at.strftime('%Y-%m-%d %H:%M:%S')]
-            for c in customers
-        ]
-        print(tabulate(
-            customer_data,
-            headers=["ID", "Name", "Email", "Phone", "Address", "Notes", "Created At"],
-            tablefmt="grid"
-        ))
-        
-        # Display products
-        print("\n=== PRODUCTS ===")
-        product_data = [
-            [p.id, p.name, p.description[:30] + "..." if p.description and len(p.description) > 30 else p.description, 
-             f"${p.price:.2f}", p.sku, p.created_at.strftime('%Y-%m-%d %H:%M:%S')]
-            for p in products
-        ]
-        print(tabulate(
-            product_data,
-            headers=["ID", "Name", "Description", "Price", "SKU", "Created At"],
-            tablefmt="grid"
-        ))
-        
-        # Display inventory
-        print("\n=== INVENTORY ===")
-        inventory_data = []
-        for inv in inventories:
-            restock_date = inv.last_restock_date.strftime('%Y-%m-%d %H:%M:%S') if inv.last_restock_date else "Never"
-            inventory_data.append([inv.id, inv.product.id, inv.product.name, inv.quantity, restock_date])
-        
-        print(tabulate(
-            inventory_data,
-            headers=["ID", "Product ID", "Product Name", "Quantity", "Last Restock Date"],
-            tablefmt="grid"
-        ))
-        
-        # Display orders
-        print("\n=== ORDERS ===")
-        order_data = []
-        for o in orders:
-            order_data.append([
-                o.id, o.customer.id, o.customer.name, o.order_date.strftime('%Y-%m-%d %H:%M:%S'),
-                o.status, f"${o.total_amount:.2f}"
-            ])
-        
-        print(tabulate(
-            order_data,
-            headers=["ID", "Customer ID", "Customer Name", "Order Date", "Status", "Total Amount"],
-            tablefmt="grid"
-        ))
-        
-        # Display order details
-        print("\n=== ORDER DETAILS ===")
-        order_details_data = []
-        
-        # Get all orders with their items
-        orders_with_items = await Order.all().prefetch_related('items', 'items__product')
-        
-        for order in orders_with_items:
-            # Get the order items
-            for item in order.items:
-                order_details_data.append([
-                    order.id,
-                    item.product.id,
-                    item.product.name,
-                    item.quantity,
-                    f"${item.unit_price:.2f}",
-                    f"${item.subtotal:.2f}"  # subtotal
-                ])
-        
-        print(tabulate(
-            order_details_data,
-            headers=["Order ID", "Product ID", "Product Name", "Quantity", "Unit Price", "Subtotal"],
-            tablefmt="grid"
-        ))
-        
+        for table in args.tables:
+            await view_table(table, args)
     except Exception as e:
-        print(f"Error viewing database: {e}")
+        print(f"Error viewing database: {e}", file=sys.stderr)
         raise
     finally:
         # Close Tortoise ORM connections
         await Tortoise.close_connections()
 
+def main():
+    parser = argparse.ArgumentParser(description='View the contents of the database.')
+    parser.add_argument('tables', nargs='*', metavar='table',
+                        help=f'Tables to show: {", ".join(TABLE_QUERIES)} (default: all)')
+    parser.add_argument('--format', choices=['table', 'csv', 'jsonl'], default='table',
+                        help='Output format (default: table)')
+    parser.add_argument('--where', help='SQL condition over the output columns, e.g. "status = \'pending\'"')
+    parser.add_argument('--limit', type=int, help='Maximum rows to show per table')
+    parser.add_argument('--offset', type=int, default=0, help='Rows to skip per table')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows fetched per query (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--count-only', action='store_true', help='Only print row counts')
+    args = parser.parse_args()
+
+    args.tables = args.tables or list(TABLE_QUERIES)
+    unknown = [table for table in args.tables if table not in TABLE_QUERIES]
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(unknown)}")
+    if args.format != 'table' and len(args.tables) != 1:
+        parser.error("csv and jsonl output need exactly one table")
+
+    run_async(view_database(args))
+
 if __name__ == "__main__":
-    run_async(view_database())
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Production entry point: several uvicorn worker processes sharing one listening socket.
+
+Unlike run.py there is no auto-reload. uvloop and httptools are used when installed,
+and the app starts in production mode (APP_ENV=production: no DDL, schema version
+check). With more than one worker every process opens its own connection to the
+SQLite file, so transactions take the write lock up front (BEGIN IMMEDIATE) and wait
+for each other for up to SQLITE_BUSY_TIMEOUT_MS instead of failing. Metrics, the slow
+query log and profiles are kept per worker, and traffic capture needs a single worker.
+
+On SIGTERM or SIGINT the workers stop accepting connections, finish the requests in
+flight (for up to --graceful-timeout seconds), run the app's shutdown, and exit.
+"""
+import argparse
+import copy
+import importlib.util
+import os
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1
+
+def log_config(level: str) -> dict:
+    # uvicorn's logging, plus the app's own loggers (startup timings, slow queries, ...)
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["app"] = {"handlers": ["default"], "level": level.upper(), "propagate": False}
+    return config
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8001, help="Port (default: 8001)")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: $WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--backlog", type=int, default=2048,
+                        help="Connections the kernel queues before accept (default: 2048)")
+    parser.add_argument("--keep-alive", type=int, default=5,
+                        help="Seconds an idle keep-alive connection stays open (default: 5)")
+    parser.add_argument("--limit-concurrency", type=int,
+                        help="Connections per worker before new ones get 503 (default: no limit)")
+    parser.add_argument("--max-requests", type=int,
+                        help="Stop a worker after this many requests (default: never)")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds to finish in-flight requests on shutdown (default: 30)")
+    parser.add_argument("--access-log", action="store_true", help="Log every request (costs throughput)")
+    parser.add_argument("--log-level", default="info", help="Log level (default: info)")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and os.getenv("TRAFFIC_CAPTURE_FILE"):
+        # Workers would interleave lines in one file, each pseudonymizing with its own salt
+        parser.error("TRAFFIC_CAPTURE_FILE needs --workers 1; capture traffic with a single worker")
+
+    # Read by the app in each worker process, which inherits this environment
+    os.environ.setdefault("APP_ENV", "production")
+    if args.workers > 1:
+        os.environ.setdefault("SQLITE_IMMEDIATE_TRANSACTIONS", "1")
+
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(f"Starting {args.workers} worker(s) on {args.host}:{args.port} with loop={loop} http={http}")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency,
+        limit_max_requests=args.max_requests,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+        log_level=args.log_level,
+        log_config=log_config(args.log_level),
+        # Skip the Server header; one less header per response
+        server_header=False,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
+from httpx import AsyncClient
 from tortoise import Tortoise
 from tortoise.contrib.fastapi import register_tortoise
 
 from app.main import app
+from app.db.instrumentation import capture_queries
 from app.models.models import Customer, Product, Inventory, Order
 
 # Create test client
@@ -11,6 +14,33 @@ from app.models.models import Customer, Product, Inventory, Order
 def client():
     return TestClient(app)
 
+@pytest.fixture(scope="function")
+async def async_client(test_db):
+    """
+    Async test client that runs the app on the test's own event loop.
+    
+    TestClient starts a fresh event loop per request, which breaks when a handler runs
+    concurrent queries (e.g. several prefetches) across more than one request in a test.
+    """
+    async with AsyncClient(app=app, base_url="http://test") as async_test_client:
+        yield async_test_client
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fail when a block issues more SQL queries than allowed.
+    
+    Usage: `with assert_max_queries(3): client.get(...)`. The failure message lists the
+    statements that ran, so N+1 regressions are easy to spot.
+    """
+    @contextmanager
+    def assert_max(limit):
+        with capture_queries() as stats:
+            yield stats
+        statements = "\n".join(f"{count}x {query}" for query, count in stats.statements.items())
+        assert stats.queries <= limit, f"{stats.queries} SQL queries, expected at most {limit}:\n{statements}"
+    return assert_max
+
 @pytest.fixture(scope="function")
 async def test_db():
     """Initialize an in-memory SQLite database for testing."""
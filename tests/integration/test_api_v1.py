@@ -1,6 +1,12 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
+from app import config
 from app.main import app, API_V1_PREFIX
+from app.db import instrumentation
+from app.db.archive import archive_order_batch, archive_orders
+from app.db.slow_queries import SLOW_QUERY_LOG
+from app.models.models import ArchivedOrderItem, Customer, Inventory, Order, OrderItem, Product
 
 # Create test client
 client = TestClient(app)
@@ -104,6 +110,84 @@ async def test_get_all_customers(test_db):
     assert "customer1@example.com" in emails
     assert "customer2@example.com" in emails
 
+@pytest.mark.asyncio
+async def test_get_customers_by_ids(test_db):
+    """Test fetching several customers in one request."""
+    customer_ids = []
+    for i in range(3):
+        response = client.post(
+            f"{API_V1_PREFIX}/customers/",
+            json={"name": f"Customer {i}", "email": f"batch{i}@example.com"},
+        )
+        customer_ids.append(response.json()["id"])
+    
+    requested = [customer_ids[2], 9999, customer_ids[0]]
+    response = client.get(f"{API_V1_PREFIX}/customers/?ids={','.join(map(str, requested))}")
+    assert response.status_code == 200
+    assert [customer["id"] for customer in response.json()] == [customer_ids[2], customer_ids[0]]
+    assert response.headers["X-Missing-Ids"] == "9999"
+    
+    # Readable by browser clients on other origins
+    response = client.get(
+        f"{API_V1_PREFIX}/customers/?ids={','.join(map(str, requested))}", headers={"Origin": "https://shop.example"}
+    )
+    assert "x-missing-ids" in response.headers["Access-Control-Expose-Headers"].lower()
+    
+    # Malformed ids are rejected
+    response = client.get(f"{API_V1_PREFIX}/customers/?ids=1,abc")
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_customer_orders(test_db, test_customer):
+    """Test paging through a customer's order history."""
+    base_date = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for day in range(5):
+        await Order.create(
+            customer=test_customer,
+            order_date=base_date + timedelta(days=day),
+            status="completed" if day % 2 else "pending",
+            total_amount=float(day)
+        )
+    
+    # Most recent first, two per page
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}/orders?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [order["total_amount"] for order in page["items"]] == [4.0, 3.0]
+    assert page["items"][0]["customer"]["id"] == test_customer.id
+    assert page["has_next"] is True
+    
+    seen = [order["total_amount"] for order in page["items"]]
+    while page["has_next"]:
+        page = client.get(
+            f"{API_V1_PREFIX}/customers/{test_customer.id}/orders",
+            params={"limit": 2, "cursor": page["next_cursor"]},
+        ).json()
+        seen += [order["total_amount"] for order in page["items"]]
+    assert seen == [4.0, 3.0, 2.0, 1.0, 0.0]
+    assert page["next_cursor"] is None
+    
+    # Status filter with summary rows only
+    response = client.get(
+        f"{API_V1_PREFIX}/customers/{test_customer.id}/orders",
+        params={"status": "pending", "summary": True},
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [order["total_amount"] for order in items] == [4.0, 2.0, 0.0]
+    assert "customer" not in items[0]
+    assert "items" not in items[0]
+    
+    # Date range filter
+    response = client.get(
+        f"{API_V1_PREFIX}/customers/{test_customer.id}/orders",
+        params={"start_date": "2025-01-02T00:00:00+00:00", "end_date": "2025-01-04T00:00:00+00:00"},
+    )
+    assert [order["total_amount"] for order in response.json()["items"]] == [2.0, 1.0]
+    
+    response = client.get(f"{API_V1_PREFIX}/customers/9999/orders")
+    assert response.status_code == 404
+
 # Product API Tests
 @pytest.mark.asyncio
 async def test_create_product(test_db):
@@ -179,6 +263,54 @@ async def test_delete_product(test_db):
     get_response = client.get(f"{API_V1_PREFIX}/products/{product_id}")
     assert get_response.status_code == 404
 
+@pytest.mark.asyncio
+async def test_bulk_upsert_products(test_db):
+    """Test upserting a product feed keyed on SKU."""
+    client.post(
+        f"{API_V1_PREFIX}/products/",
+        json={"name": "Existing", "description": "Unchanged", "price": 10.0, "sku": "BULK001"},
+    )
+    client.post(
+        f"{API_V1_PREFIX}/products/",
+        json={"name": "Old Name", "price": 5.0, "sku": "BULK002"},
+    )
+    
+    response = client.post(
+        f"{API_V1_PREFIX}/products/bulk",
+        json={
+            "items": [
+                {"name": "Existing", "description": "Unchanged", "price": 10.0, "sku": "BULK001"},
+                {"name": "New Name", "price": 6.0, "sku": "BULK002"},
+                {"name": "Brand New", "price": 1.0, "sku": "BULK003"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 1, "updated": 1, "unchanged": 1}
+    
+    products = {product["sku"]: product for product in client.get(f"{API_V1_PREFIX}/products/").json()}
+    assert len(products) == 3
+    assert products["BULK002"]["name"] == "New Name"
+    assert products["BULK002"]["price"] == 6.0
+    assert products["BULK003"]["name"] == "Brand New"
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids(test_db):
+    """Test fetching several products in one request, preserving the requested order."""
+    product_ids = []
+    for i in range(3):
+        response = client.post(
+            f"{API_V1_PREFIX}/products/",
+            json={"name": f"Product {i}", "price": 10.0, "sku": f"BATCH{i:03d}"},
+        )
+        product_ids.append(response.json()["id"])
+    
+    requested = [product_ids[1], product_ids[0], product_ids[1]]
+    response = client.get(f"{API_V1_PREFIX}/products/?ids={','.join(map(str, requested))}")
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [product_ids[1], product_ids[0]]
+    assert "X-Missing-Ids" not in response.headers
+
 # Inventory API Tests
 @pytest.mark.asyncio
 async def test_create_inventory(test_db):
@@ -336,6 +468,170 @@ async def test_get_order(test_db):
     assert data["items"][0]["product_id"] == product_id
     assert data["items"][0]["quantity"] == 2
 
+@pytest.mark.asyncio
+async def test_get_orders_by_ids(test_db, test_customer):
+    """Test fetching several orders in one request."""
+    first = await Order.create(customer=test_customer, total_amount=10.0)
+    second = await Order.create(customer=test_customer, total_amount=20.0)
+    
+    response = client.get(f"{API_V1_PREFIX}/orders/?ids={second.id},{first.id},{second.id + 100}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [order["id"] for order in data] == [second.id, first.id]
+    assert data[0]["customer"]["id"] == test_customer.id
+    assert response.headers["X-Missing-Ids"] == str(second.id + 100)
+
+@pytest.mark.asyncio
+async def test_filter_and_sort_orders(async_client, test_customer):
+    """Test filtering and sorting the order list server-side."""
+    other_customer = await Customer.create(name="Other Customer", email="other@example.com")
+    base_date = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    await Order.create(customer=test_customer, order_date=base_date, status="pending", total_amount=50.0)
+    await Order.create(customer=test_customer, order_date=base_date + timedelta(days=1), status="completed", total_amount=10.0)
+    await Order.create(customer=other_customer, order_date=base_date + timedelta(days=2), status="pending", total_amount=30.0)
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"status": "pending", "sort": "-order_date"})
+    assert response.status_code == 200
+    assert [order["total_amount"] for order in response.json()] == [30.0, 50.0]
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"customer_id": test_customer.id, "sort": "total_amount"})
+    assert [order["total_amount"] for order in response.json()] == [10.0, 50.0]
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"min_total": 20, "max_total": 40})
+    assert [order["total_amount"] for order in response.json()] == [30.0]
+    
+    response = await async_client.get(
+        f"{API_V1_PREFIX}/orders/",
+        params={"start_date": "2025-01-02T00:00:00+00:00", "end_date": "2025-01-03T00:00:00+00:00"},
+    )
+    assert [order["total_amount"] for order in response.json()] == [10.0]
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"sort": "customer"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_order_projection(async_client, test_customer, test_product):
+    """Test selecting order columns and relations with fields/include."""
+    order = await Order.create(customer=test_customer, status="pending", total_amount=39.98)
+    await OrderItem.create(order=order, product=test_product, quantity=2, unit_price=19.99, subtotal=39.98)
+    
+    # Default responses are unchanged
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/{order.id}")
+    data = response.json()
+    assert data["customer"]["id"] == test_customer.id
+    assert data["items"][0]["product_name"] == "Test Product"
+    
+    # Columns only, no relations
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"fields": "status,total_amount", "include": ""})
+    assert response.status_code == 200
+    assert response.json() == [{"id": order.id, "status": "pending", "total_amount": 39.98}]
+    
+    # A single relation
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/{order.id}", params={"fields": "id", "include": "items"})
+    data = response.json()
+    assert set(data) == {"id", "items"}
+    assert data["items"][0]["quantity"] == 2
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/", params={"fields": "password"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_order_item_summary(async_client, test_customer, test_product, test_inventory):
+    """Test that creating an order maintains the denormalized item summary."""
+    second_product = await Product.create(name="Second Product", price=5.0, sku="TEST002")
+    await Inventory.create(product=second_product, quantity=10)
+    
+    response = await async_client.post(
+        f"{API_V1_PREFIX}/orders/",
+        json={
+            "customer_id": test_customer.id,
+            "items": [
+                {"product_id": test_product.id, "quantity": 2},
+                {"product_id": second_product.id, "quantity": 3},
+            ]
+        },
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["item_count"] == 2
+    assert data["total_quantity"] == 5
+    assert data["item_summary"] == "Test Product +1 more"
+    
+    # List view served from the order row alone
+    response = await async_client.get(
+        f"{API_V1_PREFIX}/orders/",
+        params={"fields": "item_count,total_quantity,item_summary", "include": ""},
+    )
+    assert response.json() == [
+        {"id": data["id"], "item_count": 2, "total_quantity": 5, "item_summary": "Test Product +1 more"}
+    ]
+
+@pytest.mark.asyncio
+async def test_archived_order_fallback(async_client, test_customer, test_product):
+    """Test that archived orders move out of the hot tables but stay readable."""
+    old_date = datetime.now(timezone.utc) - timedelta(days=120)
+    archived = await Order.create(customer=test_customer, order_date=old_date, status="completed", total_amount=19.99)
+    await OrderItem.create(order=archived, product=test_product, quantity=1, unit_price=19.99, subtotal=19.99)
+    pending = await Order.create(customer=test_customer, order_date=old_date, status="pending")
+    recent = await Order.create(customer=test_customer, status="completed")
+    
+    assert await archive_orders(older_than_days=90, batch_size=1) == 1
+    assert set(await Order.all().values_list("id", flat=True)) == {pending.id, recent.id}
+    assert await OrderItem.filter(order_id=archived.id).count() == 0
+    assert await ArchivedOrderItem.filter(order_id=archived.id).count() == 1
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/{archived.id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["customer"]["id"] == test_customer.id
+    assert data["items"][0]["product_name"] == "Test Product"
+    
+    response = await async_client.get(f"{API_V1_PREFIX}/orders/{archived.id}/items")
+    assert response.status_code == 200
+    assert response.json()[0]["product_name"] == "Test Product"
+    
+    # Order history merges the archive in date order, in both response shapes
+    for summary in (False, True):
+        response = await async_client.get(
+            f"{API_V1_PREFIX}/customers/{test_customer.id}/orders", params={"limit": 2, "summary": summary}
+        )
+        page = response.json()
+        assert [order["id"] for order in page["items"]] == [recent.id, pending.id]
+        response = await async_client.get(
+            f"{API_V1_PREFIX}/customers/{test_customer.id}/orders",
+            params={"limit": 2, "summary": summary, "cursor": page["next_cursor"]},
+        )
+        assert [order["id"] for order in response.json()["items"]] == [archived.id]
+    response = await async_client.get(
+        f"{API_V1_PREFIX}/customers/{test_customer.id}/orders", params={"status": "completed", "summary": True}
+    )
+    assert [order["id"] for order in response.json()["items"]] == [recent.id, archived.id]
+    
+    # Archived orders are read-only
+    response = await async_client.put(f"{API_V1_PREFIX}/orders/{archived.id}", json={"status": "pending"})
+    assert response.status_code == 409
+    response = await async_client.delete(f"{API_V1_PREFIX}/orders/{archived.id}")
+    assert response.status_code == 409
+    assert (await async_client.delete(f"{API_V1_PREFIX}/orders/999999")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_new_orders_are_not_archived(async_client, test_customer, test_product, test_inventory):
+    """Test that an order placed after the archive cutoff is dated when it is placed, and kept."""
+    cutoff = datetime.now(timezone.utc)
+    response = await async_client.post(
+        f"{API_V1_PREFIX}/orders/",
+        json={"customer_id": test_customer.id, "items": [{"product_id": test_product.id, "quantity": 1}]},
+    )
+    assert response.status_code == 201
+    order_id = response.json()["id"]
+    await Order.filter(id=order_id).update(status="completed")
+    
+    order = await Order.get(id=order_id)
+    assert order.order_date >= cutoff and order.created_at >= cutoff
+    assert await archive_order_batch(cutoff) == 0
+    assert await Order.filter(id=order_id).exists()
+
 @pytest.mark.asyncio
 async def test_update_order_status(test_db):
     """Test updating an order status."""
@@ -434,4 +730,213 @@ async def test_error_handling_insufficient_inventory(test_db):
             "items": [{"product_id": product_id, "quantity": 10}]  # More than available
         },
     )
-    assert response.status_code == 400  # Bad Request 
\ No newline at end of file
+    assert response.status_code == 400  # Bad Request 
+
+@pytest.mark.asyncio
+async def test_bulk_inventory_adjustments(test_db):
+    """Test applying a batch of inventory adjustments by product ID and SKU."""
+    product_ids = []
+    for i in range(3):
+        response = client.post(
+            f"{API_V1_PREFIX}/products/",
+            json={"name": f"Product {i}", "price": 10.0, "sku": f"ADJ{i:03d}"},
+        )
+        product_ids.append(response.json()["id"])
+    await Inventory.create(product_id=product_ids[0], quantity=10)
+    await Inventory.create(product_id=product_ids[1], quantity=10)
+
+    response = client.post(
+        f"{API_V1_PREFIX}/inventory/adjustments",
+        json={
+            "items": [
+                {"product_id": product_ids[0], "delta": 5},
+                {"sku": "ADJ001", "delta": -4},
+                {"sku": "ADJ000", "delta": 1},
+                {"sku": "ADJ002", "delta": 7},  # No inventory record yet
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [level["product_id"] for level in data] == product_ids
+    assert [level["quantity"] for level in data] == [16, 6, 7]
+    assert data[0]["last_restock_date"] is not None
+    assert data[1]["last_restock_date"] is None
+    assert data[2]["sku"] == "ADJ002"
+
+@pytest.mark.asyncio
+async def test_bulk_inventory_adjustments_rejected(test_db):
+    """Test that a batch is rejected as a whole on unknown products or negative stock."""
+    response = client.post(
+        f"{API_V1_PREFIX}/products/",
+        json={"name": "Product", "price": 10.0, "sku": "ADJ000"},
+    )
+    product_id = response.json()["id"]
+    await Inventory.create(product_id=product_id, quantity=2)
+
+    response = client.post(
+        f"{API_V1_PREFIX}/inventory/adjustments",
+        json={"items": [{"product_id": product_id, "delta": 3}, {"sku": "MISSING", "delta": 1}]},
+    )
+    assert response.status_code == 404
+
+    response = client.post(
+        f"{API_V1_PREFIX}/inventory/adjustments",
+        json={"items": [{"product_id": product_id, "delta": -3}]},
+    )
+    assert response.status_code == 400
+
+    inventory = await Inventory.get(product_id=product_id)
+    assert inventory.quantity == 2
+
+    response = client.post(
+        f"{API_V1_PREFIX}/inventory/adjustments",
+        json={"items": [{"product_id": product_id, "sku": "ADJ000", "delta": 1}]},
+    )
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_metrics(test_db, test_customer):
+    """Test that requests are recorded per route template with their SQL query counts."""
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}")
+    assert response.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    route = f'method="GET",route="{API_V1_PREFIX}/customers/{{customer_id}}"'
+    assert f'http_requests_total{{{route},status="200"}}' in body
+    assert f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}' in body
+    # Fetching the customer is one query
+    assert f'db_queries_per_request_bucket{{{route},le="0"}} 0' in body
+    assert f'db_queries_per_request_bucket{{{route},le="1"}}' in body
+    assert "http_requests_in_flight 1" in body
+
+@pytest.mark.asyncio
+async def test_query_budgets(async_client, test_customer, test_product, assert_max_queries):
+    """Test that list and detail endpoints issue a fixed number of queries, however many rows they return."""
+    for _ in range(10):
+        order = await Order.create(customer=test_customer, total_amount=19.99)
+        await OrderItem.create(order=order, product=test_product, quantity=1, unit_price=19.99, subtotal=19.99)
+    
+    # Orders, customers, items and their products
+    with assert_max_queries(4):
+        response = await async_client.get(f"{API_V1_PREFIX}/orders/")
+    assert len(response.json()) == 10
+    
+    with assert_max_queries(1):
+        await async_client.get(f"{API_V1_PREFIX}/orders/", params={"include": ""})
+    
+    with assert_max_queries(1):
+        await async_client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}")
+    
+    # Customer, orders, archived orders
+    with assert_max_queries(3):
+        await async_client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}/orders", params={"summary": True})
+
+@pytest.mark.asyncio
+async def test_order_write_query_budgets(async_client, test_customer, assert_max_queries):
+    """Test that creating and deleting an order issue a fixed number of queries, however many items it has."""
+    products = []
+    for index in range(5):
+        product = await Product.create(name=f"Budget Product {index}", price=2.5, sku=f"BUDGET-{index}")
+        await Inventory.create(product=product, quantity=10)
+        products.append(product)
+    items = [{"product_id": product.id, "quantity": 2} for product in products]
+    # A second line for the same product draws on the same stock
+    items.append({"product_id": products[0].id, "quantity": 1})
+    
+    # Customer, products, inventory, order, items, inventory update, then the order with its
+    # customer, items and products
+    with assert_max_queries(10):
+        response = await async_client.post(f"{API_V1_PREFIX}/orders/", json={"customer_id": test_customer.id, "items": items})
+    assert response.status_code == 201
+    order = response.json()
+    assert len(order["items"]) == 6
+    assert order["total_amount"] == 27.5
+    levels = dict(await Inventory.filter(product_id__in=[p.id for p in products]).values_list("product_id", "quantity"))
+    assert levels == {products[0].id: 7, **{product.id: 8 for product in products[1:]}}
+    
+    # Order, items, inventory update, delete
+    with assert_max_queries(4):
+        response = await async_client.delete(f"{API_V1_PREFIX}/orders/{order['id']}")
+    assert response.status_code == 204
+    levels = dict(await Inventory.filter(product_id__in=[p.id for p in products]).values_list("product_id", "quantity"))
+    assert levels == {product.id: 10 for product in products}
+
+@pytest.mark.asyncio
+async def test_query_count_headers(test_db, test_customer, monkeypatch):
+    """Test that debug mode reports each request's SQL queries in response headers."""
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}")
+    assert "X-Query-Count" not in response.headers
+    
+    monkeypatch.setattr(config, "DEBUG", True)
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}")
+    assert response.headers["X-Query-Count"] == "1"
+    assert float(response.headers["X-Query-Time-Ms"]) >= 0
+
+@pytest.mark.asyncio
+async def test_slow_query_log(test_db, test_customer, monkeypatch):
+    """Test that slow statements are aggregated with their plans and exposed to admins."""
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(instrumentation, "_slow_query_log", SLOW_QUERY_LOG)
+    monkeypatch.setattr(SLOW_QUERY_LOG, "threshold", 0.0)
+    SLOW_QUERY_LOG.reset()
+    
+    for _ in range(2):
+        client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}")
+    
+    response = client.get("/admin/slow-queries")
+    assert response.status_code == 403
+    
+    response = client.get("/admin/slow-queries", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["threshold_ms"] == 0
+    customer_query = next(query for query in report["queries"] if 'FROM "customer"' in query["fingerprint"])
+    assert customer_query["count"] == 2
+    assert customer_query["last_params"] == [test_customer.id, 1]
+    assert "SEARCH customer USING INTEGER PRIMARY KEY (rowid=?)" in customer_query["plan"]
+    route = f"GET {API_V1_PREFIX}/customers/{test_customer.id} (read_customer)"
+    assert customer_query["routes"] == {route: 2}
+    
+    response = client.delete("/admin/slow-queries", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 204
+    assert SLOW_QUERY_LOG.summary() == []
+
+@pytest.mark.asyncio
+async def test_admin_disabled_without_token(test_db):
+    """Test that admin endpoints do not exist unless a token is configured."""
+    response = client.get("/admin/slow-queries", headers={"X-Admin-Token": ""})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_admin_profile(test_db, test_customer, monkeypatch):
+    """Test on-demand and per-request profiling output."""
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    
+    response = client.get(
+        "/admin/profile",
+        params={"seconds": 0.2, "interval_ms": 5, "include_idle": True},
+        headers={"X-Admin-Token": "secret"},
+    )
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    # Collapsed format: semicolon-separated frames, then a count
+    stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "select (selectors.py:" in stack
+    
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}", headers={"X-Profile": "wrong"})
+    assert "X-Profile-Id" not in response.headers
+    
+    response = client.get(f"{API_V1_PREFIX}/customers/{test_customer.id}", headers={"X-Profile": "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    response = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    
+    response = client.get("/admin/profiles/unknown", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 404
@@ -181,4 +181,21 @@ async def test_error_handling_invalid_product_id(test_db):
     """Test error handling for invalid product ID."""
     # Test with non-existent product ID
     response = client.get(f"{API_V2_PREFIX}/products/9999")
-    assert response.status_code == 404  # Not Found 
\ No newline at end of file
+    assert response.status_code == 404  # Not Found 
+
+@pytest.mark.asyncio
+async def test_product_fields_projection(test_db):
+    """Test returning only selected product columns in the v2 API."""
+    client.post(
+        f"{API_V1_PREFIX}/products/",
+        json={"name": "Test Product", "description": "A test product", "price": 19.99, "sku": "TEST001"},
+    )
+    
+    response = client.get(f"{API_V2_PREFIX}/products/?fields=name,price")
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert set(item) == {"id", "name", "price"}
+    assert item["price"] == 19.99
+    
+    response = client.get(f"{API_V2_PREFIX}/products/?fields=cost")
+    assert response.status_code == 422
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from app.admission import QUEUE_FULL, QUEUE_TIMEOUT, Budget
+from app.db.lanes import ADMIN, BULK, INTERACTIVE, current_lane
+from app.middleware.admission import READ, WRITE, AdmissionControlMiddleware
+from app.middleware.lanes import PriorityLaneMiddleware
+from app.middleware.metrics import MetricsRegistry
+
+@pytest.mark.asyncio
+async def test_budget_queue():
+    """Test that a budget admits up to its concurrency and hands freed slots to waiters in order."""
+    budget = Budget("write", concurrency=1, max_queue=2)
+    assert await budget.acquire(1) is None
+
+    admitted = []
+    async def wait(name):
+        if await budget.acquire(1) is None:
+            admitted.append(name)
+    first = asyncio.create_task(wait("first"))
+    second = asyncio.create_task(wait("second"))
+    await asyncio.sleep(0)
+    assert budget.queued == 2
+    assert await budget.acquire(1) == QUEUE_FULL
+
+    budget.release()
+    await first
+    assert admitted == ["first"] and budget.in_flight == 1
+    budget.release()
+    await second
+    budget.release()
+    assert admitted == ["first", "second"] and budget.in_flight == 0
+
+    # A waiter that runs out of time leaves the queue
+    assert await budget.acquire(1) is None
+    assert await budget.acquire(0.01) == QUEUE_TIMEOUT
+    assert budget.queued == 0
+
+@pytest.mark.asyncio
+async def test_overloaded_requests_are_shed():
+    """Test that requests over budget get 503 with Retry-After, and only API routes are limited."""
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/api/v1/orders/":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    registry = MetricsRegistry()
+    budgets = {READ: Budget(READ, 8, 8), WRITE: Budget(WRITE, 1, 1)}
+    middleware = AdmissionControlMiddleware(app, budgets, queue_timeout=0.05, retry_after=2, registry=registry)
+
+    async with AsyncClient(app=middleware, base_url="http://test") as client:
+        holding = asyncio.create_task(client.post("/api/v1/orders/"))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(client.post("/api/v1/orders/"))
+        await asyncio.sleep(0.01)
+        full = await client.post("/api/v1/orders/")
+        timed_out = await waiting
+        # Reads and non-API routes are not held up by the writes
+        assert (await client.get("/api/v1/products/")).status_code == 200
+        assert (await client.post("/admin/reset")).status_code == 200
+        release.set()
+        assert (await holding).status_code == 200
+
+    for response in (full, timed_out):
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+        assert response.json() == {"detail": "Service overloaded, retry later"}
+    assert registry.shed.values == {(WRITE, QUEUE_FULL): 1, (WRITE, QUEUE_TIMEOUT): 1}
+    assert budgets[WRITE].in_flight == 0
+    assert 'http_admission_in_flight{class="write"} 0' in registry.render()
+
+@pytest.mark.asyncio
+async def test_bulk_requests_do_not_hold_read_slots():
+    """Test that bulk requests queued on their lane are budgeted apart, so interactive reads are still admitted."""
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        # Database work, scheduled by lane; bulk work holds its single slot until released
+        lane = current_lane.get()
+        await lane.acquire(None)
+        try:
+            if lane.name == BULK:
+                await release.wait()
+        finally:
+            lane.release()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    registry = MetricsRegistry()
+    lanes = {INTERACTIVE: Budget(INTERACTIVE, 0), BULK: Budget(BULK, 1), ADMIN: Budget(ADMIN, 1)}
+    budgets = {READ: Budget(READ, 2, 2), WRITE: Budget(WRITE, 1, 1), BULK: Budget(BULK, 2, 1)}
+    middleware = AdmissionControlMiddleware(
+        PriorityLaneMiddleware(app, lanes, registry), budgets, queue_timeout=0.05, registry=registry
+    )
+
+    async with AsyncClient(app=middleware, base_url="http://test") as client:
+        exports = [asyncio.create_task(client.get("/api/v1/orders/?limit=10000")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        # One export runs, one waits for the lane, the rest queue for admission and are shed
+        assert lanes[BULK].in_flight == 1 and lanes[BULK].queued == 1
+        assert budgets[READ].in_flight == 0
+        reads = await asyncio.gather(*(client.get("/api/v1/products/1") for _ in range(4)))
+        assert [response.status_code for response in reads] == [200] * 4
+        # The queued export runs out of time while the lane is still held
+        await asyncio.sleep(0.1)
+        release.set()
+        statuses = sorted(response.status_code for response in await asyncio.gather(*exports))
+
+    assert statuses == [200, 200, 503, 503]
+    assert registry.shed.values == {(BULK, QUEUE_FULL): 1, (BULK, QUEUE_TIMEOUT): 1}
+    assert budgets[BULK].in_flight == 0 and lanes[BULK].in_flight == 0
@@ -0,0 +1,32 @@
+from benchmarks.compare import compare
+
+def make_report(**results):
+    return {"meta": {}, "results": results}
+
+def test_compare_flags_query_regressions():
+    """Test that any extra query fails the gate while latency has headroom."""
+    baseline = make_report(**{"orders.create": {"p50_ms": 10.0, "queries_per_request": 4.0}})
+    baseline["tolerances"] = {"p50_ms": {"relative": 0.5, "absolute": 1.0}}
+    
+    rows, regressions = compare(baseline, make_report(**{"orders.create": {"p50_ms": 15.5, "queries_per_request": 4.0}}))
+    assert regressions == 0
+    
+    rows, regressions = compare(baseline, make_report(**{"orders.create": {"p50_ms": 12.0, "queries_per_request": 5.0}}))
+    assert regressions == 1
+    assert ["orders.create", "queries_per_request", 4.0, 5.0, 4.0, "REGRESSION"] in rows
+
+def test_compare_scenario_tolerances_and_missing_scenarios():
+    """Test per-scenario tolerance overrides and scenarios missing from the current run."""
+    baseline = make_report(**{
+        "orders.list": {"p99_ms": 100.0},
+        "orders.get": {"p99_ms": 10.0},
+    })
+    baseline["scenario_tolerances"] = {"orders.list": {"p99_ms": {"relative": 2.0, "absolute": 0.0}}}
+    
+    rows, regressions = compare(baseline, make_report(**{
+        "orders.list": {"p99_ms": 290.0},
+        "orders.new": {"p99_ms": 1.0},
+    }))
+    assert regressions == 1
+    assert ["orders.get", "-", "-", "-", "-", "MISSING"] in rows
+    assert ["orders.new", "-", "-", "-", "-", "new (not in baseline)"] in rows
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from app import capture
+from app.admission import Budget
+from app.capture import TrafficRecorder, sanitize
+from app.middleware.admission import READ, WRITE, AdmissionControlMiddleware
+from app.middleware.capture import TrafficCaptureMiddleware
+from app.middleware.metrics import MetricsRegistry
+from benchmarks.replay import load_capture, replay, summarize
+
+def test_sanitize_pseudonymizes_sensitive_fields():
+    """Test that personal data is replaced consistently and everything else is kept."""
+    body = {
+        "customer_id": 3,
+        "name": "Jane Doe",
+        "email": "jane@example.org",
+        "items": [{"product_id": 1, "quantity": 2}],
+        "address": {"street": "1 Main St", "zip": 12345},
+    }
+    sanitized = sanitize(body, b"salt")
+
+    assert sanitized["customer_id"] == 3
+    assert sanitized["items"] == body["items"]
+    assert sanitized["name"].startswith("redacted-") and "Jane" not in sanitized["name"]
+    assert sanitized["email"].endswith("@example.com") and "jane" not in sanitized["email"]
+    # Nested values under a sensitive key are redacted; numbers are kept
+    assert sanitized["address"]["street"].startswith("redacted-")
+    assert sanitized["address"]["zip"] == 12345
+    # Stable within a capture, different across salts
+    assert sanitize(body, b"salt") == sanitized
+    assert sanitize(body, b"other")["email"] != sanitized["email"]
+
+def test_recorder_sampling(tmp_path):
+    """Test that only API requests are sampled, at the configured rate."""
+    recorder = TrafficRecorder(str(tmp_path / "capture.jsonl"), sample_rate=0.25)
+    assert not recorder.should_record("/metrics")
+    assert sum(recorder.should_record("/api/v1/orders/") for _ in range(100)) == 25
+
+@pytest.mark.asyncio
+async def test_capture_and_replay(async_client, test_customer, tmp_path):
+    """Test that captured requests replay with the same statuses."""
+    path = str(tmp_path / "capture.jsonl")
+    capture.start_recording(path, max_body=80)
+    try:
+        await async_client.get(f"/api/v1/customers/{test_customer.id}")
+        await async_client.get("/api/v1/customers/999999")
+        await async_client.post("/api/v1/customers/", json={"name": "New Customer", "email": "new@example.org"})
+        await async_client.post("/api/v1/customers/", json={"name": "x" * 100, "email": "big@example.org"})
+        await async_client.get("/metrics")
+    finally:
+        capture.stop_recording()
+
+    records, skipped = load_capture(path)
+    assert skipped == 1
+    assert [(r["method"], r["status"]) for r in records] == [("GET", 200), ("GET", 404), ("POST", 201)]
+    assert "new@example.org" not in open(path).read()
+
+    results = await replay(async_client, records, speed=0, concurrency=1)
+    summary = summarize(results)
+    assert summary["ALL"]["requests"] == 3
+    assert summary["ALL"]["status_mismatches"] == 0
+    assert summary["GET /api/v1/customers/{id}"]["requests"] == 2
+
+@pytest.mark.asyncio
+async def test_capture_records_shed_requests(tmp_path, monkeypatch):
+    """Test that requests shed by admission control are captured with their 503 and body."""
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await receive()
+        await release.wait()
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    budgets = {READ: Budget(READ, 1, 0), WRITE: Budget(WRITE, 1, 0)}
+    middleware = TrafficCaptureMiddleware(
+        AdmissionControlMiddleware(app, budgets, queue_timeout=0, registry=MetricsRegistry())
+    )
+    path = str(tmp_path / "capture.jsonl")
+    capture.start_recording(path)
+    try:
+        async with AsyncClient(app=middleware, base_url="http://test") as client:
+            admitted = asyncio.create_task(client.post("/api/v1/orders/", json={"customer_id": 1}))
+            await asyncio.sleep(0.01)
+            shed = await client.post("/api/v1/orders/", json={"customer_id": 2})
+            release.set()
+            await admitted
+    finally:
+        capture.stop_recording()
+
+    assert shed.status_code == 503
+    records, skipped = load_capture(path)
+    assert [(r["status"], r["body"]) for r in records] == [(201, {"customer_id": 1}), (503, {"customer_id": 2})]
@@ -0,0 +1,73 @@
+import sqlite3
+import pytest
+from tortoise import Tortoise
+from tortoise.backends.sqlite.client import SqliteTransactionWrapper
+from tortoise.transactions import in_transaction
+from app.db import database
+from app.db.database import SchemaVersionError, check_schema_version, latest_migration
+from app.startup import StartupTimer
+
+@pytest.mark.asyncio
+async def test_check_schema_version(test_db):
+    """Test that production boot accepts only a database migrated to the newest version."""
+    connection = Tortoise.get_connection("default")
+
+    # Never migrated: no aerich table at all
+    with pytest.raises(SchemaVersionError, match="no recorded version"):
+        await check_schema_version()
+
+    await connection.execute_script(
+        'CREATE TABLE "aerich" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "version" VARCHAR(255) NOT NULL, '
+        '"app" VARCHAR(100) NOT NULL, "content" JSON NOT NULL)'
+    )
+    await connection.execute_query(
+        'INSERT INTO "aerich" ("version", "app", "content") VALUES (?, ?, ?)', ["0_20250308123352_init.py", "models", "{}"]
+    )
+    with pytest.raises(SchemaVersionError, match="0_20250308123352_init.py"):
+        await check_schema_version()
+
+    await connection.execute_query(
+        'INSERT INTO "aerich" ("version", "app", "content") VALUES (?, ?, ?)', [latest_migration(), "models", "{}"]
+    )
+    assert await check_schema_version() == latest_migration()
+
+def test_startup_timer():
+    """Test that each mark closes the phase since the previous one."""
+    timer = StartupTimer()
+    timer.mark("imports")
+    timer.mark("orm_init")
+    assert list(timer.phases) == ["imports", "orm_init"]
+    assert timer.total == pytest.approx(sum(timer.phases.values()))
+
+@pytest.mark.asyncio
+async def test_immediate_transactions(tmp_path, monkeypatch):
+    """Test that a transaction holds the write lock from BEGIN, so other processes wait for it."""
+    monkeypatch.setattr(SqliteTransactionWrapper, "begin", SqliteTransactionWrapper.begin)
+    database.use_immediate_transactions()
+    path = str(tmp_path / "workers.db")
+    await Tortoise.init(db_url=f"sqlite://{path}", modules={"models": ["app.models.models"]})
+    try:
+        await Tortoise.generate_schemas()
+        other = sqlite3.connect(path, timeout=0)
+        async with in_transaction():
+            # Nothing written yet, but another writer is already locked out
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+        other.execute("BEGIN IMMEDIATE")
+        other.rollback()
+        other.close()
+    finally:
+        await Tortoise.close_connections()
+
+@pytest.mark.asyncio
+async def test_migrate_new_database(tmp_path, monkeypatch):
+    """Test that a new database migrated from any directory passes the production schema check."""
+    monkeypatch.chdir(tmp_path)
+    command = database.migration_command(f"sqlite://{tmp_path / 'new.db'}")
+    await command.init()
+    try:
+        applied = await command.upgrade()
+        assert applied[0] == "0_20250308123352_init.py" and applied[-1] == latest_migration()
+        assert await check_schema_version() == latest_migration()
+    finally:
+        await Tortoise.close_connections()
@@ -0,0 +1,50 @@
+import argparse
+import sqlite3
+from datetime import datetime, timedelta, timezone
+import pytest
+from tortoise import Tortoise
+from app.db.archive import archive_order_batch
+from scripts import generate_data
+
+ARGS = argparse.Namespace(
+    customers=20, products=10, orders=50, mean_items=2.5, max_items=5,
+    days=30, zipf_exponent=1.1, batch_size=20, seed=1,
+)
+
+def fill(path):
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("BEGIN")
+        generate_data.generate(connection, ARGS)
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+
+def overlapping_ids(path):
+    connection = sqlite3.connect(path)
+    try:
+        return [
+            connection.execute(f'SELECT COUNT(*) FROM "{table}" JOIN "{archive}" USING ("id")').fetchone()[0]
+            for table, archive in generate_data.ARCHIVE_TABLES.items()
+        ]
+    finally:
+        connection.close()
+
+@pytest.mark.asyncio
+async def test_generate_after_archival(tmp_path):
+    """Test that generating into an archived database never reuses ids of archived orders or items."""
+    path = str(tmp_path / "bench.db")
+    await generate_data.ensure_schema(path)
+    fill(path)
+
+    await Tortoise.init(db_url=f"sqlite://{path}", modules={"models": ["app.models.models"]})
+    try:
+        # Archive every order, so the hot tables are empty again
+        cutoff = datetime.now(timezone.utc) + timedelta(days=1)
+        assert await archive_order_batch(cutoff, generate_data.STATUSES, batch_size=1000) == ARGS.orders
+
+        fill(path)
+        assert overlapping_ids(path) == [0, 0]
+        assert await archive_order_batch(cutoff, generate_data.STATUSES, batch_size=1000) == ARGS.orders
+    finally:
+        await Tortoise.close_connections()
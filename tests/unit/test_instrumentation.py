@@ -0,0 +1,97 @@
+import pytest
+import threading
+import time
+from app.db.instrumentation import QueryStats, capture_queries
+from app.db.slow_queries import fingerprint, redact
+from app.profiling import Sampler, collapse
+from app.models.models import Customer
+
+def test_repeated_statements():
+    """Test that statements repeated past the threshold are reported, most repeated first."""
+    stats = QueryStats()
+    for _ in range(6):
+        stats.record('SELECT * FROM "product" WHERE "id"=?', 0.001)
+    for _ in range(3):
+        stats.record('SELECT * FROM "inventory" WHERE "product_id"=?', 0.001)
+    stats.record('SELECT * FROM "customer"', 0.001)
+    
+    assert stats.queries == 10
+    assert stats.query_time == pytest.approx(0.01)
+    assert stats.repeated_statements(3) == [
+        ('SELECT * FROM "product" WHERE "id"=?', 6),
+        ('SELECT * FROM "inventory" WHERE "product_id"=?', 3),
+    ]
+    assert stats.repeated_statements(10) == []
+
+@pytest.mark.asyncio
+async def test_capture_queries(test_db):
+    """Test that queries are only captured inside the block."""
+    with capture_queries() as stats:
+        await Customer.create(name="Test Customer", email="test@example.com")
+        await Customer.all()
+    await Customer.all()
+    
+    assert stats.queries == 2
+    assert len(stats.statements) == 2
+
+def test_slow_query_fingerprint():
+    """Test that literals and IN lists are normalized out of fingerprints."""
+    assert fingerprint('SELECT "id" FROM "order" WHERE "id" IN (?,?,?) LIMIT 10') == \
+        fingerprint('SELECT "id"  FROM "order" WHERE "id" IN (?, ?) LIMIT 20') == \
+        'SELECT "id" FROM "order" WHERE "id" IN (?, ...) LIMIT ?'
+    assert fingerprint("SELECT * FROM \"customer\" WHERE \"email\"='a@example.com'") == \
+        'SELECT * FROM "customer" WHERE "email"=?'
+    # Digits inside identifiers are kept
+    assert fingerprint('SELECT "idx_order_1" FROM "t2"') == 'SELECT "idx_order_1" FROM "t2"'
+
+def test_slow_query_params_redacted():
+    """Test that text parameters are redacted and numbers kept."""
+    assert redact([1, 2.5, None, "jane@example.com"]) == [1, 2.5, None, "<str>"]
+    assert redact([["secret", 3], ["other", 4]]) == ["<str>", 3]
+    assert redact(None) is None
+
+def test_sampler_collapsed_stacks():
+    """Test that the sampler records the stacks of a busy thread in collapsed format."""
+    stop = threading.Event()
+    
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+    
+    worker = threading.Thread(target=busy_loop)
+    worker.start()
+    sampler = Sampler(worker.ident, interval=0.001)
+    sampler.start()
+    time.sleep(0.1)
+    stacks = sampler.stop()
+    stop.set()
+    worker.join()
+    
+    assert sampler.samples > 0
+    assert any(stack.split(";")[-1].startswith("busy_loop (") for stack in stacks)
+    line = collapse(stacks).splitlines()[0]
+    assert line.rsplit(" ", 1)[1] == str(stacks.most_common(1)[0][1])
+
+def test_sampler_skips_idle_loop():
+    """Test that a loop waiting in compiled code, as uvloop does, is not sampled as busy."""
+    samplers = []
+
+    class Suspend:
+        def __await__(self):
+            yield
+
+    async def handler():
+        sampler = Sampler(threading.get_ident(), interval=0.001)
+        sampler.start()
+        samplers.append(sampler)
+        await Suspend()
+
+    # This frame drives the coroutine, like the caller of uvloop's run method
+    coroutine = handler()
+    coroutine.send(None)
+    time.sleep(0.05)
+    stacks = samplers[0].stop()
+    coroutine.close()
+
+    assert samplers[0].samples > 0
+    assert not stacks
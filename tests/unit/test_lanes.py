@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+from app.admission import Budget
+from app.db.instrumentation import track_queries
+from app.db.lanes import ADMIN, BULK, INTERACTIVE, current_lane
+from app.middleware.lanes import lane_for
+
+def scope(path, query_string=b"", method="GET", headers=()):
+    return {"type": "http", "method": method, "path": path, "query_string": query_string, "headers": list(headers)}
+
+def test_lane_for():
+    """Test that lanes are picked by route, page size and header."""
+    assert lane_for(scope("/api/v1/orders/", b"limit=20")) == INTERACTIVE
+    assert lane_for(scope("/api/v1/orders/", b"status=pending&limit=10000")) == BULK
+    assert lane_for(scope("/api/v1/products/bulk", method="POST")) == BULK
+    assert lane_for(scope("/api/v1/inventory/adjustments", method="POST")) == BULK
+    assert lane_for(scope("/admin/slow-queries")) == ADMIN
+    assert lane_for(scope("/api/v1/customers/", headers=[(b"x-priority-lane", b"bulk")])) == BULK
+    # The header cannot take a large page out of the bulk lane
+    assert lane_for(scope("/api/v1/orders/", b"limit=10000", headers=[(b"x-priority-lane", b"interactive")])) == BULK
+    assert lane_for(scope("/api/v1/orders/", b"limit=abc")) == INTERACTIVE
+
+@pytest.mark.asyncio
+async def test_bulk_lane_waits_for_its_slot(test_db):
+    """Test that bulk queries and transactions run one at a time while interactive ones go straight through."""
+    connection = Tortoise.get_connection("default")
+    bulk = Budget(BULK, concurrency=1)
+    interactive = Budget(INTERACTIVE, concurrency=0)
+
+    async def query(lane, sql="SELECT 1"):
+        current_lane.set(lane)
+        with track_queries() as stats:
+            await connection.execute_query(sql)
+        return stats
+
+    async def transaction(lane):
+        current_lane.set(lane)
+        async with in_transaction() as tx:
+            await tx.execute_query("SELECT 1")
+
+    # Another bulk job holds the lane
+    await bulk.acquire(None)
+    waiting_query = asyncio.create_task(query(bulk))
+    waiting_transaction = asyncio.create_task(transaction(bulk))
+    await asyncio.sleep(0.05)
+    assert not waiting_query.done() and not waiting_transaction.done()
+    assert bulk.queued == 2
+
+    # Checkout is not held up by the bulk lane
+    assert (await query(interactive)).lane_wait == 0
+
+    bulk.release()
+    stats = await waiting_query
+    await waiting_transaction
+    assert stats.lane_wait > 0.04
+    assert bulk.in_flight == 0 and bulk.queued == 0
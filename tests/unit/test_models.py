@@ -219,4 +219,28 @@ async def test_relationships(test_db):
     # Test product -> inventory relationship
     product_inventory = await product.inventory
     assert product_inventory.id == inventory.id
-    assert product_inventory.quantity == 100 
\ No newline at end of file
+    assert product_inventory.quantity == 100 
+
+def test_order_set_item_summary():
+    """Test computing the denormalized item summary on an order."""
+    order = Order()
+    order.set_item_summary([("Laptop", 2), ("Mouse", 1), ("Cable", 3)])
+    assert order.item_count == 3
+    assert order.total_quantity == 6
+    assert order.item_summary == "Laptop +2 more"
+    
+    order.set_item_summary([("Laptop", 1)])
+    assert order.item_summary == "Laptop"
+    
+    # Long names are shortened so the "+N more" suffix is kept
+    order.set_item_summary([("x" * 300, 1), ("Mouse", 1)])
+    assert len(order.item_summary) == 255
+    assert order.item_summary.endswith("x +1 more")
+    
+    order.set_item_summary([("x" * 300, 1)])
+    assert order.item_summary == "x" * 255
+    
+    order.set_item_summary([])
+    assert order.item_count == 0
+    assert order.total_quantity == 0
+    assert order.item_summary is None
@@ -0,0 +1,44 @@
+import json
+import os
+from fastapi.testclient import TestClient
+from app import openapi
+from app.main import app
+from app.openapi import SchemaCache, cache_path, source_fingerprint, write_schema
+
+def test_openapi_served_from_cache():
+    """Test that /openapi.json serves the same document FastAPI generates."""
+    client = TestClient(app)
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert response.json() == app.openapi()
+    assert client.get("/docs").status_code == 200
+    assert client.get("/redoc").status_code == 200
+
+def test_schema_cache_file(tmp_path, monkeypatch):
+    """Test that workers read the schema written at deploy time, and never write one themselves."""
+    path = cache_path(app, str(tmp_path))
+    assert path.endswith(f"openapi-{app.version}-{source_fingerprint()}.json")
+
+    # No deploy-time file: built in memory only
+    missing = SchemaCache(app, path)
+    missing.load()
+    assert json.loads(missing.get()) == app.openapi()
+    assert not os.path.exists(path)
+
+    body = write_schema(app, path)
+    def fail(app):
+        raise AssertionError("schema rebuilt despite the cache file")
+    monkeypatch.setattr(openapi, "render_schema", fail)
+    cached = SchemaCache(app, path)
+    assert cached.get() == body == missing.get()
+
+def test_source_fingerprint(tmp_path):
+    """Test that any change to the source gives a new cache key."""
+    package = tmp_path / "app"
+    package.joinpath("api").mkdir(parents=True)
+    package.joinpath("api", "routes.py").write_text("ROUTES = []\n")
+    before = source_fingerprint(str(package))
+    assert source_fingerprint(str(package)) == before
+
+    package.joinpath("api", "routes.py").write_text("ROUTES = ['/orders']\n")
+    assert source_fingerprint(str(package)) != before
@@ -0,0 +1,36 @@
+import random
+from datetime import datetime, timezone
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.main import app
+from app.responses import FastJSONResponse
+
+def test_fast_json_matches_standard_encoder():
+    """Test that FastJSONResponse writes the same bytes as FastAPI's JSONResponse."""
+    rng = random.Random(1)
+    order = {
+        "id": 1,
+        "customer": {"id": 7, "name": "Zoë \"ZZ\" O'Brien\n\t\x01", "email": "zoe@example.com"},
+        "order_date": datetime(2026, 10, 19, 12, 30, 5, 123456, tzinfo=timezone.utc),
+        "status": "pending",
+        "total_amount": 1049.97,
+        "items": [
+            {"product_id": i, "quantity": i % 3 + 1, "unit_price": round(rng.uniform(0, 10000), 2),
+             "subtotal": rng.uniform(0, 100000)}
+            for i in range(200)
+        ],
+        "tags": ["ünïcode", "emoji 📦", " "],
+        "counts": {1: 2, 3: 4},
+        "flags": [True, False, None],
+        "big": 2 ** 63,
+        "zero": -0.0,
+    }
+    content = jsonable_encoder(order)
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+    # Beyond orjson's 64-bit integers it falls back to the standard encoder
+    assert FastJSONResponse({"huge": 2 ** 70}).body == JSONResponse({"huge": 2 ** 70}).body
+
+def test_app_uses_fast_json():
+    """Test that routes without their own response class use FastJSONResponse."""
+    assert app.router.default_response_class is FastJSONResponse
@@ -5,6 +5,7 @@ from app.schemas.schemas import (
     CustomerCreate, CustomerUpdate, Customer,
     ProductCreate, ProductUpdate, Product,
     InventoryCreate, InventoryUpdate, Inventory,
+    InventoryAdjustment, InventoryAdjustmentCreate,
     OrderCreate, OrderUpdate, Order, OrderItemCreate
 )
 
@@ -136,6 +137,28 @@ def test_inventory_update_schema():
     with pytest.raises(ValidationError):
         InventoryUpdate(quantity=-10)
 
+def test_inventory_adjustment_schema():
+    """Test InventoryAdjustment schema validation."""
+    # A line can reference a product by ID or by SKU
+    adjustment = InventoryAdjustment(product_id=1, delta=5)
+    assert adjustment.product_id == 1
+    assert adjustment.sku is None
+    
+    adjustment = InventoryAdjustment(sku="TEST001", delta=-2)
+    assert adjustment.sku == "TEST001"
+    assert adjustment.delta == -2
+    
+    # Exactly one product reference is required
+    with pytest.raises(ValidationError):
+        InventoryAdjustment(delta=5)
+    
+    with pytest.raises(ValidationError):
+        InventoryAdjustment(product_id=1, sku="TEST001", delta=5)
+    
+    # A batch needs at least one line
+    with pytest.raises(ValidationError):
+        InventoryAdjustmentCreate(items=[])
+
 def test_order_item_create_schema():
     """Test OrderItemCreate schema validation."""
     # Valid data